@@ -1,9 +1,15 @@
-from django.contrib import admin
+from django.contrib import admin, messages
 # Register your models here.
+from django.contrib.admin import helpers
 from django.contrib.auth import get_user_model
-from django.db.models import Count
+from django.core.exceptions import ValidationError
+from django.db.models import Count, Exists, OuterRef
+from django.template.response import TemplateResponse
 
-from my_project.accounts.models import Profile, ContactForm
+from my_project.accounts.forms import BroadcastNotificationForm
+from my_project.accounts.models import Profile, ContactForm, AccountDeactivation
+from my_project.common.models import Notification
+from my_project.library.models import Book
 
 
 class ProfileInline(admin.StackedInline):
@@ -41,17 +47,55 @@ class ContactFormFilter(admin.SimpleListFilter):
         return queryset.filter(contactform__in=contact_forms)
 
 
+class CityFilter(admin.SimpleListFilter):
+    title = ('city')
+    parameter_name = 'city'
+
+    def lookups(self, request, model_admin):
+        cities = ContactForm.objects.exclude(city__isnull=True) \
+            .exclude(city='') \
+            .order_by('city') \
+            .values_list('city', flat=True) \
+            .distinct()
+        return [(city, city) for city in cities]
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(contactform__city__iexact=self.value())
+        return queryset
+
+
+class HasBooksFilter(admin.SimpleListFilter):
+    title = ('has books')
+    parameter_name = 'has_books'
+
+    def lookups(self, request, model_admin):
+        return (
+            ('True', ('True')),
+            ('False', ('False')),
+        )
+
+    def queryset(self, request, queryset):
+        own_books = Exists(Book.objects.filter(owner=OuterRef('pk')))
+        if self.value() == 'True':
+            return queryset.filter(own_books)
+        if self.value() == 'False':
+            return queryset.filter(~own_books)
+        return queryset
+
+
 @admin.register(get_user_model())
 class UserModelAdmin(admin.ModelAdmin):
     inlines = (ProfileInline, ContactFormInline)
     list_display_staff = ('id', 'username', 'name', 'is_contact_form_done', 'books_number', 'is_staff')
     list_display_superuser_extra = ('is_staff', 'is_superuser')
     list_display_links = ('id', 'username')
-    list_filter_staff = ('username', ContactFormFilter)
+    list_filter_staff = ('username', ContactFormFilter, CityFilter, HasBooksFilter)
     list_filter_superuser_extra = ('is_staff', 'is_superuser')
     list_per_page = 20
     search_fields = ('username', 'profile__first_name', 'profile__last_name')
     sortable_by = ('id', 'username', 'name', 'books_number')
+    actions = ('broadcast_notification',)
 
     PRIMARY_FIELDS_DESCRIPTION = 'Very important fields'
     exclude = ['password']
@@ -76,6 +120,33 @@ class UserModelAdmin(admin.ModelAdmin):
          ),
     )
 
+    @admin.action(description='Send a notification to the selected users')
+    def broadcast_notification(self, request, queryset):
+        '''
+        Asks for the massage first. With "select all" the filtered users are not listed in the form,
+        Notification.broadcast reads their pks from the database in batches.
+        '''
+        form = BroadcastNotificationForm(request.POST if 'broadcast' in request.POST else None)
+        if form.is_valid():
+            try:
+                sent = Notification.broadcast(request.user, form.cleaned_data['massage'], queryset)
+            except ValidationError as ex:
+                self.message_user(request, f'Invalid notification: {ex}', messages.ERROR)
+                return None
+            self.message_user(request, f'Sent {sent} notifications', messages.SUCCESS)
+            return None
+
+        context = {
+            **self.admin_site.each_context(request),
+            'title': 'Send a notification',
+            'opts': self.model._meta,
+            'form': form,
+            'select_across': request.POST.get('select_across', '0'),
+            'selected': request.POST.getlist(helpers.ACTION_CHECKBOX_NAME),
+            'action_checkbox_name': helpers.ACTION_CHECKBOX_NAME,
+        }
+        return TemplateResponse(request, 'admin/accounts/broadcast_notification.html', context)
+
     def view_on_site(self, obj):
         return obj.get_absolute_url()
 
@@ -117,3 +188,14 @@ class UserModelAdmin(admin.ModelAdmin):
         return inst.books_count
 
     books_number.admin_order_field = 'books_count'
+
+
+@admin.register(AccountDeactivation)
+class AccountDeactivationAdmin(admin.ModelAdmin):
+    list_display = ('user', 'progress', 'books_done', 'books_total', 'created_date', 'finished_date')
+    list_select_related = ('user',)
+    readonly_fields = ('user', 'books_total', 'books_done', 'created_date', 'finished_date')
+
+    @admin.display(description='progress %')
+    def progress(self, obj):
+        return obj.progress
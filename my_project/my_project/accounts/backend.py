@@ -1,6 +1,10 @@
+import hashlib
+
 from django.contrib.auth import get_user_model
 from django.contrib.auth.backends import ModelBackend
-from django.db.models import Q
+from django.core.cache import cache
+from django.core.exceptions import PermissionDenied
+from django.db.models import Q, Case, When, Value
 
 
 class EmailOrUsernameModelBackend(ModelBackend):
@@ -10,18 +14,75 @@ class EmailOrUsernameModelBackend(ModelBackend):
 
     Source: https://stackoverflow.com/a/35836674/59984
     """
+    FAILURES_LIMIT_PER_LOGIN = 10
+    FAILURES_LIMIT_PER_ADDRESS = 50
+    FAILURES_WINDOW = 15 * 60
+    CACHE_KEY_PREFIX = 'login_failures'
 
     def authenticate(self, request, username=None, password=None, **kwargs):
+        '''
+        Every attempt costs exactly one password hash, also when no user matches.
+        Failed attempts are counted in the shared cache per login from a client address and per address,
+        and once either of them is over its limit the attempts are refused before any hashing.
+        A login alone is never locked, so nobody can lock a user out by failing with their username.
+        A refused or failed attempt raises PermissionDenied, so the next backends do not hash it again.
+        '''
         user_model = get_user_model()
 
         if username is None:
             username = kwargs.get(user_model.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+
+        limits = self.get_failure_limits(request, username)
+        if any(cache.get(key, 0) >= limit for key, limit in limits):
+            raise PermissionDenied
+
+        user = self.get_candidate(username)
+        if user is None:
+            user_model().set_password(password)
+        elif user.check_password(password):
+            cache.delete(limits[0][0])
+            return user
+
+        for key, _ in limits:
+            cache.add(key, 0, self.FAILURES_WINDOW)
+            cache.incr(key)
+        raise PermissionDenied
+
+    @staticmethod
+    def get_candidate(login):
+        '''
+        At most one user, found through the case insensitive indexes of username and email.
+        An exact username match goes first, then an exact email match.
+        '''
+        user_model = get_user_model()
+        username_field = user_model.USERNAME_FIELD
+        email_field = user_model.EMAIL_FIELD
+        return user_model._default_manager.filter(
+            Q(**{f'{username_field}__iexact': login}) | Q(**{f'{email_field}__iexact': login})
+        ).order_by(
+            Case(
+                When(**{username_field: login}, then=Value(0)),
+                When(**{email_field: login}, then=Value(1)),
+                default=Value(2),
+            ),
+            'pk',
+        ).first()
 
-        users = user_model._default_manager.filter(
-            Q(**{user_model.USERNAME_FIELD: username}) | Q(**{user_model.EMAIL_FIELD: username})
-        )
+    def get_failure_limits(self, request, login):
+        '''(cache key, limit) of the login from the client address and, when known, of the address'''
+        address = self.get_client_address(request)
+        login_hash = hashlib.sha256(f'{login.lower()} {address or ""}'.encode()).hexdigest()
+        limits = [(f'{self.CACHE_KEY_PREFIX}:login:{login_hash}', self.FAILURES_LIMIT_PER_LOGIN)]
+        if address:
+            limits.append((f'{self.CACHE_KEY_PREFIX}:address:{address}', self.FAILURES_LIMIT_PER_ADDRESS))
+        return limits
 
-        for user in users:
-            if user.check_password(password):
-                return user
-        return super().authenticate(request, username=None, password=None, **kwargs)
+    @staticmethod
+    def get_client_address(request):
+        '''The last address of X-Forwarded-For is the one added by the proxy in front of the app'''
+        if request is None:
+            return None
+        forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR', '').split(',')[-1].strip()
+        return forwarded_for or request.META.get('REMOTE_ADDR')
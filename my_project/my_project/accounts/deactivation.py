@@ -0,0 +1,89 @@
+'''
+Deactivation of accounts with a few bulk queries in one transaction, instead of a save per book and offer.
+Accounts with more tradable books than BACKGROUND_BOOKS_THRESHOLD get an AccountDeactivation,
+and the process_account_deactivations worker takes their books out of trading batch by batch.
+'''
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from my_project.accounts.models import Profile, ContactForm, AccountDeactivation
+from my_project.common.models import Notification
+from my_project.library.models import Book
+from my_project.offer.models import Offer, SwapMatch, CircularTrade
+
+UserModel = get_user_model()
+
+BACKGROUND_BOOKS_THRESHOLD = 500
+BATCH_SIZE = 1000
+
+
+def deactivate_account(user):
+    '''Close the account, and finish it at once or return the AccountDeactivation which finishes it later'''
+    with transaction.atomic():
+        UserModel.objects.filter(pk=user.pk).update(is_active=False)
+        reset_to_defaults(Profile, user)
+        reset_to_defaults(ContactForm, user)
+        withdraw_from_trades(user)
+        books = Book.objects.filter(owner=user, is_tradable=True)
+        books_total = books.count()
+        if books_total > BACKGROUND_BOOKS_THRESHOLD:
+            deactivation, _ = AccountDeactivation.objects.update_or_create(
+                user=user,
+                defaults={'books_total': books_total, 'books_done': 0, 'finished_date': None},
+            )
+            return deactivation
+        books.update(is_tradable=False)
+        close_offers(user)
+    return None
+
+
+def reset_to_defaults(model, user):
+    '''Delete what the user filled in, with one UPDATE of the row instead of deleting and creating it'''
+    defaults = {field.attname: field.get_default() for field in model._meta.concrete_fields if not field.primary_key}
+    model.objects.filter(pk=user.pk).update(**defaults)
+
+
+def withdraw_from_trades(user):
+    '''
+    The bulk updates skip the signals of a book's save, so the swap matches of the inactive user
+    are recomputed here, which drops them, and the circular trades with the user are closed
+    '''
+    SwapMatch.objects.refresh_for_users({user.pk})
+    CircularTrade.objects.of_user(user).filter(is_active=True).update(is_active=False)
+
+
+def close_offers(user):
+    '''Close the active offers of the user and tell the other side of each of them, with one notification each'''
+    offers = Offer.objects.filter(Q(sender=user) | Q(recipient=user)).deactivate()
+    if offers:
+        Notification.create_notifications_for_closed_offers(
+            offers, reason=f'{user} deactivated the account', skip_user_pk=user.pk)
+    return offers
+
+
+def process_next(batch_size=BATCH_SIZE):
+    '''
+    One batch of books of the oldest unfinished deactivation, in one transaction, and the offers after the last one.
+    Deactivations locked by another worker are skipped, so workers can run side by side.
+    '''
+    with transaction.atomic():
+        deactivation = AccountDeactivation.objects.unfinished() \
+            .select_for_update(skip_locked=True, of=('self',)) \
+            .select_related('user') \
+            .order_by('created_date') \
+            .first()
+        if deactivation is None:
+            return None
+        pks = list(Book.objects.filter(owner=deactivation.user_id, is_tradable=True)
+                   .order_by('pk')
+                   .values_list('pk', flat=True)[:batch_size])
+        done = Book.objects.filter(pk__in=pks).update(is_tradable=False)
+        deactivation.books_done += done
+        if done < batch_size:
+            close_offers(deactivation.user)
+            withdraw_from_trades(deactivation.user)
+            deactivation.finished_date = timezone.now()
+        deactivation.save(update_fields=['books_done', 'finished_date'])
+    return deactivation
@@ -89,3 +89,9 @@ class EditContactForm(AddCCSMixin, forms.ModelForm):
     class Meta:
         model = ContactForm
         exclude = ['user']
+
+
+class BroadcastNotificationForm(forms.Form):
+    massage = forms.CharField(
+        widget=forms.Textarea,
+    )
@@ -0,0 +1,128 @@
+import csv
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+import django
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError
+from django.core.management import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.functions import Upper
+
+from my_project.accounts.models import Profile, ContactForm
+
+UserModel = get_user_model()
+
+
+class Command(BaseCommand):
+    help = '''
+    Import users from a CSV file with a header or a JSON lines file, with username, email and password
+    and optionally the fields of Profile and ContactForm. The file is read batch by batch, the passwords
+    are hashed on all cores, and every batch is three bulk inserts, without the signals of a user's save.
+    Users whose username or email is already taken, or with an invalid field, are skipped.
+    '''
+
+    DEFAULT_BATCH_SIZE = 1000
+    FORMATS = ('csv', 'jsonl')
+    USER_FIELDS = ('username', 'email')
+    PROFILE_FIELDS = ('first_name', 'last_name', 'gender', 'nationality', 'date_of_birth', 'description')
+    CONTACT_FORM_FIELDS = ('city', 'address', 'phone_number')
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=self.FORMATS,
+                            help='By default taken from the extension of the file')
+        parser.add_argument('--batch-size', type=int, default=self.DEFAULT_BATCH_SIZE)
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                            help='Processes which hash the passwords')
+
+    def handle(self, *args, **options):
+        file_format = options['format'] or os.path.splitext(options['path'])[1].lstrip('.').lower()
+        if file_format not in self.FORMATS:
+            raise CommandError(f'Unknown format "{file_format}", use --format {" or ".join(self.FORMATS)}')
+
+        imported = 0
+        skipped = 0
+        # Spawned processes, as on macOS and Windows, start without Django, so every one sets it up first
+        with open(options['path'], newline='', encoding='utf-8') as file, \
+                ProcessPoolExecutor(max_workers=options['workers'], initializer=django.setup) as executor:
+            rows = self.read_rows(file, file_format)
+            while True:
+                batch = list(islice(rows, options['batch_size']))
+                if not batch:
+                    break
+                created = self.import_batch(batch, executor, options['workers'])
+                imported += created
+                skipped += len(batch) - created
+        self.stdout.write(self.style.SUCCESS(f'Imported {imported} users, skipped {skipped}'))
+
+    @staticmethod
+    def read_rows(file, file_format):
+        if file_format == 'csv':
+            yield from csv.DictReader(file)
+            return
+        for line in file:
+            if line.strip():
+                yield json.loads(line)
+
+    def import_batch(self, rows, executor, workers):
+        '''One transaction with a query for the taken names and one bulk insert for each of the three tables'''
+        accounts = [account for account in map(self.build_account, self.without_taken(rows)) if account]
+        if not accounts:
+            return 0
+        passwords = executor.map(make_password, (password for _, _, _, password in accounts),
+                                 chunksize=max(1, len(accounts) // (workers * 4)))
+        for (user, _, _, _), password in zip(accounts, passwords):
+            user.password = password
+
+        with transaction.atomic():
+            UserModel.objects.bulk_create(user for user, _, _, _ in accounts)
+            user_pks = dict(UserModel.objects.filter(username__in=[user.username for user, _, _, _ in accounts])
+                            .values_list('username', 'pk'))
+            for user, profile, contact_form, _ in accounts:
+                profile.user_id = contact_form.user_id = user_pks[user.username]
+            Profile.objects.bulk_create(profile for _, profile, _, _ in accounts)
+            ContactForm.objects.bulk_create(contact_form for _, _, contact_form, _ in accounts)
+        return len(accounts)
+
+    def build_account(self, row):
+        '''(user, profile, contact form, password) of the row, None when a field is invalid'''
+        user = UserModel(**self.pick(row, self.USER_FIELDS))
+        profile = Profile(**self.pick(row, self.PROFILE_FIELDS))
+        contact_form = ContactForm(**self.pick(row, self.CONTACT_FORM_FIELDS))
+        try:
+            user.clean_fields(exclude=['password'])
+            profile.clean_fields(exclude=['user'])
+            contact_form.clean_fields(exclude=['user'])
+        except ValidationError:
+            return None
+        return user, profile, contact_form, row.get('password') or None
+
+    @staticmethod
+    def without_taken(rows):
+        '''Rows with a username and an email, taken neither by a user nor by an earlier row, in any letter case'''
+        rows = [row for row in rows if row.get('username') and row.get('email')]
+        # A username must not be the email of another user either, as WorldOfBooksUser.clean checks
+        # Names are compared upper cased, as the login backend matches them case insensitively
+        names = {row['username'].upper() for row in rows} | {row['email'].upper() for row in rows}
+        taken = UserModel.objects.annotate(username_upper=Upper('username'), email_upper=Upper('email')) \
+            .filter(Q(username_upper__in=names) | Q(email_upper__in=names))
+        taken_names = {name for names in taken.values_list('username_upper', 'email_upper') for name in names}
+
+        free_rows = []
+        for row in rows:
+            username, email = row['username'].upper(), row['email'].upper()
+            if username in taken_names or email in taken_names:
+                continue
+            taken_names.update((username, email))
+            free_rows.append(row)
+        return free_rows
+
+    @staticmethod
+    def pick(row, fields):
+        '''The fields which are filled in the row, the others keep their defaults'''
+        return {field: row[field] for field in fields if row.get(field)}
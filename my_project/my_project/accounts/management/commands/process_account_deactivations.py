@@ -0,0 +1,29 @@
+import time
+
+from django.core.management import BaseCommand
+
+from my_project.accounts import deactivation
+
+
+class Command(BaseCommand):
+    help = 'Finish the deactivations of accounts with many books, in batches, until stopped'
+
+    DEFAULT_INTERVAL = 1.0
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=deactivation.BATCH_SIZE)
+        parser.add_argument('--interval', type=float, default=self.DEFAULT_INTERVAL,
+                            help='Seconds to wait when no deactivation is left')
+        parser.add_argument('--once', action='store_true', help='Stop when no deactivation is left')
+
+    def handle(self, *args, **options):
+        finished = 0
+        while True:
+            processed = deactivation.process_next(options['batch_size'])
+            if processed:
+                finished += processed.is_finished
+                continue
+            if options['once']:
+                break
+            time.sleep(options['interval'])
+        self.stdout.write(self.style.SUCCESS(f'Finished {finished} deactivations'))
@@ -27,3 +27,12 @@ class MyUserManager(BaseUserManager):
             raise ValueError('Superuser must have is_superuser=True.')
 
         return self._create_user(username, password, **extra_fields)
+
+    def segment(self, city=None, without_books=False):
+        '''Active users, only the ones from city and the ones without own books when asked'''
+        users = self.filter(is_active=True)
+        if city:
+            users = users.filter(contactform__city__iexact=city)
+        if without_books:
+            users = users.exclude(own_books__isnull=False)
+        return users
@@ -0,0 +1,33 @@
+# Generated by Django 4.0.10 on 2026-10-18 13:20
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_unread_notifications_count(apps, schema_editor):
+    WorldOfBooksUser = apps.get_model('accounts', 'WorldOfBooksUser')
+    Notification = apps.get_model('common', 'Notification')
+    unread = Notification.objects.filter(recipient=OuterRef('pk'), is_read=False) \
+        .order_by() \
+        .values('recipient') \
+        .annotate(total=Count('pk')) \
+        .values('total')
+    WorldOfBooksUser.objects.update(unread_notifications_count=Coalesce(Subquery(unread), Value(0)))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0016_alter_worldofbooksuser_options'),
+        ('common', '0010_remove_notification_type_notification_massage_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='worldofbooksuser',
+            name='unread_notifications_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_unread_notifications_count, migrations.RunPython.noop),
+    ]
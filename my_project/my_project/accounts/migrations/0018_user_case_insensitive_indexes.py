@@ -0,0 +1,22 @@
+# Generated by Django 4.0.10 on 2026-10-18 13:40
+
+from django.db import migrations, models
+import django.db.models.functions.text
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0017_user_unread_notifications_count'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='worldofbooksuser',
+            index=models.Index(django.db.models.functions.text.Upper('username'), name='accounts_user_username_ci_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='worldofbooksuser',
+            index=models.Index(django.db.models.functions.text.Upper('email'), name='accounts_user_email_ci_idx'),
+        ),
+    ]
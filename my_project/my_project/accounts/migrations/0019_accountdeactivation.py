@@ -0,0 +1,25 @@
+# Generated by Django 4.0.10 on 2026-10-18 13:42
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0018_user_case_insensitive_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AccountDeactivation',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('books_total', models.PositiveIntegerField(default=0)),
+                ('books_done', models.PositiveIntegerField(default=0)),
+                ('created_date', models.DateTimeField(auto_now_add=True)),
+                ('finished_date', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+    ]
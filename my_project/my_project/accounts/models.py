@@ -6,16 +6,19 @@ from django.contrib.auth.models import PermissionsMixin
 from django.core import validators
 from django.core.exceptions import ValidationError
 from django.db import models
+from django.db.models.functions import Upper
 from django.urls import reverse
 
 from my_project.accounts.managers import MyUserManager
 from my_project.common.helpers import custom_validators
+from my_project.common.helpers.custom_models import StoredCountersMixin
 
 
-class WorldOfBooksUser(AbstractBaseUser, PermissionsMixin):
+class WorldOfBooksUser(StoredCountersMixin, AbstractBaseUser, PermissionsMixin):
     USERNAME_MAX_LENGTH = 32
     USERNAME_VALIDATION_ERROR_MASSAGE = 'This username is already used by another user'
     EMAIL_VALIDATION_ERROR_MASSAGE = 'This email is already used by another user'
+    stored_counters = ('unread_notifications_count',)
 
     username = models.CharField(
         max_length=USERNAME_MAX_LENGTH,
@@ -38,6 +41,12 @@ class WorldOfBooksUser(AbstractBaseUser, PermissionsMixin):
         default=True,
     )
 
+    '''Stored number of unread notifications, kept by common.signals, so the header does not count them'''
+    unread_notifications_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+    )
+
     USERNAME_FIELD = 'username'
     EMAIL_FIELD = 'email'
     objects = MyUserManager()
@@ -58,6 +67,11 @@ class WorldOfBooksUser(AbstractBaseUser, PermissionsMixin):
 
     class Meta:
         ordering = ('username',)
+        # Login looks the users up case insensitively, by username or by email
+        indexes = [
+            models.Index(Upper('username'), name='accounts_user_username_ci_idx'),
+            models.Index(Upper('email'), name='accounts_user_email_ci_idx'),
+        ]
 
 
 class Profile(models.Model):
@@ -192,3 +206,55 @@ class ContactForm(models.Model):
 
     def __str__(self):
         return f'{self.user}: Contact form id: {self.pk}'
+
+
+class AccountDeactivationQueryset(models.QuerySet):
+    def unfinished(self):
+        return self.filter(finished_date__isnull=True)
+
+
+class AccountDeactivation(models.Model):
+    '''
+    Deactivation of an account with many books, finished in batches by the process_account_deactivations worker.
+    The account itself is closed at once, its books are taken out of trading and its offers closed afterwards.
+    '''
+    objects = AccountDeactivationQueryset.as_manager()
+
+    user = models.OneToOneField(
+        WorldOfBooksUser,
+        on_delete=models.CASCADE,
+        primary_key=True,
+    )
+
+    books_total = models.PositiveIntegerField(
+        default=0,
+    )
+
+    books_done = models.PositiveIntegerField(
+        default=0,
+    )
+
+    created_date = models.DateTimeField(
+        auto_now_add=True,
+    )
+
+    finished_date = models.DateTimeField(
+        null=True,
+        blank=True,
+    )
+
+    @property
+    def is_finished(self):
+        return self.finished_date is not None
+
+    @property
+    def progress(self):
+        '''Percent done, 100 only after the offers are closed too'''
+        if self.is_finished:
+            return 100
+        if not self.books_total:
+            return 0
+        return min(99, self.books_done * 100 // self.books_total)
+
+    def __str__(self):
+        return f'Deactivation of {self.user}: {self.progress}%'
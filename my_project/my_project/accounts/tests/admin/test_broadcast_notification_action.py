@@ -0,0 +1,63 @@
+from django import test as django_test
+from django.contrib.admin import helpers
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from my_project.common.models import Notification
+
+UserModel = get_user_model()
+
+
+class BroadcastNotificationActionTest(django_test.TestCase):
+    CREDENTIALS = {
+        'username': 'admin',
+        'email': 'admin@email.com',
+        'password': 'testp@ss',
+    }
+    NUMBER_OF_USERS = 3
+    TARGET_URL = reverse('admin:accounts_worldofbooksuser_changelist')
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.ADMIN = UserModel.objects.create_superuser(**cls.CREDENTIALS)
+        cls.USERS = [UserModel.objects.create_user(username=f'user{i}', email=f'user{i}@email.com')
+                     for i in range(cls.NUMBER_OF_USERS)]
+
+    def setUp(self):
+        self.client.login(username=self.CREDENTIALS['username'], password=self.CREDENTIALS['password'])
+
+    def test_action__without_massage__expect_massage_form(self):
+        response = self.client.post(self.TARGET_URL, {
+            'action': 'broadcast_notification',
+            'index': 0,
+            helpers.ACTION_CHECKBOX_NAME: [self.USERS[0].pk],
+        })
+
+        self.assertTemplateUsed(response, 'admin/accounts/broadcast_notification.html')
+        self.assertEqual(0, Notification.objects.count())
+
+    def test_action__with_massage_and_selected_users__expect_notifications_to_selected_users(self):
+        self.client.post(self.TARGET_URL, {
+            'action': 'broadcast_notification',
+            'index': 0,
+            'broadcast': 'Send',
+            'massage': 'Test massage',
+            helpers.ACTION_CHECKBOX_NAME: [self.USERS[0].pk, self.USERS[1].pk],
+        })
+
+        self.assertSetEqual({self.USERS[0].pk, self.USERS[1].pk},
+                            set(Notification.objects.values_list('recipient', flat=True)))
+
+    def test_action__with_massage_and_select_across__expect_notifications_to_all_users_but_sender(self):
+        self.client.post(self.TARGET_URL, {
+            'action': 'broadcast_notification',
+            'index': 0,
+            'select_across': '1',
+            'broadcast': 'Send',
+            'massage': 'Test massage',
+            helpers.ACTION_CHECKBOX_NAME: [self.USERS[0].pk],
+        })
+
+        self.assertSetEqual({user.pk for user in self.USERS},
+                            set(Notification.objects.values_list('recipient', flat=True)))
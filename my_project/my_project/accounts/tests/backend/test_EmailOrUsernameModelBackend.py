@@ -0,0 +1,90 @@
+from unittest import mock
+
+from django import test as django_test
+from django.contrib.auth import authenticate, get_user_model
+from django.contrib.auth import base_user
+from django.core.cache import cache
+from django.db import connection
+from django.test import RequestFactory
+
+from my_project.accounts.backend import EmailOrUsernameModelBackend
+
+UserModel = get_user_model()
+
+
+class EmailOrUsernameModelBackendTests(django_test.TestCase):
+    CREDENTIALS = {
+        'username': 'User',
+        'email': 'user@email.com',
+        'password': 'testp@ss',
+    }
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.USER = UserModel.objects.create_user(**cls.CREDENTIALS)
+
+    def setUp(self):
+        cache.clear()
+        self.request = RequestFactory().post('/', REMOTE_ADDR='10.0.0.1')
+
+    def _authenticate(self, username, password):
+        return authenticate(self.request, username=username, password=password)
+
+    def _count_hashes(self, username, password):
+        with mock.patch.object(base_user, 'check_password', wraps=base_user.check_password) as check, \
+                mock.patch.object(base_user, 'make_password', wraps=base_user.make_password) as make:
+            self._authenticate(username, password)
+        return check.call_count + make.call_count
+
+    def test_authenticate__with_username_or_email_in_other_case__expect_user(self):
+        self.assertEqual(self.USER, self._authenticate('user', self.CREDENTIALS['password']))
+        self.assertEqual(self.USER, self._authenticate('USER@Email.com', self.CREDENTIALS['password']))
+
+    def test_authenticate__when_usernames_differ_only_in_case__expect_exact_match(self):
+        second_user = UserModel.objects.create_user(username='user', email='second@email.com', password='secondp@ss')
+
+        self.assertEqual(second_user, self._authenticate('user', 'secondp@ss'))
+        self.assertEqual(self.USER, self._authenticate('User', self.CREDENTIALS['password']))
+
+    def test_authenticate__when_valid_invalid_password_or_unknown_user__expect_one_hash_per_attempt(self):
+        self.assertEqual(1, self._count_hashes(self.CREDENTIALS['username'], self.CREDENTIALS['password']))
+        self.assertEqual(1, self._count_hashes(self.CREDENTIALS['username'], 'invalid_password'))
+        self.assertEqual(1, self._count_hashes('invalid_username', self.CREDENTIALS['password']))
+
+    def test_authenticate__when_login_over_failures_limit__expect_refused_without_hashing(self):
+        for _ in range(EmailOrUsernameModelBackend.FAILURES_LIMIT_PER_LOGIN):
+            self.assertIsNone(self._authenticate(self.CREDENTIALS['email'], 'invalid_password'))
+
+        self.assertIsNone(self._authenticate(self.CREDENTIALS['email'].upper(), self.CREDENTIALS['password']))
+        self.assertEqual(0, self._count_hashes(self.CREDENTIALS['email'], self.CREDENTIALS['password']))
+
+    def test_authenticate__when_login_over_failures_limit_from_other_address__expect_user(self):
+        for _ in range(EmailOrUsernameModelBackend.FAILURES_LIMIT_PER_LOGIN):
+            self._authenticate(self.CREDENTIALS['username'], 'invalid_password')
+
+        self.request.META['REMOTE_ADDR'] = '10.0.0.2'
+        self.assertEqual(self.USER, self._authenticate(self.CREDENTIALS['username'], self.CREDENTIALS['password']))
+
+    def test_authenticate__when_failed__expect_failures_counted_in_database_cache(self):
+        self._authenticate(self.CREDENTIALS['username'], 'invalid_password')
+
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT COUNT(*) FROM cache_table')
+            self.assertEqual(2, cursor.fetchone()[0])
+
+    def test_authenticate__when_address_over_failures_limit__expect_other_logins_refused(self):
+        for i in range(EmailOrUsernameModelBackend.FAILURES_LIMIT_PER_ADDRESS):
+            self._authenticate(f'unknown_user{i}', 'invalid_password')
+
+        self.assertIsNone(self._authenticate(self.CREDENTIALS['username'], self.CREDENTIALS['password']))
+        self.request.META['REMOTE_ADDR'] = '10.0.0.2'
+        self.assertEqual(self.USER, self._authenticate(self.CREDENTIALS['username'], self.CREDENTIALS['password']))
+
+    def test_authenticate__when_success_after_failures__expect_login_failures_reset(self):
+        for _ in range(EmailOrUsernameModelBackend.FAILURES_LIMIT_PER_LOGIN - 1):
+            self._authenticate(self.CREDENTIALS['username'], 'invalid_password')
+        self._authenticate(self.CREDENTIALS['username'], self.CREDENTIALS['password'])
+        self._authenticate(self.CREDENTIALS['username'], 'invalid_password')
+
+        self.assertEqual(self.USER, self._authenticate(self.CREDENTIALS['username'], self.CREDENTIALS['password']))
@@ -0,0 +1,104 @@
+import json
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from io import StringIO
+from unittest.mock import patch
+
+from django import test as django_test
+from django.contrib.auth import get_user_model
+from django.core.management import call_command, CommandError
+
+from my_project.accounts.management.commands import import_users
+from my_project.accounts.models import Profile, ContactForm
+
+UserModel = get_user_model()
+
+
+class ImportUsersCommandTest(django_test.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.EXISTING_USER = UserModel.objects.create_user(username='existing', email='existing@email.com')
+
+    def _write_file(self, extension, content):
+        file = tempfile.NamedTemporaryFile('w', suffix=extension, delete=False, encoding='utf-8')
+        with file:
+            file.write(content)
+        self.addCleanup(os.remove, file.name)
+        return file.name
+
+    def _import(self, path, *args):
+        out = StringIO()
+        call_command('import_users', path, '--workers', '2', *args, stdout=out)
+        return out.getvalue()
+
+    def test_import_users__from_csv__expect_users_with_hashed_passwords_profiles_and_contact_forms(self):
+        path = self._write_file('.csv', '\n'.join([
+            'username,email,password,first_name,city',
+            'first,first@email.com,firstp@ss,Ivan,Sofia',
+            'second,second@email.com,secondp@ss,,',
+            'third,third@email.com,thirdp@ss,Maria,Varna',
+        ]))
+
+        output = self._import(path, '--batch-size', '2')
+
+        first = UserModel.objects.get(username='first')
+        self.assertTrue(first.check_password('firstp@ss'))
+        self.assertEqual('Ivan', Profile.objects.get(user=first).first_name)
+        self.assertEqual('Sofia', ContactForm.objects.get(user=first).city)
+        second_profile = Profile.objects.get(user__username='second')
+        self.assertIsNone(second_profile.first_name)
+        self.assertEqual(Profile.GenderChoices.DO_NOT_SHOW, second_profile.gender)
+        self.assertEqual(4, ContactForm.objects.count())
+        self.assertIn('Imported 3 users, skipped 0', output)
+
+    def test_import_users__from_jsonl_with_taken_duplicated_and_invalid_rows__expect_them_skipped(self):
+        rows = [
+            {'username': 'existing', 'email': 'new@email.com', 'password': 'testp@ss'},
+            {'username': 'new', 'email': 'existing@email.com', 'password': 'testp@ss'},
+            {'username': 'first', 'email': 'first@email.com', 'password': 'testp@ss'},
+            {'username': 'first', 'email': 'other@email.com', 'password': 'testp@ss'},
+            {'username': 'invalid', 'email': 'not-an-email', 'password': 'testp@ss'},
+            {'username': 'no_password', 'email': 'no_password@email.com'},
+        ]
+        path = self._write_file('.jsonl', '\n'.join(json.dumps(row) for row in rows))
+
+        output = self._import(path)
+
+        self.assertSetEqual({'existing', 'first', 'no_password'},
+                            set(UserModel.objects.values_list('username', flat=True)))
+        self.assertFalse(UserModel.objects.get(username='no_password').has_usable_password())
+        self.assertEqual(3, Profile.objects.count())
+        self.assertIn('Imported 2 users, skipped 4', output)
+
+    def test_import_users__when_names_taken_in_other_case__expect_rows_skipped(self):
+        rows = [
+            {'username': 'EXISTING', 'email': 'new@email.com', 'password': 'testp@ss'},
+            {'username': 'new', 'email': 'Existing@Email.com', 'password': 'testp@ss'},
+            {'username': 'first', 'email': 'first@email.com', 'password': 'testp@ss'},
+            {'username': 'First', 'email': 'other@email.com', 'password': 'testp@ss'},
+        ]
+        path = self._write_file('.jsonl', '\n'.join(json.dumps(row) for row in rows))
+
+        output = self._import(path)
+
+        self.assertSetEqual({'existing', 'first'}, set(UserModel.objects.values_list('username', flat=True)))
+        self.assertIn('Imported 1 users, skipped 3', output)
+
+    def test_import_users__when_hashing_processes_spawned__expect_passwords_hashed(self):
+        path = self._write_file('.csv', 'username,email,password\nfirst,first@email.com,firstp@ss')
+        spawning_executor = partial(ProcessPoolExecutor, mp_context=multiprocessing.get_context('spawn'))
+
+        with patch.object(import_users, 'ProcessPoolExecutor', spawning_executor):
+            output = self._import(path, '--workers', '1')
+
+        self.assertTrue(UserModel.objects.get(username='first').check_password('firstp@ss'))
+        self.assertIn('Imported 1 users, skipped 0', output)
+
+    def test_import_users__when_unknown_format__expect_command_error(self):
+        path = self._write_file('.txt', '')
+        with self.assertRaises(CommandError):
+            self._import(path)
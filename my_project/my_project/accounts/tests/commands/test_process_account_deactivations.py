@@ -0,0 +1,65 @@
+from io import StringIO
+
+from django import test as django_test
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+
+from my_project.accounts.models import AccountDeactivation
+from my_project.library.models import Book
+from my_project.offer.models import Offer, SwapMatch, CircularTrade, CircularTradeStep
+
+UserModel = get_user_model()
+
+
+class ProcessAccountDeactivationsCommandTest(django_test.TestCase):
+    NUMBER_OF_BOOKS = 5
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.USER = UserModel.objects.create_user(username='user', email='user@email.com', is_active=False)
+        cls.SECOND_USER = UserModel.objects.create_user(username='second_user', email='second_user@email.com')
+
+    def setUp(self):
+        Book.objects.bulk_create(Book(title=f'Book {i}', author=f'Author {i}', owner=self.USER)
+                                 for i in range(self.NUMBER_OF_BOOKS))
+        Book.objects.create(title='Other book', author='Other author', owner=self.SECOND_USER)
+        Offer.objects.create(sender=self.SECOND_USER, recipient=self.USER)
+        self.deactivation = AccountDeactivation.objects.create(user=self.USER, books_total=self.NUMBER_OF_BOOKS)
+
+    def test_process_account_deactivations__expect_books_untradable_offers_closed_and_finished(self):
+        out = StringIO()
+        call_command('process_account_deactivations', '--once', '--batch-size', '2', stdout=out)
+
+        self.deactivation.refresh_from_db()
+        self.assertTrue(self.deactivation.is_finished)
+        self.assertEqual(100, self.deactivation.progress)
+        self.assertEqual(self.NUMBER_OF_BOOKS, self.deactivation.books_done)
+        self.assertFalse(Book.objects.filter(owner=self.USER, is_tradable=True).exists())
+        self.assertTrue(Book.objects.get(owner=self.SECOND_USER).is_tradable)
+        self.assertFalse(Offer.objects.filter(is_active=True).exists())
+        self.assertIn('Finished 1 deactivations', out.getvalue())
+
+    def test_process_account_deactivations__after_one_batch__expect_progress(self):
+        from my_project.accounts import deactivation
+
+        deactivation.process_next(batch_size=2)
+
+        self.deactivation.refresh_from_db()
+        self.assertFalse(self.deactivation.is_finished)
+        self.assertEqual(40, self.deactivation.progress)
+        self.assertTrue(Offer.objects.filter(is_active=True).exists())
+
+    def test_process_account_deactivations__when_finished__expect_swap_matches_removed_and_trades_closed(self):
+        user_book = Book.objects.filter(owner=self.USER).first()
+        second_book = Book.objects.get(owner=self.SECOND_USER)
+        trade = CircularTrade.objects.create()
+        CircularTradeStep.objects.create(trade=trade, position=0, giver=self.USER, receiver=self.SECOND_USER,
+                                         book=user_book)
+        SwapMatch.objects.create(user=self.USER, counterpart=self.SECOND_USER, wanted_book=second_book,
+                                 wanted_books_count=1, offered_books_count=1, score=1)
+
+        call_command('process_account_deactivations', '--once', stdout=StringIO())
+
+        self.assertFalse(SwapMatch.objects.exists())
+        self.assertFalse(CircularTrade.objects.get(pk=trade.pk).is_active)
@@ -1,11 +1,17 @@
+from unittest import mock
+
 from django import test as django_test
 from django.contrib.auth import get_user_model
+from django.db import connection
 from django.db.models import Q
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
-from my_project.accounts.models import ContactForm, Profile
+from my_project.accounts import deactivation
+from my_project.accounts.models import ContactForm, Profile, AccountDeactivation
+from my_project.common.models import Notification
 from my_project.library.models import Book
-from my_project.offer.models import Offer
+from my_project.offer.models import Offer, SwapMatch, CircularTrade, CircularTradeStep
 
 UserModel = get_user_model()
 
@@ -136,6 +142,70 @@ class DeactivateUserViewTests(django_test.TestCase):
         self.assertFalse(any(offer.is_active for offer in user_offers))
         self.assertTrue(all(offer.is_active for offer in other_offers))
 
+    def test_deactivate_user__when_offers__expect_one_notification_for_every_other_user(self):
+        self._create_offers(3, self.USER, self.SECOND_USER)
+        self._create_offers(2, self.SECOND_USER, self.USER)
+        Notification.objects.all().delete()
+        self._login()
+
+        self.client.post(reverse('deactivate_user'))
+
+        notifications = list(Notification.objects.all())
+        self.assertEqual(1, len(notifications))
+        self.assertEqual(self.SECOND_USER, notifications[0].recipient)
+        self.assertIn('deactivated the account', notifications[0].massage)
+
+    def test_deactivate_user__when_more_books_and_offers__expect_same_number_of_queries(self):
+        def count_queries():
+            self._login()
+            with CaptureQueriesContext(connection) as queries:
+                self.client.post(reverse('deactivate_user'))
+            UserModel.objects.filter(pk=self.USER.pk).update(is_active=True)
+            return len(queries.captured_queries)
+
+        self._create_books(2, self.USER)
+        self._create_offers(2, self.USER, self.SECOND_USER)
+        few_queries = count_queries()
+        self._create_books(10, self.USER)
+        self._create_offers(10, self.USER, self.SECOND_USER)
+        self.assertEqual(few_queries, count_queries())
+
+    def test_deactivate_user__when_many_books__expect_left_to_worker_and_progress_shown(self):
+        self._create_books(5, self.USER)
+        self._create_offers(1, self.SECOND_USER, self.USER)
+        self._login()
+
+        with mock.patch.object(deactivation, 'BACKGROUND_BOOKS_THRESHOLD', 2):
+            response = self.client.post(reverse('deactivate_user'))
+
+        user_deactivation = AccountDeactivation.objects.get(user=self.USER)
+        self.assertFalse(UserModel.objects.get(pk=self.USER.pk).is_active)
+        self.assertEqual(5, user_deactivation.books_total)
+        self.assertEqual(5, Book.objects.filter(owner=self.USER, is_tradable=True).count())
+        response = self.client.get(response.url)
+        self.assertEqual(user_deactivation, response.context['deactivation'])
+        self.assertFalse(response.context['deactivation'].is_finished)
+
+    def test_deactivate_user__when_swap_matches_and_circular_trades__expect_matches_removed_and_trades_closed(self):
+        user_book = Book.objects.create(title='User book', author='Author', owner=self.USER)
+        second_book = Book.objects.create(title='Second book', author='Author', owner=self.SECOND_USER)
+        user_book.likes.add(self.SECOND_USER)
+        second_book.likes.add(self.USER)
+        trade = CircularTrade.objects.create()
+        CircularTradeStep.objects.create(trade=trade, position=0, giver=self.USER, receiver=self.SECOND_USER,
+                                         book=user_book)
+        self.assertTrue(SwapMatch.objects.exists())
+        self._login()
+
+        self.client.post(reverse('deactivate_user'))
+
+        self.assertFalse(SwapMatch.objects.exists())
+        self.assertFalse(CircularTrade.objects.get(pk=trade.pk).is_active)
+
+    def test_deactivation_progress__when_token_tampered__expect_404(self):
+        response = self.client.get(reverse('show_deactivation_progress', kwargs={'token': 'not-a-token'}))
+        self.assertEqual(404, response.status_code)
+
     def test_deactivate_user__when_no_authenticated_user__expect_redirect_to_login_with_next(self):
         response = self.client.get(reverse('deactivate_user'))
         redirect_url_with_next = f"{reverse('login_user')}?next={reverse('deactivate_user')}"
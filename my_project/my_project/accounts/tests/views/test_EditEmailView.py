@@ -1,7 +1,11 @@
+from unittest.mock import patch
+
 from django import test as django_test
 from django.contrib.auth import get_user_model
 from django.urls import reverse
 
+from my_project.accounts.views import EditEmailView
+
 UserModel = get_user_model()
 
 
@@ -55,3 +59,18 @@ class EditEmailViewTests(django_test.TestCase):
 
         redirect_url_with_next = f"{reverse('login_user')}?next={reverse('edit_email')}"
         self.assertRedirects(response, redirect_url_with_next, status_code=302, target_status_code=200)
+
+    def test_edit_email__when_notification_received_after_user_loaded__expect_unread_notifications_count_kept(self):
+        self.client.login(
+            username=self.CREDENTIALS.get('username'),
+            password=self.CREDENTIALS.get('password'),
+        )
+        stale_user = UserModel.objects.get(pk=self.USER.pk)
+        UserModel.objects.filter(pk=self.USER.pk).update(unread_notifications_count=1)
+
+        with patch.object(EditEmailView, 'get_object', return_value=stale_user):
+            self.client.post(reverse('edit_email'), data={'email': 'editeduser@email.com'})
+
+        user = UserModel.objects.get(pk=self.USER.pk)
+        self.assertEqual('editeduser@email.com', user.email)
+        self.assertEqual(1, user.unread_notifications_count)
@@ -3,7 +3,7 @@ from django.urls import path, include
 from my_project.accounts.views import RegisterUserView, DoneRegistrationView, LoginUserView, LogoutUserView, \
     MyResetPasswordView, MyPasswordResetDoneView, MyPasswordResetConfirmView, MyPasswordResetCompleteView, \
     MyPasswordChangeView, EditEmailView, EditProfileView, EditContactsView, AccountDetailsView, \
-    DeactivateUserView
+    DeactivateUserView, DeactivationProgressView
 
 urlpatterns = [
     path('registration/', RegisterUserView.as_view(), name='create_user'),
@@ -25,5 +25,6 @@ urlpatterns = [
     path('edit/contact/', EditContactsView.as_view(), name='edit_contacts'),
 
     path('deactivate/', DeactivateUserView.as_view(), name='deactivate_user'),
+    path('deactivate/progress/<str:token>/', DeactivationProgressView.as_view(), name='show_deactivation_progress'),
 
 ]
@@ -3,17 +3,17 @@ from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.auth.views import LoginView, LogoutView, PasswordResetView, PasswordResetConfirmView, \
     PasswordResetDoneView, PasswordResetCompleteView, PasswordChangeView
 # Create your views here.
-from django.db.models import Q
-from django.shortcuts import redirect
+from django.core import signing
+from django.http import Http404
+from django.shortcuts import redirect, get_object_or_404
 from django.urls import reverse_lazy
 from django.views.generic import CreateView, DetailView, TemplateView, UpdateView, DeleteView
 
 from my_project.accounts.forms import CreateUserForm, ProfileForm, MyLoginForm, MySetPasswordForm, EditEmailForm, \
     MyPasswordChangeForm, EditContactForm
 from my_project.accounts.helpers.custom_mixins import LogoutRequiredMixin
-from my_project.accounts.models import Profile, ContactForm
-from my_project.library.models import Book
-from my_project.offer.models import Offer
+from my_project.accounts.deactivation import deactivate_account
+from my_project.accounts.models import Profile, ContactForm, AccountDeactivation
 
 UserModel = get_user_model()
 
@@ -159,32 +159,23 @@ class DeactivateUserView(LoginRequiredMixin, DeleteView):
         return result
 
     def form_valid(self, form):
-        user = self.object
-        user.is_active = False
-        user.save()
-        books = Book.objects.prefetch_related('owner').filter(owner=user)
-        self._make_books_untradable(books)
-        offers = Offer.objects.prefetch_related('sender', 'recipient') \
-            .filter(Q(sender=user) | Q(recipient=user), is_active=True)
-        self._make_offer_inactive(offers)
-        self._delete_information(Profile, user)
-        self._delete_information(ContactForm, user)
+        deactivation = deactivate_account(self.object)
+        if deactivation:
+            token = signing.dumps(deactivation.pk, salt=DeactivationProgressView.SALT)
+            return redirect('show_deactivation_progress', token=token)
         return redirect(self.success_url)
 
-    @staticmethod
-    def _make_books_untradable(books):
-        for book in books:
-            book.is_tradable = False
-            book.save()
-
-    @staticmethod
-    def _make_offer_inactive(offers):
-        for offer in offers:
-            offer.is_active = False
-            offer.save()
-
-    @staticmethod
-    def _delete_information(my_model, user):
-        obj = my_model.objects.get(pk=user.pk)
-        obj.delete()
-        my_model(user=user).save()
+
+class DeactivationProgressView(TemplateView):
+    '''Progress of a deactivation left to the worker, for the user who is already logged out'''
+    template_name = 'accounts/deactivation_progress.html'
+    SALT = 'my_project.deactivation_progress'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        try:
+            pk = signing.loads(self.kwargs['token'], salt=self.SALT)
+        except signing.BadSignature:
+            raise Http404('Invalid deactivation')
+        context['deactivation'] = get_object_or_404(AccountDeactivation, pk=pk)
+        return context
@@ -1,7 +1,7 @@
 from django.contrib import admin
 
 # Register your models here.
-from my_project.common.models import Notification
+from my_project.common.models import Notification, ArchivedNotification
 
 
 @admin.register(Notification)
@@ -24,3 +24,12 @@ class NotificationAdmin(admin.ModelAdmin):
     def get_queryset(self, request):
         qs = super().get_queryset(request)
         return qs.prefetch_related('offer', 'book')
+
+
+@admin.register(ArchivedNotification)
+class ArchivedNotificationAdmin(admin.ModelAdmin):
+    list_display = ('id', 'received_date', 'massage', 'sender', 'recipient', 'archived_date')
+    list_display_links = ('id', 'massage')
+    list_per_page = 20
+    search_fields = ('massage',)
+    list_select_related = ('sender', 'recipient')
@@ -0,0 +1,140 @@
+'''
+Change feed of the notifications: wakes the open live notification requests of a user
+when notifications of the user are created, changed or read.
+
+On PostgreSQL the changes go through NOTIFY, and every process listens with one connection
+in one thread, so the waiting requests hold no connection and run no query while they wait.
+Elsewhere the changes only wake the requests of the same process.
+'''
+import asyncio
+import logging
+import select
+import threading
+import time
+from contextlib import contextmanager
+
+from django.db import connections, transaction
+
+CHANNEL = 'notifications_changed'
+PAYLOAD_CHUNK_SIZE = 500
+LISTEN_TIMEOUT = 5
+RECONNECT_DELAY = 1
+
+
+class ChangeFeed:
+    def __init__(self, alias='default', listen=True):
+        '''Without listen only the wakes of this process reach the waiting requests'''
+        self.alias = alias
+        self.listen = listen
+        self._waiters = {}
+        self._lock = threading.Lock()
+        self._listener = None
+
+    @property
+    def is_postgresql(self):
+        return connections[self.alias].vendor == 'postgresql'
+
+    def publish(self, user_pks):
+        user_pks = sorted(set(user_pks))
+        if not user_pks:
+            return
+        if not self.is_postgresql:
+            self.wake(user_pks)
+            return
+        with connections[self.alias].cursor() as cursor:
+            for i in range(0, len(user_pks), PAYLOAD_CHUNK_SIZE):
+                payload = ','.join(str(pk) for pk in user_pks[i:i + PAYLOAD_CHUNK_SIZE])
+                cursor.execute('SELECT pg_notify(%s, %s)', (CHANNEL, payload))
+
+    def publish_on_commit(self, user_pks):
+        user_pks = set(user_pks)
+        transaction.on_commit(lambda: self.publish(user_pks), using=self.alias)
+
+    @contextmanager
+    def subscribe(self, user_pk, listen=True):
+        '''
+        Future resolved by the next change of the user inside the block. Subscribe before reading the state,
+        so a change between the read and the wait is not lost. Callers which will not wait pass listen=False.
+        '''
+        if listen:
+            self._ensure_listener()
+        future = asyncio.get_running_loop().create_future()
+        with self._lock:
+            self._waiters.setdefault(user_pk, set()).add(future)
+        try:
+            yield future
+        finally:
+            with self._lock:
+                waiters = self._waiters.get(user_pk)
+                if waiters is not None:
+                    waiters.discard(future)
+                    if not waiters:
+                        del self._waiters[user_pk]
+
+    @staticmethod
+    async def wait_for(changed, timeout):
+        '''True when the future of subscribe is resolved before the timeout'''
+        if changed.done():
+            return True
+        if timeout <= 0:
+            return False
+        try:
+            await asyncio.wait_for(changed, timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    async def wait(self, user_pk, timeout):
+        '''True when the notifications of the user changed before the timeout'''
+        with self.subscribe(user_pk) as changed:
+            return await self.wait_for(changed, timeout)
+
+    def wake(self, user_pks):
+        '''Thread safe, the futures are resolved in the loops they belong to'''
+        with self._lock:
+            futures = [future for pk in user_pks for future in self._waiters.get(pk, ())]
+        for future in futures:
+            future.get_loop().call_soon_threadsafe(self._resolve, future)
+
+    @staticmethod
+    def _resolve(future):
+        if not future.done():
+            future.set_result(True)
+
+    def _ensure_listener(self):
+        if self._listener or not self.listen or not self.is_postgresql:
+            return
+        with self._lock:
+            if self._listener:
+                return
+            self._listener = threading.Thread(target=self._listen, name='notifications-change-feed', daemon=True)
+            self._listener.start()
+
+    def _listen(self):
+        import psycopg2
+
+        wrapper = connections[self.alias]
+        while True:
+            conn = None
+            try:
+                conn = psycopg2.connect(**wrapper.get_connection_params())
+                conn.autocommit = True
+                with conn.cursor() as cursor:
+                    cursor.execute(f'LISTEN {CHANNEL}')
+                while True:
+                    if select.select([conn], [], [], LISTEN_TIMEOUT) == ([], [], []):
+                        continue
+                    conn.poll()
+                    user_pks = set()
+                    while conn.notifies:
+                        user_pks.update(int(pk) for pk in conn.notifies.pop(0).payload.split(','))
+                    self.wake(user_pks)
+            except Exception:
+                logging.exception('Notifications change feed lost its connection')
+            finally:
+                if conn is not None:
+                    conn.close()
+            time.sleep(RECONNECT_DELAY)
+
+
+feed = ChangeFeed()
@@ -1,4 +1,9 @@
 from django.contrib.auth.mixins import UserPassesTestMixin
+from django.core.paginator import InvalidPage
+from django.http import Http404
+
+from my_project.common.helpers.custom_paginators import CursorPaginator, ProbePaginator
+from my_project.common.helpers.custom_wrapers import get_request_object, is_granted
 
 
 class RemoveHelpTextMixin:
@@ -18,16 +23,70 @@ class AddCCSMixin:
 
 
 class PaginationShowMixin:
+    '''
+    Paginate with a cursor (?cursor=<token>) by default.
+    Links with ?page=<number> and views without a cursor ordering use the offset paginator.
+    Neither of them counts the rows, set estimate_total to show an estimated number of pages.
+    '''
+    cursor_kwarg = 'cursor'
+    is_cursor_paginated = False
+    estimate_total = False
+
+    def paginate_queryset(self, queryset, page_size):
+        ordering = self.get_cursor_ordering(queryset)
+        if ordering is None or self.page_kwarg in self.request.GET:
+            return self.paginate_queryset_by_offset(queryset, page_size)
+        self.is_cursor_paginated = True
+        paginator = CursorPaginator(queryset, page_size, ordering)
+        page = paginator.page(self.request.GET.get(self.cursor_kwarg))
+        return paginator, page, page.object_list, page.has_other_pages()
+
+    def paginate_queryset_by_offset(self, queryset, page_size):
+        paginator = ProbePaginator(queryset, page_size, estimate_total=self.estimate_total)
+        page_number = self.kwargs.get(self.page_kwarg) or self.request.GET.get(self.page_kwarg) or 1
+        try:
+            page = paginator.page(page_number)
+        except InvalidPage as ex:
+            raise Http404(f'Invalid page ({page_number}): {ex}')
+        return paginator, page, page.object_list, page.has_other_pages()
+
+    def get_cursor_ordering(self, queryset):
+        ordering = list(queryset.query.order_by or queryset.model._meta.ordering)
+        if not queryset.query.standard_ordering or not all(isinstance(field, str) for field in ordering):
+            return None
+        if not ordering or ordering[-1].lstrip('-') not in ('pk', queryset.model._meta.pk.name):
+            tie_breaker = '-pk' if ordering and ordering[-1].startswith('-') else 'pk'
+            ordering.append(tie_breaker)
+        return ordering
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        query_set = self.get_queryset()
-        if len(query_set) > self.paginate_by:
-            context['see_more'] = True
+        context['cursor_pagination'] = self.is_cursor_paginated
+        context['see_more'] = context['is_paginated']
         return context
 
 
-class AuthorizationRequiredMixin(UserPassesTestMixin):
+class RequestObjectMixin:
+    '''
+    Fetch the object of a single object view only once per request,
+    however many times get_object is called. related_fields are selected with it.
+    '''
+    related_fields = ()
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.related_fields:
+            queryset = queryset.select_related(*self.related_fields)
+        return queryset
+
+    def get_object(self, queryset=None):
+        pk = self.kwargs.get(self.pk_url_kwarg)
+        if queryset is not None or pk is None:
+            return super().get_object(queryset)
+        return get_request_object(self.request, self.get_queryset(), pk)
+
+
+class AuthorizationRequiredMixin(RequestObjectMixin, UserPassesTestMixin):
     def test_func(self):
         obj = self.get_object()
-        authorized_users = [getattr(obj, field) for field in self.authorizing_fields]
-        return self.request.user in authorized_users
+        return is_granted(self.request.user, obj, self.authorizing_fields)
@@ -0,0 +1,16 @@
+class StoredCountersMixin:
+    '''
+    Counters kept by queryset updates are never written back from an instance:
+    a full save of a stored row saves every other field, so a stale counter loaded
+    before a concurrent update cannot overwrite it. Deferred fields stay out too, as in Model.save.
+    '''
+    stored_counters = ()
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding and self.pk is not None and not args and kwargs.get('update_fields') is None:
+            deferred = self.get_deferred_fields()
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.stored_counters and field.attname not in deferred
+            ]
+        super().save(*args, **kwargs)
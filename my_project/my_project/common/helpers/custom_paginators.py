@@ -0,0 +1,222 @@
+import datetime
+import math
+from decimal import Decimal
+
+from django.core import signing
+from django.core.paginator import PageNotAnInteger, EmptyPage
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+
+def fetch_with_probe(queryset, per_page):
+    '''Fetch one row more than the page needs, to know if there is a next page without counting'''
+    rows = list(queryset[:per_page + 1])
+    return rows[:per_page], len(rows) > per_page
+
+
+def serve_from_rows(queryset, rows):
+    '''Keep the page a queryset, but serve it from the rows already fetched'''
+    queryset._result_cache = rows
+    queryset._prefetch_done = True
+    return queryset
+
+
+def estimate_count(queryset):
+    '''Row estimate from PostgreSQL statistics, None on other databases'''
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+    with connection.cursor() as cursor:
+        if not queryset.query.where:
+            cursor.execute('SELECT reltuples FROM pg_class WHERE oid = %s::regclass',
+                           (queryset.model._meta.db_table,))
+            row = cursor.fetchone()
+            estimate = row[0] if row else -1
+        else:
+            sql, params = queryset.query.sql_with_params()
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+            estimate = cursor.fetchone()[0][0]['Plan']['Plan Rows']
+    return int(estimate) if estimate >= 0 else None
+
+
+class ProbePage:
+    def __init__(self, object_list, paginator, number, has_next):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.number = number
+        self._has_next = has_next
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self.number > 1
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+    def next_page_number(self):
+        return self.number + 1
+
+    def previous_page_number(self):
+        return self.number - 1
+
+
+class ProbePaginator:
+    '''
+    Offset pagination which never counts the rows.
+    The total is only known as an estimate, and only if estimate_total is set.
+    '''
+
+    def __init__(self, queryset, per_page, estimate_total=False):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.estimate_total = estimate_total
+
+    def page(self, number):
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger('That page number is not an integer')
+        if number < 1:
+            raise EmptyPage('That page number is less than 1')
+        bottom = (number - 1) * self.per_page
+        rows, has_next = fetch_with_probe(self.queryset[bottom:], self.per_page)
+        if not rows and number > 1:
+            raise EmptyPage('That page contains no results')
+        object_list = serve_from_rows(self.queryset[bottom:bottom + self.per_page], rows)
+        return ProbePage(object_list, self, number, has_next)
+
+    @cached_property
+    def count(self):
+        if not self.estimate_total:
+            return None
+        return estimate_count(self.queryset)
+
+    @cached_property
+    def num_pages(self):
+        if not self.count:
+            return None
+        return math.ceil(self.count / self.per_page)
+
+
+class CursorPage:
+    def __init__(self, object_list, paginator, has_next, has_previous):
+        self.object_list = object_list
+        self.paginator = paginator
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+    @property
+    def next_cursor(self):
+        if not self._has_next:
+            return None
+        return self.paginator.encode_cursor(CursorPaginator.NEXT, self.object_list[len(self) - 1])
+
+    @property
+    def previous_cursor(self):
+        if not self._has_previous:
+            return None
+        return self.paginator.encode_cursor(CursorPaginator.PREVIOUS, self.object_list[0])
+
+
+class CursorPaginator:
+    '''
+    Keyset pagination: a page is found by comparing the ordering fields against
+    the row it starts after, so deep pages cost the same as the first one and
+    rows inserted meanwhile do not shift the pages.
+    The ordering has to be total, so it should end with the primary key,
+    and its fields must not be null.
+    '''
+    NEXT = 'n'
+    PREVIOUS = 'p'
+    SALT = 'my_project.cursor_pagination'
+
+    def __init__(self, queryset, per_page, ordering):
+        if not queryset.query.standard_ordering:
+            queryset = queryset.reverse()
+        self.ordering = [(field.lstrip('-'), field.startswith('-')) for field in ordering]
+        self.queryset = queryset.order_by(*ordering)
+        self.per_page = per_page
+
+    def page(self, cursor=None):
+        direction, values = self.decode_cursor(cursor)
+        if direction == self.PREVIOUS:
+            reversed_ordering = [(field, not descending) for field, descending in self.ordering]
+            rows = list(self.queryset.filter(self._after(values, reversed_ordering))
+                        .order_by(*self._order_by(reversed_ordering))[:self.per_page + 1])
+            has_previous = len(rows) > self.per_page
+            rows = rows[:self.per_page][::-1]
+            has_next = True
+        else:
+            queryset = self.queryset if values is None else self.queryset.filter(self._after(values, self.ordering))
+            rows, has_next = fetch_with_probe(queryset, self.per_page)
+            has_previous = values is not None
+        object_list = serve_from_rows(self.queryset.filter(pk__in=[row.pk for row in rows]), rows)
+        return CursorPage(object_list, self, has_next, has_previous)
+
+    def encode_cursor(self, direction, obj):
+        values = [self._serialize(self._get_value(obj, field)) for field, _ in self.ordering]
+        return signing.dumps([direction, values], salt=self.SALT, compress=True)
+
+    def decode_cursor(self, cursor):
+        if not cursor:
+            return self.NEXT, None
+        try:
+            direction, values = signing.loads(cursor, salt=self.SALT)
+        except (signing.BadSignature, TypeError, ValueError):
+            return self.NEXT, None
+        if direction not in (self.NEXT, self.PREVIOUS) \
+                or not isinstance(values, list) or len(values) != len(self.ordering):
+            return self.NEXT, None
+        return direction, values
+
+    @staticmethod
+    def _after(values, ordering):
+        condition = Q()
+        equal = Q()
+        for (field, descending), value in zip(ordering, values):
+            lookup = 'lt' if descending else 'gt'
+            condition |= equal & Q(**{f'{field}__{lookup}': value})
+            equal &= Q(**{field: value})
+        return condition
+
+    @staticmethod
+    def _order_by(ordering):
+        return [f'-{field}' if descending else field for field, descending in ordering]
+
+    @staticmethod
+    def _get_value(obj, field):
+        for attr in field.split('__'):
+            obj = getattr(obj, attr)
+        return obj
+
+    @staticmethod
+    def _serialize(value):
+        if isinstance(value, (datetime.date, datetime.time)):
+            return value.isoformat()
+        if isinstance(value, Decimal):
+            return str(value)
+        return value
@@ -0,0 +1,27 @@
+from django import forms
+
+
+class LazySelectMultiple(forms.SelectMultiple):
+    '''
+    Render only the selected options, the others are loaded page by page from data-url
+    by lazy_select.js, so the size of the page does not depend on the number of choices.
+    The choices are still validated by the field's queryset.
+    '''
+
+    class Media:
+        js = ('js/lazy_select.js',)
+
+    def __init__(self, url=None, attrs=None):
+        super().__init__(attrs)
+        if url:
+            self.attrs['data-url'] = url
+
+    def optgroups(self, name, value, attrs=None):
+        choices = self.choices
+        field = choices.field
+        selected = field.queryset.filter(pk__in=[pk for pk in value if pk.isdigit()])
+        self.choices = [(field.prepare_value(obj), field.label_from_instance(obj)) for obj in selected]
+        try:
+            return super().optgroups(name, value, attrs)
+        finally:
+            self.choices = choices
@@ -11,11 +11,25 @@ def staff_required(func):
     return wrapper
 
 
+def get_request_object(request, queryset, pk):
+    '''get_object_or_404 which fetches each object only once per request'''
+    cache = request.__dict__.setdefault('_objects_cache', {})
+    key = (queryset.model._meta.label, str(pk))
+    if key not in cache:
+        cache[key] = get_object_or_404(queryset, pk=pk)
+    return cache[key]
+
+
+def is_granted(user, obj, access_grant_fields):
+    '''Compare the foreign keys' ids, so the related users are not loaded'''
+    return any(user.pk == getattr(obj, obj._meta.get_field(field).attname) for field in access_grant_fields)
+
+
 def access_required(Model, *access_grant_fields):
     def decorator(function):
         def wrapper(request, pk):
-            my_obj = get_object_or_404(Model, pk=pk)
-            has_access = any(request.user == getattr(my_obj, field) for field in access_grant_fields)
+            my_obj = get_request_object(request, Model._default_manager.all(), pk)
+            has_access = is_granted(request.user, my_obj, access_grant_fields)
             if not has_access:
                 raise PermissionDenied()
             result = function(request, pk, my_obj)
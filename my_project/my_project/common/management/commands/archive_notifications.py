@@ -0,0 +1,32 @@
+import datetime
+
+from django.core.management import BaseCommand
+
+from my_project.common.models import Notification
+
+
+class Command(BaseCommand):
+    help = 'Move the read and answered notifications older than --older-than-days to the archive table'
+
+    DEFAULT_BATCH_SIZE = 5000
+    DEFAULT_OLDER_THAN_DAYS = 90
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=self.DEFAULT_BATCH_SIZE)
+        parser.add_argument('--older-than-days', type=int, default=self.DEFAULT_OLDER_THAN_DAYS)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        older_than = datetime.timedelta(days=options['older_than_days'])
+        last_pk = 0
+        archived = 0
+        while True:
+            pks = list(Notification.objects.archivable(older_than)
+                       .filter(pk__gt=last_pk)
+                       .order_by('pk')
+                       .values_list('pk', flat=True)[:batch_size])
+            if not pks:
+                break
+            archived += Notification.objects.filter(pk__in=pks).archive()
+            last_pk = pks[-1]
+        self.stdout.write(self.style.SUCCESS(f'Archived {archived} notifications'))
@@ -0,0 +1,30 @@
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.core.management import BaseCommand, CommandError
+
+from my_project.common.models import Notification
+
+UserModel = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Send a notification to all active users, or only to the ones of --city or --without-books'
+
+    def add_arguments(self, parser):
+        parser.add_argument('massage')
+        parser.add_argument('--sender', required=True, help='Username of the sender')
+        parser.add_argument('--city')
+        parser.add_argument('--without-books', action='store_true')
+        parser.add_argument('--batch-size', type=int, default=Notification.BROADCAST_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        try:
+            sender = UserModel.objects.get(username=options['sender'])
+        except UserModel.DoesNotExist:
+            raise CommandError(f'User "{options["sender"]}" does not exist')
+        recipients = UserModel.objects.segment(city=options['city'], without_books=options['without_books'])
+        try:
+            sent = Notification.broadcast(sender, options['massage'], recipients, batch_size=options['batch_size'])
+        except ValidationError as ex:
+            raise CommandError(f'Invalid notification: {ex}')
+        self.stdout.write(self.style.SUCCESS(f'Sent {sent} notifications'))
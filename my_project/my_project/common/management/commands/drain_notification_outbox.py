@@ -0,0 +1,31 @@
+import time
+
+from django.core.management import BaseCommand
+
+from my_project.common.models import NotificationOutbox
+
+
+class Command(BaseCommand):
+    help = 'Create the notifications waiting in the outbox, in batches, until stopped'
+
+    DEFAULT_BATCH_SIZE = 500
+    DEFAULT_INTERVAL = 1.0
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=self.DEFAULT_BATCH_SIZE)
+        parser.add_argument('--interval', type=float, default=self.DEFAULT_INTERVAL,
+                            help='Seconds to wait when the outbox is empty')
+        parser.add_argument('--once', action='store_true', help='Stop when the outbox is empty')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        drained_total = 0
+        while True:
+            drained = NotificationOutbox.objects.drain(batch_size)
+            drained_total += drained
+            if drained:
+                continue
+            if options['once']:
+                break
+            time.sleep(options['interval'])
+        self.stdout.write(self.style.SUCCESS(f'Drained {drained_total} outbox entries'))
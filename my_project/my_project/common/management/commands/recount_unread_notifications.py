@@ -0,0 +1,29 @@
+from django.contrib.auth import get_user_model
+from django.core.management import BaseCommand
+
+from my_project.common.models import Notification
+
+UserModel = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Backfill or repair the stored unread notifications counter of every user'
+
+    DEFAULT_BATCH_SIZE = 5000
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=self.DEFAULT_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        last_pk = 0
+        updated = 0
+        while True:
+            pks = list(UserModel.objects.filter(pk__gt=last_pk)
+                       .order_by('pk')
+                       .values_list('pk', flat=True)[:batch_size])
+            if not pks:
+                break
+            updated += Notification.objects.refresh_unread_counts(pks)
+            last_pk = pks[-1]
+        self.stdout.write(self.style.SUCCESS(f'Recounted unread notifications of {updated} users'))
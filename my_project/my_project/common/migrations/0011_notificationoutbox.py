@@ -0,0 +1,30 @@
+# Generated by Django 4.0.10 on 2026-10-18 13:22
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library', '0031_book_search_indexes'),
+        ('offer', '0010_circulartrade'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('common', '0010_remove_notification_type_notification_massage_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationOutbox',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('offer_made', 'Offer made'), ('offer_reply', 'Offer reply'), ('like', 'Like'), ('dislike', 'Dislike')], max_length=16)),
+                ('created_date', models.DateTimeField(auto_now_add=True)),
+                ('book', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='library.book')),
+                ('offer', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='offer.offer')),
+                ('recipient', models.ForeignKey(on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('sender', models.ForeignKey(on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
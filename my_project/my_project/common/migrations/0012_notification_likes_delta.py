@@ -0,0 +1,18 @@
+# Generated by Django 4.0.10 on 2026-10-18 13:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('common', '0011_notificationoutbox'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notification',
+            name='likes_delta',
+            field=models.IntegerField(default=0),
+        ),
+    ]
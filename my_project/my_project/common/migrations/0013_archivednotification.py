@@ -0,0 +1,58 @@
+# Generated by Django 4.0.10 on 2026-10-18 13:26
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('offer', '0010_circulartrade'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('library', '0031_book_search_indexes'),
+        ('common', '0012_notification_likes_delta'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedNotification',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('massage', models.TextField()),
+                ('received_date', models.DateTimeField()),
+                ('archived_date', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['-received_date'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['recipient', '-received_date'], name='common_notf_recipient_idx'),
+        ),
+        migrations.AddField(
+            model_name='archivednotification',
+            name='book',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='library.book'),
+        ),
+        migrations.AddField(
+            model_name='archivednotification',
+            name='offer',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='offer.offer'),
+        ),
+        migrations.AddField(
+            model_name='archivednotification',
+            name='recipient',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.DO_NOTHING, related_name='archived_messages', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='archivednotification',
+            name='sender',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='archivednotification',
+            index=models.Index(fields=['recipient', '-received_date'], name='common_archive_recipient_idx'),
+        ),
+    ]
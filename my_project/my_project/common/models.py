@@ -1,8 +1,15 @@
+import datetime
+
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.db import models
-from django.db.models import QuerySet
+from django.core.exceptions import ValidationError
+from django.db import models, transaction
+from django.db.models import QuerySet, Subquery, OuterRef, Count, Value, F
+from django.db.models.functions import Coalesce
 from django.urls import reverse_lazy
+from django.utils import timezone
 
+from my_project.common.change_feed import feed
 from my_project.library.models import Book
 from my_project.offer.models import Offer
 
@@ -13,6 +20,81 @@ class NotificationQueryset(QuerySet):
     def unread(self):
         return self.filter(is_read=False)
 
+    def refresh_unread_counts(self, user_pks):
+        '''Recount the stored unread notifications of the users with one UPDATE'''
+        unread = self.model.objects.unread().filter(recipient=OuterRef('pk')) \
+            .order_by() \
+            .values('recipient') \
+            .annotate(total=Count('pk')) \
+            .values('total')
+        updated = UserModel.objects.filter(pk__in=user_pks) \
+            .update(unread_notifications_count=Coalesce(Subquery(unread), Value(0)))
+        feed.publish_on_commit(user_pks)
+        return updated
+
+    def mark_read(self):
+        '''Mark the notifications read with one UPDATE, then recount the counters of their recipients'''
+        with transaction.atomic():
+            unread = self.unread()
+            user_pks = set(unread.order_by().values_list('recipient', flat=True).distinct())
+            updated = unread.update(is_read=True)
+            if updated:
+                self.refresh_unread_counts(user_pks)
+        return updated
+
+    def validate_in_bulk(self, notifications):
+        '''
+        full_clean of the notifications without a SELECT per foreign key of every row:
+        the foreign keys which are set are checked together, with one IN query per related model
+        '''
+        foreign_keys = [field for field in self.model._meta.concrete_fields if field.is_relation]
+        referenced = {}
+        for notf in notifications:
+            set_keys = [field for field in foreign_keys if getattr(notf, field.attname) is not None]
+            notf.full_clean(exclude=[field.name for field in set_keys], validate_unique=False)
+            for field in set_keys:
+                key = (field.related_model, field.remote_field.field_name)
+                referenced.setdefault(key, {}).setdefault(getattr(notf, field.attname), field)
+
+        for (model, field_name), fields_by_value in referenced.items():
+            existing = set(model._base_manager.using(self.db)
+                           .filter(**{f'{field_name}__in': fields_by_value})
+                           .values_list(field_name, flat=True))
+            for value, field in fields_by_value.items():
+                if value not in existing:
+                    raise ValidationError({field.name: ValidationError(
+                        field.error_messages['invalid'],
+                        code='invalid',
+                        params={
+                            'model': model._meta.verbose_name,
+                            'pk': value,
+                            'field': field_name,
+                            'value': value,
+                        },
+                    )})
+
+    def mark_answered(self):
+        '''
+        Only the notifications which ask for nothing anymore: a book sent without a deal and an active offer
+        are answered by accepting or rejecting them, so their actions are not hidden
+        '''
+        return self.filter(is_answered=False) \
+            .exclude(offer__isnull=True, book__isnull=False) \
+            .exclude(offer__is_active=True) \
+            .update(is_answered=True)
+
+    def archivable(self, older_than):
+        '''Read and answered notifications received more than older_than ago'''
+        return self.filter(is_read=True, is_answered=True, received_date__lt=timezone.now() - older_than)
+
+    def archive(self):
+        '''Move the notifications to the archive table with one insert and one delete, in one transaction'''
+        with transaction.atomic():
+            rows = list(self.select_for_update().values(*ArchivedNotification.COPIED_FIELDS))
+            ArchivedNotification.objects.bulk_create(ArchivedNotification(**row) for row in rows)
+            self.model.objects.filter(pk__in=[row['id'] for row in rows]).delete()
+        return len(rows)
+
 
 class Notification(models.Model):
     objects = NotificationQueryset.as_manager()
@@ -52,12 +134,23 @@ class Notification(models.Model):
         default=False
     )
 
+    '''Likes minus dislikes folded into a rolling like notification, 0 for the other notifications'''
+    likes_delta = models.IntegerField(
+        default=0,
+    )
+
     received_date = models.DateTimeField(
         auto_now_add=True,
     )
 
+    LIKES_WINDOW = datetime.timedelta(hours=1)
+    BROADCAST_BATCH_SIZE = 5000
+
     class Meta:
         ordering = ['-received_date']
+        indexes = [
+            models.Index(fields=['recipient', '-received_date'], name='common_notf_recipient_idx'),
+        ]
 
     def __str__(self):
         return self.massage
@@ -66,26 +159,38 @@ class Notification(models.Model):
         return reverse_lazy('notification_details', kwargs={"pk": self.pk})
 
     def answer(self):
+        '''Save only the flag, a stale is_read must not overwrite the stored one'''
         self.is_answered = True
-        self.save()
+        self.save(update_fields=['is_answered'])
+
+    def mark_read(self):
+        '''Only the request which really changes the flag takes the notification off the counter'''
+        if self.is_read:
+            return
+        self.is_read = True
+        if Notification.objects.filter(pk=self.pk, is_read=False).update(is_read=True):
+            UserModel.objects.filter(pk=self.recipient_id, unread_notifications_count__gt=0) \
+                .update(unread_notifications_count=F('unread_notifications_count') - 1)
+            feed.publish_on_commit({self.recipient_id})
 
     @classmethod
-    def create_notification(cls, massage, **kwargs):
+    def create_notification(cls, massage, commit=True, **kwargs):
+        '''With commit=False the notification is only built, to be saved in bulk'''
         kwargs.update({'massage': massage})
         notf = cls(**kwargs)
-        notf.full_clean()
-        notf.save()
+        if commit:
+            cls.create_notifications_in_bulk([notf])
         return notf
 
     @classmethod
-    def create_notification_for_offer_made(cls, kwargs):
+    def create_notification_for_offer_made(cls, kwargs, commit=True):
         offer = kwargs.get('offer')
         sender = kwargs.get('sender')
         massage = f'{sender} makes {offer} to you'
-        return cls.create_notification(massage, **kwargs)
+        return cls.create_notification(massage, commit=commit, **kwargs)
 
     @classmethod
-    def create_notification_for_offer_offer_reply(cls, kwargs):
+    def create_notification_for_offer_offer_reply(cls, kwargs, commit=True):
         offer = kwargs.get('offer')
         sender = kwargs.get('sender')
         massage = f"Your {offer} to {sender} was rejected or canceled"
@@ -93,20 +198,294 @@ class Notification(models.Model):
             massage = f"{sender} accepted your {offer}"
 
         kwargs.update({'is_answered': True})
-        return cls.create_notification(massage, **kwargs)
+        return cls.create_notification(massage, commit=commit, **kwargs)
 
     @classmethod
-    def create_notification_for_deleted_book(cls, kwargs):
+    def create_notification_for_deleted_book(cls, kwargs, commit=True):
         book = kwargs.get('book')
         sender = kwargs.get('sender')
         massage = f'{sender} send {book} to you without deal between you?'
-        return cls.create_notification(massage, **kwargs)
+        return cls.create_notification(massage, commit=commit, **kwargs)
 
     @classmethod
-    def create_notification_for_like_or_dislike(cls, action, kwargs):
+    def create_notification_for_like_or_dislike(cls, action, kwargs, commit=True):
         book = kwargs.get('book')
         sender = kwargs.get('sender')
-        massage = f'{sender} {action}s your book {book}'
+        likes_delta = kwargs.setdefault('likes_delta', 1 if action == 'like' else -1)
+        massage = cls.get_likes_massage(sender, book, likes_delta)
         kwargs.update({'is_answered': True})
 
-        return cls.create_notification(massage, **kwargs)
+        return cls.create_notification(massage, commit=commit, **kwargs)
+
+    @staticmethod
+    def get_likes_massage(sender, book, likes_delta):
+        '''Without a sender only the count is told'''
+        action = 'like' if likes_delta > 0 else 'dislike'
+        if abs(likes_delta) == 1 and sender is not None:
+            return f'{sender} {action}s your book {book}'
+        if abs(likes_delta) == 1:
+            return f'1 person {action}s your book {book}'
+        return f'{abs(likes_delta)} people {action} your book {book}'
+
+    @classmethod
+    def add_likes(cls, likes):
+        '''
+        Fold likes into one rolling notification per book and owner, opened by the first like
+        and kept for LIKES_WINDOW while it is unread. likes are (book, recipient, sender, +1 or -1),
+        so a like and an unlike in the same window cancel out and the notification is removed.
+        Likes which move the count the way it points make their last user the sender,
+        otherwise the sender is kept and the massage tells only the count.
+        '''
+        if not likes:
+            return []
+        folded = {}
+        for book, recipient, sender, delta in likes:
+            key = (book.pk, recipient.pk)
+            _, _, senders, likes_delta = folded.get(key, (None, None, {}, 0))
+            folded[key] = (book, recipient, {**senders, delta: sender}, likes_delta + delta)
+
+        with transaction.atomic():
+            open_notifications = cls.objects.select_for_update().filter(
+                book__in={book_pk for book_pk, _ in folded},
+                recipient__in={recipient_pk for _, recipient_pk in folded},
+                is_read=False,
+                received_date__gte=timezone.now() - cls.LIKES_WINDOW,
+            ).exclude(likes_delta=0).order_by('received_date')
+            rolling = {(notf.book_id, notf.recipient_id): notf for notf in open_notifications}
+
+            new_notifications = []
+            for key, (book, recipient, senders, delta) in folded.items():
+                notf = rolling.get(key)
+                if not delta:
+                    continue
+                sender = senders[1 if delta > 0 else -1]
+                if not notf:
+                    new_notifications.append(cls.create_notification_for_like_or_dislike(
+                        None, {'sender': sender, 'recipient': recipient, 'book': book, 'likes_delta': delta},
+                        commit=False))
+                    continue
+                notf.likes_delta += delta
+                if not notf.likes_delta:
+                    notf.delete()
+                    continue
+                if (delta > 0) == (notf.likes_delta > 0):
+                    notf.sender = sender
+                else:
+                    sender = None
+                notf.massage = cls.get_likes_massage(sender, book, notf.likes_delta)
+                notf.save(update_fields=['sender', 'massage', 'likes_delta'])
+                feed.publish_on_commit({notf.recipient_id})
+            return cls.create_notifications_in_bulk(new_notifications)
+
+    @classmethod
+    def create_notifications_for_closed_offers(cls, offers, reason='Books changed hands', skip_user_pk=None):
+        '''One notification for every user of the offers but skip_user_pk, with all of their offers which were closed'''
+        offers_by_user = {}
+        for offer in offers:
+            offers_by_user.setdefault(offer.sender_id, []).append((offer, offer.recipient_id))
+            offers_by_user.setdefault(offer.recipient_id, []).append((offer, offer.sender_id))
+        offers_by_user.pop(skip_user_pk, None)
+
+        notifications = []
+        for user_pk, user_offers in offers_by_user.items():
+            offer, counterpart_pk = user_offers[0]
+            closed_offers = ', '.join(str(offer) for offer, _ in user_offers)
+            notifications.append(cls(
+                sender_id=counterpart_pk,
+                recipient_id=user_pk,
+                offer=offer if len(user_offers) == 1 else None,
+                massage=f'{reason}, so these offers were closed: {closed_offers}',
+                is_answered=True,
+            ))
+        cls.objects.filter(offer__in=offers, is_answered=False).update(is_answered=True)
+        return cls.create_notifications_in_bulk(notifications)
+
+    @classmethod
+    def broadcast(cls, sender, massage, recipients, batch_size=BROADCAST_BATCH_SIZE):
+        '''
+        One notification from sender to every active user of recipients, a queryset of users.
+        Only the pks of the users are read, batch by batch in pk order, and every batch is one bulk insert.
+        The sender and the massage are the same for all of them, so they are validated only once.
+        '''
+        cls.objects.validate_in_bulk([cls(sender=sender, recipient=sender, massage=massage)])
+        recipient_pks = recipients.filter(is_active=True) \
+            .exclude(pk=sender.pk) \
+            .order_by('pk') \
+            .values_list('pk', flat=True)
+        last_pk = 0
+        sent = 0
+        while True:
+            pks = list(recipient_pks.filter(pk__gt=last_pk)[:batch_size])
+            if not pks:
+                break
+            with transaction.atomic():
+                cls.create_notifications_in_bulk(
+                    [cls(sender=sender, recipient_id=pk, massage=massage, is_answered=True) for pk in pks],
+                    validate=False,
+                )
+            sent += len(pks)
+            last_pk = pks[-1]
+        return sent
+
+    @classmethod
+    def create_notifications_in_bulk(cls, notifications, validate=True, batch_size=None):
+        '''
+        Validated with a few queries for all of the notifications, inserted with bulk_create,
+        and the unread counters of their recipients recounted with one UPDATE
+        '''
+        notifications = list(notifications)
+        if validate:
+            cls.objects.validate_in_bulk(notifications)
+        notifications = cls.objects.bulk_create(notifications, batch_size=batch_size)
+        cls.objects.refresh_unread_counts({notf.recipient_id for notf in notifications})
+        return notifications
+
+
+class ArchivedNotification(models.Model):
+    '''Old notifications moved out of the notifications table by the archive_notifications command'''
+    COPIED_FIELDS = ('id', 'sender_id', 'recipient_id', 'book_id', 'offer_id', 'massage', 'received_date')
+
+    sender = models.ForeignKey(
+        UserModel,
+        on_delete=models.DO_NOTHING,
+        related_name='+',
+    )
+    recipient = models.ForeignKey(
+        UserModel,
+        on_delete=models.DO_NOTHING,
+        related_name='archived_messages',
+    )
+
+    book = models.ForeignKey(
+        Book,
+        on_delete=models.DO_NOTHING,
+        null=True,
+        blank=True,
+        related_name='+',
+    )
+
+    offer = models.ForeignKey(
+        Offer,
+        on_delete=models.DO_NOTHING,
+        null=True,
+        blank=True,
+        related_name='+',
+    )
+
+    massage = models.TextField()
+
+    received_date = models.DateTimeField()
+
+    archived_date = models.DateTimeField(
+        auto_now_add=True,
+    )
+
+    class Meta:
+        ordering = ['-received_date']
+        indexes = [
+            models.Index(fields=['recipient', '-received_date'], name='common_archive_recipient_idx'),
+        ]
+
+    def __str__(self):
+        return self.massage
+
+
+class NotificationOutboxQueryset(QuerySet):
+    def drain(self, batch_size):
+        '''
+        Turn the oldest entries into notifications with one bulk insert and delete them, in one transaction.
+        Entries locked by another worker are skipped, so workers can run side by side.
+        '''
+        with transaction.atomic():
+            entries = list(self.select_for_update(skip_locked=True, of=('self',))
+                           .select_related('sender', 'recipient', 'book', 'offer__previous_offer')
+                           .order_by('pk')[:batch_size])
+            if not entries:
+                return 0
+            self.model.deliver(entries)
+            self.filter(pk__in=[entry.pk for entry in entries]).delete()
+        return len(entries)
+
+
+class NotificationOutbox(models.Model):
+    '''
+    Notifications to create, written in the transaction of the change they are about
+    and created later by the drain_notification_outbox worker.
+    '''
+    objects = NotificationOutboxQueryset.as_manager()
+
+    KIND_MAX_LENGTH = 16
+
+    class KindChoices(models.TextChoices):
+        OFFER_MADE = 'offer_made', 'Offer made'
+        OFFER_REPLY = 'offer_reply', 'Offer reply'
+        LIKE = 'like', 'Like'
+        DISLIKE = 'dislike', 'Dislike'
+
+    kind = models.CharField(
+        max_length=KIND_MAX_LENGTH,
+        choices=KindChoices.choices,
+    )
+
+    sender = models.ForeignKey(
+        UserModel,
+        on_delete=models.DO_NOTHING,
+        related_name='+',
+    )
+    recipient = models.ForeignKey(
+        UserModel,
+        on_delete=models.DO_NOTHING,
+        related_name='+',
+    )
+
+    book = models.ForeignKey(
+        Book,
+        on_delete=models.DO_NOTHING,
+        null=True,
+        blank=True,
+        related_name='+',
+    )
+
+    offer = models.ForeignKey(
+        Offer,
+        on_delete=models.DO_NOTHING,
+        null=True,
+        blank=True,
+        related_name='+',
+    )
+
+    created_date = models.DateTimeField(
+        auto_now_add=True,
+    )
+
+    LIKE_KINDS = (KindChoices.LIKE, KindChoices.DISLIKE)
+
+    @classmethod
+    def enqueue(cls, kind, **kwargs):
+        '''Without settings.NOTIFICATIONS_OUTBOX the notification is created at once'''
+        entry = cls(kind=kind, **kwargs)
+        if not settings.NOTIFICATIONS_OUTBOX:
+            cls.deliver([entry])
+        else:
+            entry.save()
+        return entry
+
+    @classmethod
+    def deliver(cls, entries):
+        '''Likes and dislikes go into the rolling like notifications, the rest into new ones'''
+        Notification.create_notifications_in_bulk(
+            [entry.to_notification() for entry in entries if entry.kind not in cls.LIKE_KINDS])
+        Notification.add_likes(
+            [(entry.book, entry.recipient, entry.sender, 1 if entry.kind == cls.KindChoices.LIKE else -1)
+             for entry in entries if entry.kind in cls.LIKE_KINDS])
+
+    def to_notification(self):
+        kwargs = {
+            'sender': self.sender,
+            'recipient': self.recipient,
+            'book': self.book,
+            'offer': self.offer,
+        }
+        if self.kind == self.KindChoices.OFFER_MADE:
+            return Notification.create_notification_for_offer_made(kwargs, commit=False)
+        return Notification.create_notification_for_offer_offer_reply(kwargs, commit=False)
@@ -1,10 +1,11 @@
 from django.contrib.auth import get_user_model
-from django.db.models import signals
+from django.db.models import signals, F
 from django.db.models.signals import m2m_changed
 from django.dispatch import receiver
 
-from my_project.common.models import Notification
-from my_project.library.models import Book
+from my_project.common.change_feed import feed
+from my_project.common.models import Notification, NotificationOutbox
+from my_project.library.models import Book, books_owner_changed
 from my_project.offer.models import Offer
 
 UserModel = get_user_model()
@@ -15,12 +16,11 @@ def send_notification_on_offer_made(instance, created, **kwargs):
     if not created:
         return None
 
-    Notification.create_notification_for_offer_made(
-        kwargs={
-            'sender': instance.sender,
-            'recipient': instance.recipient,
-            'offer': instance,
-        }
+    NotificationOutbox.enqueue(
+        NotificationOutbox.KindChoices.OFFER_MADE,
+        sender=instance.sender,
+        recipient=instance.recipient,
+        offer=instance,
     )
 
 
@@ -32,15 +32,13 @@ def notification_on_offer_reply(instance, **kwargs):
     if previous.is_active == instance.is_active:
         return None
 
-    notification = Notification.objects.get(offer=instance)
-    notification.answer()
+    Notification.objects.filter(offer=instance, is_answered=False).update(is_answered=True)
 
-    Notification.create_notification_for_offer_offer_reply(
-        kwargs={
-            'sender': instance.recipient,
-            'recipient': instance.sender,
-            'offer': instance,
-        }
+    NotificationOutbox.enqueue(
+        NotificationOutbox.KindChoices.OFFER_REPLY,
+        sender=instance.recipient,
+        recipient=instance.sender,
+        offer=instance,
     )
 
 
@@ -50,13 +48,55 @@ def notification_on_like_dislike(instance, action, pk_set, **kwargs):
         return
     signal, signal_action = action.split('_')
     if signal == 'post':
-        like_action = 'like' if signal_action == 'add' else 'dislike'
-        sender_pk = list(pk_set)[0]
-        sender = UserModel.objects.get(pk=sender_pk)
-
-        Notification.create_notification_for_like_or_dislike(
-            action=like_action,
-            kwargs={'sender': sender,
-                    'recipient': instance.owner,
-                    'book': instance,
-                    })
+        like_action = NotificationOutbox.KindChoices.LIKE if signal_action == 'add' \
+            else NotificationOutbox.KindChoices.DISLIKE
+
+        NotificationOutbox.enqueue(
+            like_action,
+            sender_id=list(pk_set)[0],
+            recipient=instance.owner,
+            book=instance,
+        )
+
+
+def close_offers_of_books(book_pks):
+    offers = Offer.objects.deactivate_involving(book_pks)
+    if offers:
+        Notification.create_notifications_for_closed_offers(offers)
+
+
+@receiver(books_owner_changed)
+def close_offers_on_owner_change(book_pks, **kwargs):
+    close_offers_of_books(book_pks)
+
+
+@receiver(signals.pre_save, sender=Book)
+def remember_tradable_book(instance, update_fields, **kwargs):
+    if instance.is_tradable or not instance.pk or update_fields is not None and 'is_tradable' not in update_fields:
+        return None
+    instance._was_tradable = Book.objects.filter(pk=instance.pk, is_tradable=True).exists()
+
+
+@receiver(signals.post_save, sender=Book)
+def close_offers_on_untradable_book(instance, created, **kwargs):
+    if created or not instance.__dict__.pop('_was_tradable', False):
+        return None
+    close_offers_of_books([instance.pk])
+
+
+@receiver(signals.post_save, sender=Notification)
+def count_unread_notification(instance, created, **kwargs):
+    if not created or instance.is_read:
+        return None
+    UserModel.objects.filter(pk=instance.recipient_id) \
+        .update(unread_notifications_count=F('unread_notifications_count') + 1)
+    feed.publish_on_commit({instance.recipient_id})
+
+
+@receiver(signals.post_delete, sender=Notification)
+def uncount_deleted_notification(instance, **kwargs):
+    if instance.is_read:
+        return None
+    UserModel.objects.filter(pk=instance.recipient_id, unread_notifications_count__gt=0) \
+        .update(unread_notifications_count=F('unread_notifications_count') - 1)
+    feed.publish_on_commit({instance.recipient_id})
@@ -0,0 +1,41 @@
+from datetime import timedelta
+from io import StringIO
+
+from django import test as django_test
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.utils import timezone
+
+from my_project.common.models import Notification, ArchivedNotification
+
+UserModel = get_user_model()
+
+
+class ArchiveNotificationsCommandTest(django_test.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.USER = UserModel.objects.create_user(username='user', email='user@email.com')
+        cls.SECOND_USER = UserModel.objects.create_user(username='second_user', email='second_user@email.com')
+
+    def _create_notification(self, days_old, **kwargs):
+        notification = Notification.objects.create(sender=self.USER, recipient=self.SECOND_USER,
+                                                   massage=f'Test massage {days_old}', **kwargs)
+        Notification.objects.filter(pk=notification.pk).update(received_date=timezone.now() - timedelta(days=days_old))
+        return notification
+
+    def test_archive_notifications__expect_only_old_read_and_answered_moved(self):
+        archivable = [self._create_notification(days, is_read=True, is_answered=True) for days in (40, 50, 60)]
+        kept = [
+            self._create_notification(10, is_read=True, is_answered=True),
+            self._create_notification(40, is_read=False, is_answered=True),
+            self._create_notification(40, is_read=True, is_answered=False),
+        ]
+
+        out = StringIO()
+        call_command('archive_notifications', older_than_days=30, batch_size=2, stdout=out)
+
+        self.assertIn('Archived 3 notifications', out.getvalue())
+        self.assertSetEqual({notf.pk for notf in kept}, set(Notification.objects.values_list('pk', flat=True)))
+        self.assertSetEqual({(notf.pk, notf.massage, self.SECOND_USER.pk) for notf in archivable},
+                            set(ArchivedNotification.objects.values_list('pk', 'massage', 'recipient')))
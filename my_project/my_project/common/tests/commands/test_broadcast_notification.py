@@ -0,0 +1,62 @@
+from io import StringIO
+
+from django import test as django_test
+from django.contrib.auth import get_user_model
+from django.core.management import call_command, CommandError
+
+from my_project.common.models import Notification
+from my_project.library.models import Book
+
+UserModel = get_user_model()
+
+
+class BroadcastNotificationCommandTest(django_test.TestCase):
+    NUMBER_OF_USERS = 5
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.SENDER = UserModel.objects.create_user(username='staff', email='staff@email.com', is_staff=True)
+        cls.USERS = [UserModel.objects.create_user(username=f'user{i}', email=f'user{i}@email.com')
+                     for i in range(cls.NUMBER_OF_USERS)]
+
+    def _broadcast(self, *args, **options):
+        out = StringIO()
+        call_command('broadcast_notification', 'Test massage', *args, sender=self.SENDER.username, stdout=out,
+                     **options)
+        return out.getvalue()
+
+    def _recipients(self):
+        return set(Notification.objects.values_list('recipient', flat=True))
+
+    def test_broadcast_notification__expect_one_notification_per_active_user_in_batches(self):
+        UserModel.objects.filter(pk=self.USERS[0].pk).update(is_active=False)
+
+        output = self._broadcast('--batch-size', '2')
+
+        self.assertSetEqual({user.pk for user in self.USERS[1:]}, self._recipients())
+        self.assertIn(f'Sent {self.NUMBER_OF_USERS - 1} notifications', output)
+        self.assertListEqual(
+            [1] * (self.NUMBER_OF_USERS - 1),
+            list(UserModel.objects.filter(pk__in=self._recipients())
+                 .values_list('unread_notifications_count', flat=True)))
+
+    def test_broadcast_notification__with_city__expect_only_users_of_city(self):
+        for user in self.USERS[:2]:
+            user.contactform.city = 'Sofia'
+            user.contactform.save()
+
+        self._broadcast('--city', 'sofia')
+
+        self.assertSetEqual({user.pk for user in self.USERS[:2]}, self._recipients())
+
+    def test_broadcast_notification__with_without_books__expect_only_users_without_books(self):
+        Book.objects.create(title='Test title', author='Test author', owner=self.USERS[0])
+
+        self._broadcast('--without-books')
+
+        self.assertSetEqual({user.pk for user in self.USERS[1:]}, self._recipients())
+
+    def test_broadcast_notification__when_sender_does_not_exist__expect_command_error(self):
+        with self.assertRaises(CommandError):
+            call_command('broadcast_notification', 'Test massage', sender='nobody', stdout=StringIO())
@@ -0,0 +1,57 @@
+from io import StringIO
+
+from django import test as django_test
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import override_settings
+
+from my_project.common.models import Notification, NotificationOutbox
+from my_project.library.models import Book
+from my_project.offer.models import Offer
+
+UserModel = get_user_model()
+
+
+@override_settings(NOTIFICATIONS_OUTBOX=True)
+class DrainNotificationOutboxCommandTest(django_test.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.USER = UserModel.objects.create_user(username='user', email='user@email.com')
+        cls.SECOND_USER = UserModel.objects.create_user(username='second_user', email='second_user@email.com')
+
+    def _drain(self, **options):
+        out = StringIO()
+        call_command('drain_notification_outbox', once=True, stdout=out, **options)
+        return out.getvalue()
+
+    def test_like_and_offer__expect_outbox_entries_and_no_notifications(self):
+        book = Book.objects.create(title='Test title', author='Test author', owner=self.USER)
+
+        with self.assertNumQueries(1):
+            NotificationOutbox.enqueue(NotificationOutbox.KindChoices.LIKE,
+                                       sender_id=self.SECOND_USER.pk, recipient=self.USER, book=book)
+        Offer.objects.create(sender=self.SECOND_USER, recipient=self.USER)
+
+        self.assertEqual(2, NotificationOutbox.objects.count())
+        self.assertFalse(Notification.objects.exists())
+
+    def test_drain__expect_notifications_created_in_order_like_and_unlike_cancelled_and_outbox_empty(self):
+        book = Book.objects.create(title='Test title', author='Test author', owner=self.USER)
+        book.likes.add(self.SECOND_USER)
+        book.likes.remove(self.SECOND_USER)
+        offer = Offer.objects.create(sender=self.SECOND_USER, recipient=self.USER)
+        offer.is_active = False
+        offer.save()
+
+        out = self._drain(batch_size=3)
+
+        self.assertIn('Drained 4 outbox entries', out)
+        self.assertFalse(NotificationOutbox.objects.exists())
+        self.assertListEqual(
+            [f'{self.SECOND_USER} makes {offer} to you',
+             f'Your {offer} to {self.USER} was rejected or canceled'],
+            list(Notification.objects.order_by('pk').values_list('massage', flat=True)),
+        )
+        self.assertEqual(1, UserModel.objects.get(pk=self.USER.pk).unread_notifications_count)
+        self.assertEqual(1, UserModel.objects.get(pk=self.SECOND_USER.pk).unread_notifications_count)
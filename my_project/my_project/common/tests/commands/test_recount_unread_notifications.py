@@ -0,0 +1,45 @@
+from io import StringIO
+
+from django import test as django_test
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+
+from my_project.common.models import Notification
+
+UserModel = get_user_model()
+
+
+class RecountUnreadNotificationsCommandTest(django_test.TestCase):
+    NUMBER_OF_USERS = 3
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.USERS = [UserModel.objects.create_user(username=f'user{i}', email=f'user{i}@email.com')
+                     for i in range(cls.NUMBER_OF_USERS)]
+
+    def _create_notifications(self, recipient, number):
+        return [Notification.objects.create(sender=self.USERS[0], recipient=recipient, massage='Test massage')
+                for _ in range(number)]
+
+    def test_unread_count__when_notifications_created_read_and_deleted__expect_stored_counter_follows(self):
+        notifications = self._create_notifications(self.USERS[1], 3)
+
+        notifications[0].mark_read()
+        notifications[0].mark_read()
+        notifications[1].delete()
+
+        self.assertEqual(1, UserModel.objects.get(pk=self.USERS[1].pk).unread_notifications_count)
+
+    def test_recount_unread_notifications__when_counters_wrong__expect_counters_repaired(self):
+        self._create_notifications(self.USERS[1], 2)
+        self._create_notifications(self.USERS[2], 1)
+        Notification.objects.filter(recipient=self.USERS[2]).update(is_read=True)
+        UserModel.objects.update(unread_notifications_count=7)
+
+        out = StringIO()
+        call_command('recount_unread_notifications', batch_size=2, stdout=out)
+
+        self.assertListEqual([0, 2, 0], [user.unread_notifications_count
+                                         for user in UserModel.objects.order_by('pk')])
+        self.assertIn(f'Recounted unread notifications of {self.NUMBER_OF_USERS} users', out.getvalue())
@@ -0,0 +1,65 @@
+from django import test as django_test
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from my_project.common.models import Notification
+from my_project.library.models import Book
+
+UserModel = get_user_model()
+
+
+class CreateNotificationsInBulkTest(django_test.TestCase):
+    NUMBER_OF_USERS = 3
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.USERS = [UserModel.objects.create_user(username=f'user{i}', email=f'user{i}@email.com')
+                     for i in range(cls.NUMBER_OF_USERS)]
+        cls.BOOK = Book.objects.create(title='Test title', author='Test author', owner=cls.USERS[0])
+
+    def _build_notifications(self, **kwargs):
+        return [Notification(sender=self.USERS[0], recipient=recipient, book=self.BOOK, massage='Test massage', **kwargs)
+                for recipient in self.USERS[1:]]
+
+    def test_create_notifications_in_bulk__expect_one_query_per_related_model_and_counters_updated(self):
+        notifications = self._build_notifications()
+
+        with CaptureQueriesContext(connection) as queries:
+            Notification.create_notifications_in_bulk(notifications)
+
+        selects = [query['sql'] for query in queries.captured_queries if query['sql'].startswith('SELECT')]
+        self.assertEqual(2, len(selects))
+        self.assertEqual(len(notifications), Notification.objects.count())
+        self.assertListEqual(
+            [0, 1, 1],
+            [user.unread_notifications_count for user in UserModel.objects.order_by('pk')])
+
+    def test_create_notifications_in_bulk__when_related_object_missing__expect_validation_error_and_nothing_created(self):
+        notifications = self._build_notifications()
+        notifications[-1].recipient_id = self.USERS[-1].pk + 100
+
+        with self.assertRaises(ValidationError) as context:
+            Notification.create_notifications_in_bulk(notifications)
+
+        self.assertIn('recipient', context.exception.message_dict)
+        self.assertEqual(0, Notification.objects.count())
+
+    def test_create_notifications_in_bulk__when_required_field_missing__expect_validation_error(self):
+        notifications = self._build_notifications()
+        notifications[0].massage = ''
+
+        with self.assertRaises(ValidationError) as context:
+            Notification.create_notifications_in_bulk(notifications)
+
+        self.assertIn('massage', context.exception.message_dict)
+        self.assertEqual(0, Notification.objects.count())
+
+    def test_create_notification_for_offer_made__expect_notification_saved_with_pk(self):
+        notf = Notification.create_notification_for_offer_made(
+            {'sender': self.USERS[0], 'recipient': self.USERS[1], 'book': self.BOOK})
+
+        self.assertEqual(notf, Notification.objects.get(pk=notf.pk))
+        self.assertEqual(1, UserModel.objects.get(pk=self.USERS[1].pk).unread_notifications_count)
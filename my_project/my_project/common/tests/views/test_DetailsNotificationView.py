@@ -1,5 +1,7 @@
 from django import test as django_test
 from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from my_project.common.models import Notification
@@ -98,3 +100,37 @@ class DetailsNotificationViewTests(django_test.TestCase):
         response = self.client.get(target_url)
         redirect_url_with_next = f"{reverse('login_user')}?next={target_url}"
         self.assertRedirects(response, redirect_url_with_next, status_code=302, target_status_code=200)
+
+    def test_details_notf__when_user_is_notf_recipient__expect_notf_fetched_once(self):
+        self._login()
+        notification = Notification.objects.create(
+            sender=self.SECOND_USER,
+            recipient=self.USER,
+            massage='Test massage',
+        )
+        target_url = reverse('notification_details',
+                             kwargs={'pk': notification.pk})
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(target_url)
+
+        notf_queries = [query for query in queries.captured_queries
+                        if query['sql'].startswith('SELECT') and '"common_notification"."id" =' in query['sql']]
+        self.assertEqual(1, len(notf_queries))
+
+    def test_details_notf__when_read_twice__expect_unread_counter_decreased_once_and_header_not_counting(self):
+        self._login()
+        notifications = [Notification.objects.create(sender=self.SECOND_USER, recipient=self.USER,
+                                                     massage='Test massage') for _ in range(2)]
+        self.USER.refresh_from_db()
+        self.assertEqual(2, self.USER.unread_notifications_count)
+
+        target_url = reverse('notification_details', kwargs={'pk': notifications[0].pk})
+        self.client.get(target_url)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(target_url)
+
+        self.USER.refresh_from_db()
+        self.assertEqual(1, self.USER.unread_notifications_count)
+        self.assertContains(response, 'You have 1 new notifications!')
+        self.assertFalse(any('COUNT(' in query['sql'] for query in queries.captured_queries))
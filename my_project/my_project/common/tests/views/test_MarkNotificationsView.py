@@ -0,0 +1,99 @@
+from django import test as django_test
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from my_project.common.models import Notification
+from my_project.library.models import Book
+from my_project.offer.models import Offer
+
+UserModel = get_user_model()
+
+
+class MarkNotificationsViewTests(django_test.TestCase):
+    CREDENTIALS = {
+        'username': 'user',
+        'email': 'user@email.com',
+        'password': 'testp@ss',
+    }
+    NUMBER_OF_NOTF = 4
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.USER = UserModel.objects.create_user(**cls.CREDENTIALS)
+        cls.SECOND_USER = UserModel.objects.create_user(username='second_user', email='second_user@email.com')
+
+    def setUp(self):
+        self.notifications = [Notification.objects.create(sender=self.SECOND_USER, recipient=self.USER,
+                                                          massage='Test massage') for _ in range(self.NUMBER_OF_NOTF)]
+        self.other_notification = Notification.objects.create(sender=self.USER, recipient=self.SECOND_USER,
+                                                              massage='Test massage')
+
+    def _login(self):
+        self.client.login(
+            username=self.CREDENTIALS.get('username'),
+            password=self.CREDENTIALS.get('password'),
+        )
+
+    @staticmethod
+    def _notification_updates(queries):
+        return [query for query in queries.captured_queries
+                if query["sql"].startswith('UPDATE "common_notification"')]
+
+    def test_mark_read__when_no_authenticated_user__expect_redirect_to_login_with_next(self):
+        target_url = reverse('mark_notifications_read')
+        response = self.client.post(target_url)
+        redirect_url_with_next = f"{reverse('login_user')}?next={target_url}"
+        self.assertRedirects(response, redirect_url_with_next, status_code=302, target_status_code=200)
+
+    def test_mark_read__when_all__expect_every_notf_of_the_user_read_with_one_update(self):
+        self._login()
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(reverse('mark_notifications_read'), data={'all': 1})
+
+        self.assertEqual(1, len(self._notification_updates(queries)))
+        self.assertRedirects(response, reverse('show_notifications'), status_code=302, target_status_code=200)
+        self.assertFalse(Notification.objects.filter(recipient=self.USER, is_read=False).exists())
+        self.assertFalse(Notification.objects.get(pk=self.other_notification.pk).is_read)
+        self.assertEqual(0, UserModel.objects.get(pk=self.USER.pk).unread_notifications_count)
+        self.assertEqual(1, UserModel.objects.get(pk=self.SECOND_USER.pk).unread_notifications_count)
+
+    def test_mark_read__when_selected__expect_only_selected_notf_of_the_user_read(self):
+        self._login()
+        selected = [self.notifications[0].pk, self.notifications[1].pk, self.other_notification.pk]
+
+        self.client.post(reverse('mark_notifications_read'), data={'notifications': selected})
+
+        self.assertSetEqual({self.notifications[0].pk, self.notifications[1].pk},
+                            set(Notification.objects.filter(is_read=True).values_list('pk', flat=True)))
+        self.assertEqual(self.NUMBER_OF_NOTF - 2, UserModel.objects.get(pk=self.USER.pk).unread_notifications_count)
+
+    def test_mark_answered__when_selected__expect_only_selected_answered_and_still_unread(self):
+        self._login()
+
+        self.client.post(reverse('mark_notifications_answered'), data={'notifications': [self.notifications[0].pk]})
+
+        self.assertListEqual([self.notifications[0].pk],
+                             list(Notification.objects.filter(is_answered=True).values_list('pk', flat=True)))
+        self.assertFalse(Notification.objects.filter(is_read=True).exists())
+
+    def test_mark_answered__when_all_with_notf_waiting_for_action__expect_them_still_unanswered(self):
+        book = Book.objects.create(title='Test title', author='Test author', next_owner=self.USER)
+        active_offer, closed_offer = [Offer.objects.create(sender=self.SECOND_USER, recipient=self.USER)
+                                      for _ in range(2)]
+        Offer.objects.filter(pk=closed_offer.pk).update(is_active=False)
+        sent_book_notf, active_offer_notf, closed_offer_notf = [
+            Notification.objects.create(sender=self.SECOND_USER, recipient=self.USER, massage='Test massage', **kwargs)
+            for kwargs in ({'book': book}, {'offer': active_offer}, {'offer': closed_offer})]
+        self._login()
+
+        self.client.post(reverse('mark_notifications_answered'), data={'all': 1})
+
+        self.assertListEqual([False, False, True],
+                             [Notification.objects.get(pk=notf.pk).is_answered
+                              for notf in (sent_book_notf, active_offer_notf, closed_offer_notf)])
+        self.assertFalse(Notification.objects.filter(pk__in=[notf.pk for notf in self.notifications],
+                                                     is_answered=False).exists())
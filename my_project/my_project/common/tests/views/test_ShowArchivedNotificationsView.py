@@ -0,0 +1,54 @@
+from django import test as django_test
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.utils import timezone
+
+from my_project.common.models import ArchivedNotification
+from my_project.common.views import ShowArchivedNotificationsView
+
+UserModel = get_user_model()
+
+
+class ShowArchivedNotificationsViewTests(django_test.TestCase):
+    CREDENTIALS = {
+        'username': 'user',
+        'email': 'user@email.com',
+        'password': 'testp@ss',
+    }
+    TARGET_URL = reverse('show_archived_notifications')
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.USER = UserModel.objects.create_user(**cls.CREDENTIALS)
+        cls.SECOND_USER = UserModel.objects.create_user(username='second_user', email='second_user@email.com')
+
+    def _login(self):
+        self.client.login(
+            username=self.CREDENTIALS.get('username'),
+            password=self.CREDENTIALS.get('password'),
+        )
+
+    def _create_archived(self, number, recipient):
+        ArchivedNotification.objects.bulk_create(
+            ArchivedNotification(sender=self.SECOND_USER, recipient=recipient, massage='Test massage',
+                                 received_date=timezone.now()) for _ in range(number))
+
+    def test_show_archive__when_no_authenticated_user__expect_redirect_to_login_with_next(self):
+        response = self.client.get(self.TARGET_URL)
+        redirect_url_with_next = f"{reverse('login_user')}?next={self.TARGET_URL}"
+        self.assertRedirects(response, redirect_url_with_next, status_code=302, target_status_code=200)
+
+    def test_show_archive__when_follow_cursors__expect_every_archived_notf_of_the_user_once(self):
+        self._create_archived(ShowArchivedNotificationsView.paginate_by + 1, self.USER)
+        self._create_archived(2, self.SECOND_USER)
+        expected = list(ArchivedNotification.objects.filter(recipient=self.USER).order_by('-received_date', '-pk'))
+
+        self._login()
+        response = self.client.get(self.TARGET_URL)
+        result = list(response.context.get(ShowArchivedNotificationsView.context_object_name))
+        response = self.client.get(self.TARGET_URL, data={'cursor': response.context.get('page_obj').next_cursor})
+        result += list(response.context.get(ShowArchivedNotificationsView.context_object_name))
+
+        self.assertListEqual(expected, result)
+        self.assertFalse(response.context.get('page_obj').has_next())
@@ -1,5 +1,7 @@
 from django import test as django_test
 from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from my_project.common.models import Notification
@@ -117,6 +119,85 @@ class ShowNotificationsViewTests(django_test.TestCase):
         self.assertTrue(response.context.get('hide_notifications', False))
         self.assertFalse(response.context.get('see_more', False))
 
+    def test_get__when_follow_cursors__expect_every_notf_once_in_order(self):
+        self._create_notifications(
+            number=ShowNotificationsView.paginate_by * 2 + 1,
+            sender=self.SECOND_USER,
+            recipient=self.USER)
+        expected_notf_to_show = list(Notification.objects.filter(recipient=self.USER).order_by('-received_date', '-pk'))
+
+        self._login()
+        response = self.client.get(reverse('show_notifications'))
+        first_page = list(response.context.get(ShowNotificationsView.context_object_name))
+        result_notf = list(first_page)
+        self._create_notifications(number=1, sender=self.SECOND_USER, recipient=self.USER)
+        while response.context.get('page_obj').has_next():
+            response = self.client.get(reverse('show_notifications'),
+                                       data={'cursor': response.context.get('page_obj').next_cursor})
+            result_notf += list(response.context.get(ShowNotificationsView.context_object_name))
+
+        self.assertListEqual(expected_notf_to_show, result_notf)
+        self.assertTrue(response.context.get('cursor_pagination'))
+
+    def test_get__when_previous_cursor_from_second_page__expect_first_page(self):
+        self._create_notifications(
+            number=ShowNotificationsView.paginate_by + 1,
+            sender=self.SECOND_USER,
+            recipient=self.USER)
+
+        self._login()
+        first_response = self.client.get(reverse('show_notifications'))
+        second_response = self.client.get(reverse('show_notifications'),
+                                          data={'cursor': first_response.context.get('page_obj').next_cursor})
+        response = self.client.get(reverse('show_notifications'),
+                                   data={'cursor': second_response.context.get('page_obj').previous_cursor})
+
+        self.assertListEqual(list(first_response.context.get(ShowNotificationsView.context_object_name)),
+                             list(response.context.get(ShowNotificationsView.context_object_name)))
+        self.assertFalse(response.context.get('page_obj').has_previous())
+
+    def test_get__when_cursor_tampered__expect_first_page(self):
+        self._create_notifications(
+            number=ShowNotificationsView.paginate_by + 1,
+            sender=self.SECOND_USER,
+            recipient=self.USER)
+
+        self._login()
+        response = self.client.get(reverse('show_notifications'), data={'cursor': 'not-a-cursor'})
+
+        self.assertEqual(200, response.status_code)
+        self.assertFalse(response.context.get('page_obj').has_previous())
+
+    def test_get__when_follow_pages__expect_every_notf_once_by_probing_one_more_row(self):
+        self._create_notifications(
+            number=ShowNotificationsView.paginate_by * 2,
+            sender=self.SECOND_USER,
+            recipient=self.USER)
+        expected_notf_to_show = list(Notification.objects.filter(recipient=self.USER).order_by('-received_date'))
+
+        self._login()
+        result_notf = []
+        page = 1
+        while True:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(reverse('show_notifications'), data={'page': page})
+            result_notf += list(response.context.get(ShowNotificationsView.context_object_name))
+            self.assertTrue(any(f'LIMIT {ShowNotificationsView.paginate_by + 1}' in query['sql']
+                                for query in queries.captured_queries))
+            self.assertTrue(response.context.get('see_more', False))
+            if not response.context.get('page_obj').has_next():
+                break
+            page += 1
+
+        self.assertListEqual(expected_notf_to_show, result_notf)
+        self.assertEqual(2, page)
+        self.assertFalse(response.context.get('cursor_pagination'))
+
+    def test_get__when_page_out_of_range__expect_404(self):
+        self._login()
+        response = self.client.get(reverse('show_notifications'), data={'page': 2})
+        self.assertEqual(404, response.status_code)
+
     def test_show_notifications__when_no_authenticated_user__expect_redirect_to_login_with_next(self):
         response = self.client.get(reverse('show_notifications'))
         redirect_url_with_next = f"{reverse('login_user')}?next={reverse('show_notifications')}"
@@ -0,0 +1,158 @@
+import asyncio
+import json
+import threading
+import warnings
+from unittest.mock import patch, MagicMock
+
+from django import test as django_test
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.utils.module_loading import import_string
+
+from my_project.common import views
+from my_project.common.change_feed import ChangeFeed
+from my_project.common.models import Notification
+
+UserModel = get_user_model()
+
+
+class LiveNotificationsViewTests(django_test.TestCase):
+    CREDENTIALS = {
+        'username': 'user',
+        'email': 'user@email.com',
+        'password': 'testp@ss',
+    }
+    TARGET_URL = reverse('live_notifications')
+    EVENTS_URL = reverse('live_notifications_events')
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.USER = UserModel.objects.create_user(**cls.CREDENTIALS)
+        cls.SECOND_USER = UserModel.objects.create_user(username='second_user', email='second_user@email.com')
+
+    def _login(self):
+        self.client.login(
+            username=self.CREDENTIALS.get('username'),
+            password=self.CREDENTIALS.get('password'),
+        )
+
+    @staticmethod
+    def _read_stream(response):
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            return b''.join(response).decode()
+
+    def _create_notification(self):
+        return Notification.objects.create(sender=self.SECOND_USER, recipient=self.USER, massage='Test massage')
+
+    def test_live_notifications__when_no_authenticated_user__expect_401(self):
+        response = self.client.get(self.TARGET_URL, data={'timeout': 0})
+        self.assertEqual(401, response.status_code)
+
+    def test_live_notifications__when_client_behind__expect_new_notifications_and_unread_count_at_once(self):
+        old_notification = self._create_notification()
+        new_notification = self._create_notification()
+        self._login()
+
+        response = self.client.get(self.TARGET_URL, data={'since': old_notification.pk, 'count': 1, 'timeout': 0})
+
+        state = response.json()
+        self.assertEqual(2, state['unread_count'])
+        self.assertEqual(new_notification.pk, state['last_id'])
+        self.assertListEqual([new_notification.pk], [notf['id'] for notf in state['notifications']])
+
+    def test_live_notifications__when_client_up_to_date__expect_204_after_timeout(self):
+        notification = self._create_notification()
+        self._login()
+
+        response = self.client.get(self.TARGET_URL, data={'since': notification.pk, 'count': 1, 'timeout': 0})
+
+        self.assertEqual(204, response.status_code)
+
+    def test_live_notifications__when_change_published_right_after_state_read__expect_new_state_not_timeout(self):
+        notification = self._create_notification()
+        self._login()
+        change_feed = ChangeFeed(listen=False)
+        get_live_notifications = views.get_live_notifications
+
+        def read_then_publish(user_pk, since):
+            state = get_live_notifications(user_pk, since)
+            change_feed.wake([user_pk])
+            return state
+
+        with patch.object(views, 'feed', change_feed), \
+                patch.object(views, 'get_live_notifications', side_effect=read_then_publish):
+            response = self.client.get(self.TARGET_URL, data={'since': notification.pk, 'count': 1, 'timeout': 1})
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(1, response.json()['unread_count'])
+
+    def test_live_notifications_events__expect_event_with_position_then_nothing_from_that_position(self):
+        notification = self._create_notification()
+        self._login()
+
+        response = self.client.get(self.EVENTS_URL, data={'timeout': 0})
+        body = self._read_stream(response)
+        self.assertEqual('text/event-stream', response['Content-Type'])
+        self.assertIn(f'id: {notification.pk}:1\n', body)
+        self.assertEqual(1, json.loads(body.split('data: ')[1])['unread_count'])
+
+        response = self.client.get(self.EVENTS_URL, data={'timeout': 0}, HTTP_LAST_EVENT_ID=f'{notification.pk}:1')
+        self.assertNotIn('data:', self._read_stream(response))
+
+    def test_live_notifications_events__when_changes_while_open__expect_event_for_each_then_keep_alive(self):
+        first_notification = self._create_notification()
+        self._login()
+        change_feed = ChangeFeed(listen=False)
+        get_live_notifications = views.get_live_notifications
+        created = []
+
+        def read_then_create_one(user_pk, since):
+            state = get_live_notifications(user_pk, since)
+            if since and not created:
+                created.append(self._create_notification())
+                change_feed.wake([user_pk])
+            return state
+
+        with patch.object(views, 'feed', change_feed), \
+                patch.object(views, 'LIVE_NOTIFICATIONS_KEEP_ALIVE', 0.1), \
+                patch.object(views, 'get_live_notifications', side_effect=read_then_create_one):
+            response = self.client.get(self.EVENTS_URL, data={'timeout': 0.3})
+            body = self._read_stream(response)
+
+        self.assertTrue(response.streaming)
+        self.assertIn(f'id: {first_notification.pk}:1\n', body)
+        self.assertIn(f'id: {created[0].pk}:2\n', body)
+        self.assertIn(': keep-alive\n\n', body)
+        self.assertEqual(2, body.count('event: notifications'))
+
+    def test_live_notifications__when_served_over_asgi__expect_no_sync_only_middleware_in_front(self):
+        for path in settings.MIDDLEWARE:
+            self.assertTrue(getattr(import_string(path), 'async_capable', False), path)
+
+    def test_change_feed__when_woken_from_other_thread__expect_waiting_request_released(self):
+        change_feed = ChangeFeed(listen=False)
+
+        async def wait_and_wake():
+            waiting = asyncio.ensure_future(change_feed.wait(self.USER.pk, timeout=5))
+            await asyncio.sleep(0)
+            threading.Thread(target=change_feed.wake, args=([self.USER.pk],)).start()
+            return await waiting
+
+        self.assertTrue(asyncio.run(wait_and_wake()))
+        self.assertDictEqual({}, change_feed._waiters)
+
+    def test_change_feed__when_listen_fails__expect_connection_closed_before_reconnect(self):
+        change_feed = ChangeFeed()
+        conn = MagicMock()
+        conn.cursor.return_value.__enter__.return_value.execute.side_effect = Exception('LISTEN failed')
+
+        with patch('psycopg2.connect', return_value=conn), \
+                patch('my_project.common.change_feed.logging'), \
+                patch('my_project.common.change_feed.time.sleep', side_effect=KeyboardInterrupt):
+            with self.assertRaises(KeyboardInterrupt):
+                change_feed._listen()
+
+        conn.close.assert_called_once()
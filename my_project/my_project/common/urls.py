@@ -1,9 +1,16 @@
 from django.urls import path
 
-from my_project.common.views import ShowHomePageView, ShowNotificationsView, DetailsNotificationView
+from my_project.common.views import ShowHomePageView, ShowNotificationsView, DetailsNotificationView, \
+    ShowArchivedNotificationsView, MarkNotificationsView, live_notifications_view, live_notifications_events_view
 
 urlpatterns = [
     path('', ShowHomePageView.as_view(), name='show_home'),
     path('notifications/', ShowNotificationsView.as_view(), name='show_notifications'),
+    path('notifications/mark_read/', MarkNotificationsView.as_view(action='read'), name='mark_notifications_read'),
+    path('notifications/mark_answered/', MarkNotificationsView.as_view(action='answered'),
+         name='mark_notifications_answered'),
+    path('notifications/live/', live_notifications_view, name='live_notifications'),
+    path('notifications/events/', live_notifications_events_view, name='live_notifications_events'),
+    path('notifications/archive/', ShowArchivedNotificationsView.as_view(), name='show_archived_notifications'),
     path('notification/details/<int:pk>/', DetailsNotificationView.as_view(), name='notification_details'),
 ]
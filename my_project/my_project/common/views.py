@@ -1,24 +1,33 @@
+import asyncio
+import json
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.db.models import Count
+from django.db import connections, close_old_connections
+from django.http import JsonResponse, HttpResponse, StreamingHttpResponse
 from django.shortcuts import redirect
 # Create your views here.
 from django.views import generic as views
 from django.views.generic import ListView, DetailView
 
+from my_project.common.change_feed import feed
 from my_project.common.helpers.custom_mixins import AuthorizationRequiredMixin, PaginationShowMixin
-from my_project.common.models import Notification
+from my_project.common.models import Notification, ArchivedNotification
 from my_project.library.models import Book
 
+UserModel = get_user_model()
+
 
 class ShowHomePageView(views.TemplateView):
     template_name = 'home_page.html'
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        books = Book.objects.prefetch_related('likes'). \
+        books = Book.objects.select_related('owner', 'category'). \
+                    with_viewer_likes(self.request.user). \
                     filter(owner__isnull=False). \
-                    annotate(like_count=Count('likes')). \
-                    order_by('-like_count', 'title'). \
+                    order_by('-likes_count', 'title'). \
                     all()[:3]
         context['books_to_show'] = books
         return context
@@ -39,18 +48,170 @@ class ShowNotificationsView(PaginationShowMixin, LoginRequiredMixin, ListView):
         return Notification.objects.filter(recipient=self.request.user)
 
 
+class MarkNotificationsView(LoginRequiredMixin, views.View):
+    '''
+    Mark all notifications of the user, or the selected ones, read or answered with one UPDATE.
+    Notifications which still ask for an action stay unanswered.
+    '''
+    http_method_names = ['post']
+    action = 'read'
+
+    def post(self, request, *args, **kwargs):
+        notifications = Notification.objects.filter(recipient=request.user)
+        if not request.POST.get('all'):
+            selected = [pk for pk in request.POST.getlist('notifications') if pk.isdigit()]
+            notifications = notifications.filter(pk__in=selected)
+        getattr(notifications, f'mark_{self.action}')()
+        return redirect('show_notifications')
+
+
+class ShowArchivedNotificationsView(PaginationShowMixin, LoginRequiredMixin, ListView):
+    template_name = 'common/notifications/show_archived_notifications.html'
+    context_object_name = 'notifications'
+    model = ArchivedNotification
+    paginate_by = 9
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['hide_notifications'] = True
+        return context
+
+    def get_queryset(self):
+        return ArchivedNotification.objects.filter(recipient=self.request.user)
+
+
 class DetailsNotificationView(LoginRequiredMixin, AuthorizationRequiredMixin, DetailView):
     model = Notification
     context_object_name = 'notification'
     template_name = 'common/notifications/notifications_details.html'
     authorizing_fields = ['recipient']
+    related_fields = ('sender', 'book')
 
     def dispatch(self, request, *args, **kwargs):
         result = super().dispatch(request, *args, **kwargs)
+        if not request.user.is_authenticated:
+            return result
         notification = self.get_object()
-        notification.is_read = True
-        notification.save()
+        notification.mark_read()
 
-        if notification.offer:
-            return redirect('show_offer_details', pk=notification.offer.pk)
+        if notification.offer_id:
+            return redirect('show_offer_details', pk=notification.offer_id)
         return result
+
+
+LIVE_NOTIFICATIONS_TIMEOUT = 25
+LIVE_NOTIFICATIONS_LIMIT = 10
+LIVE_NOTIFICATIONS_STREAM_DURATION = 5 * 60
+LIVE_NOTIFICATIONS_KEEP_ALIVE = 15
+
+
+def get_live_notifications(user_pk, since):
+    '''The unread count and the unread notifications newer than since, from two indexed queries'''
+    notifications = Notification.objects.unread().filter(recipient=user_pk, pk__gt=since) \
+        .order_by('-pk').only('massage')[:LIVE_NOTIFICATIONS_LIMIT]
+    return {
+        'unread_count': UserModel.objects.values_list('unread_notifications_count', flat=True).get(pk=user_pk),
+        'last_id': max([since] + [notf.pk for notf in notifications]),
+        'notifications': [{'id': notf.pk, 'text': notf.massage, 'url': str(notf.get_absolute_url())}
+                          for notf in notifications],
+    }
+
+
+def release_connections():
+    '''Close the connections of the request before a wait, as its end would, unless a transaction still uses them'''
+    if not any(conn.in_atomic_block for conn in connections.all(initialized_only=True)):
+        close_old_connections()
+
+
+async def get_live_user_pk(request):
+    return await sync_to_async(lambda: request.user.pk if request.user.is_authenticated else None)()
+
+
+def get_live_timeout(request, limit):
+    try:
+        return min(float(request.GET.get('timeout', limit)), limit)
+    except ValueError:
+        return limit
+
+
+async def wait_for_live_notifications(request, since, count):
+    '''
+    Answer at once if the client is behind, else wait for the change feed.
+    The subscription comes before the read, so a change right after the read still ends the wait.
+    Waiting holds no database connection and runs no query.
+    '''
+    user_pk = await get_live_user_pk(request)
+    if not user_pk:
+        return None, None
+    timeout = get_live_timeout(request, LIVE_NOTIFICATIONS_TIMEOUT)
+
+    with feed.subscribe(user_pk, listen=timeout > 0) as changed:
+        state = await sync_to_async(get_live_notifications)(user_pk, since)
+        if state['notifications'] or state['unread_count'] != count:
+            return user_pk, state
+        await sync_to_async(release_connections)()
+        if not await feed.wait_for(changed, timeout):
+            return user_pk, None
+    return user_pk, await sync_to_async(get_live_notifications)(user_pk, since)
+
+
+def parse_live_position(since, count):
+    try:
+        return int(since or 0), int(count) if count not in (None, '') else None
+    except ValueError:
+        return 0, None
+
+
+async def live_notifications_view(request):
+    '''Long poll: JSON with the new notifications and the unread count, 204 if nothing changed in time'''
+    since, count = parse_live_position(request.GET.get('since'), request.GET.get('count'))
+    user_pk, state = await wait_for_live_notifications(request, since, count)
+    if not user_pk:
+        return HttpResponse(status=401)
+    if state is None:
+        return HttpResponse(status=204)
+    return JsonResponse(state)
+
+
+def format_live_event(state):
+    return f"id: {state['last_id']}:{state['unread_count']}\nevent: notifications\ndata: {json.dumps(state)}\n\n"
+
+
+async def stream_live_notifications(user_pk, since, count, duration):
+    '''
+    An event for every change of the feed, and a keep-alive comment after LIVE_NOTIFICATIONS_KEEP_ALIVE seconds
+    without changes, until the duration ends. The state is read after each subscription, as in
+    wait_for_live_notifications, and no connection is held between the reads.
+    '''
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + duration
+    while True:
+        with feed.subscribe(user_pk, listen=duration > 0) as changed:
+            state = await sync_to_async(get_live_notifications)(user_pk, since)
+            if state['notifications'] or state['unread_count'] != count:
+                since, count = state['last_id'], state['unread_count']
+                yield format_live_event(state)
+                continue
+            await sync_to_async(release_connections)()
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return
+            if not await feed.wait_for(changed, min(remaining, LIVE_NOTIFICATIONS_KEEP_ALIVE)):
+                yield ': keep-alive\n\n'
+
+
+async def live_notifications_events_view(request):
+    '''
+    Server-sent events: one open response streams the changes for LIVE_NOTIFICATIONS_STREAM_DURATION seconds,
+    after which EventSource reconnects with the position of the last event in the Last-Event-ID header
+    '''
+    since, count = parse_live_position(*(request.headers.get('Last-Event-ID') or ':').partition(':')[::2])
+    user_pk = await get_live_user_pk(request)
+    if not user_pk:
+        return HttpResponse(status=401)
+    duration = get_live_timeout(request, LIVE_NOTIFICATIONS_STREAM_DURATION)
+    response = StreamingHttpResponse(stream_live_notifications(user_pk, since, count, duration),
+                                     content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -56,8 +56,8 @@ class BookAdmin(admin.ModelAdmin):
 
     def get_queryset(self, request):
         qs = super().get_queryset(request)
-        return qs.prefetch_related('likes', 'ex_owners', 'owner') \
-            .annotate(like_count=Count('likes'), ex_owners_count=Count('ex_owners'))
+        return qs.prefetch_related('ex_owners', 'owner') \
+            .annotate(ex_owners_count=Count('ex_owners'))
 
     def number_of_ex_owners(self, inst):
         return inst.ex_owners_count
@@ -65,9 +65,9 @@ class BookAdmin(admin.ModelAdmin):
     number_of_ex_owners.admin_order_field = 'ex_owners_count'
 
     def number_of_likes(self, inst):
-        return inst.like_count
+        return inst.likes_count
 
-    number_of_likes.admin_order_field = 'like_count'
+    number_of_likes.admin_order_field = 'likes_count'
 
     def get_readonly_fields(self, request, *args, **kwargs):
         book = args[0]
@@ -0,0 +1,26 @@
+from django.core.management import BaseCommand
+
+from my_project.library.models import Book
+
+
+class Command(BaseCommand):
+    help = 'Backfill or repair the stored likes counter of every book'
+
+    DEFAULT_BATCH_SIZE = 5000
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=self.DEFAULT_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        last_pk = 0
+        updated = 0
+        while True:
+            pks = list(Book.objects.filter(pk__gt=last_pk)
+                       .order_by('pk')
+                       .values_list('pk', flat=True)[:batch_size])
+            if not pks:
+                break
+            updated += Book.objects.filter(pk__in=pks).refresh_likes_count()
+            last_pk = pks[-1]
+        self.stdout.write(self.style.SUCCESS(f'Recounted likes of {updated} books'))
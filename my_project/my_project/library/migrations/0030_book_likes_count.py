@@ -0,0 +1,34 @@
+# Generated by Django 4.0.10 on 2026-10-18 12:41
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_likes_count(apps, schema_editor):
+    Book = apps.get_model('library', 'Book')
+    likes = Book.likes.through.objects.filter(book=OuterRef('pk')) \
+        .values('book') \
+        .annotate(total=Count('pk')) \
+        .values('total')
+    Book.objects.update(likes_count=Coalesce(Subquery(likes), Value(0)))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library', '0029_alter_book_category'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='book',
+            name='likes_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(fields=['-likes_count', 'title'], name='library_book_likes_idx'),
+        ),
+        migrations.RunPython(backfill_likes_count, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,58 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.operations import TrigramExtension
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+
+SEARCH_CONFIG = 'simple'
+
+POSTGRES_INDEXES = {
+    ('library', 'Book'): [
+        GinIndex(SearchVector('title', config=SEARCH_CONFIG), name='library_book_title_fts'),
+        GinIndex(SearchVector('author', config=SEARCH_CONFIG), name='library_book_author_fts'),
+        GinIndex(fields=['title'], opclasses=['gin_trgm_ops'], name='library_book_title_trgm'),
+        GinIndex(fields=['author'], opclasses=['gin_trgm_ops'], name='library_book_author_trgm'),
+    ],
+    ('accounts', 'WorldOfBooksUser'): [
+        GinIndex(SearchVector('username', config=SEARCH_CONFIG), name='accounts_user_username_fts'),
+        GinIndex(fields=['username'], opclasses=['gin_trgm_ops'], name='accounts_user_username_trgm'),
+    ],
+}
+
+SQLITE_FTS_TABLE = 'library_book_fts'
+
+
+def create_search_indexes(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        for model_name, indexes in POSTGRES_INDEXES.items():
+            model = apps.get_model(*model_name)
+            for index in indexes:
+                schema_editor.add_index(model, index)
+    elif vendor == 'sqlite':
+        schema_editor.execute(f'CREATE VIRTUAL TABLE {SQLITE_FTS_TABLE} USING fts5(title, author)')
+        schema_editor.execute(f'INSERT INTO {SQLITE_FTS_TABLE} (rowid, title, author) '
+                              f'SELECT id, title, author FROM library_book')
+
+
+def drop_search_indexes(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        for model_name, indexes in POSTGRES_INDEXES.items():
+            model = apps.get_model(*model_name)
+            for index in indexes:
+                schema_editor.remove_index(model, index)
+    elif vendor == 'sqlite':
+        schema_editor.execute(f'DROP TABLE {SQLITE_FTS_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0016_alter_worldofbooksuser_options'),
+        ('library', '0030_book_likes_count'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
@@ -1,11 +1,19 @@
 # Create your models here.
 from cloudinary.models import CloudinaryField
 from django.contrib.auth import get_user_model
-from django.db import models
+from django.db import models, transaction
+from django.db.models import QuerySet, Subquery, OuterRef, Count, Value, Exists, BooleanField, F
+from django.db.models.functions import Coalesce
+from django.dispatch import Signal
 from django.urls import reverse
 
+from my_project.common.helpers.custom_models import StoredCountersMixin
+
 UserModel = get_user_model()
 
+'''Sent by the bulk ownership changes of BookQueryset, with book_pks and the pks of the users who lost or got them'''
+books_owner_changed = Signal()
+
 
 class Category(models.Model):
     NAME_MAX_LENGTH = 32
@@ -22,7 +30,74 @@ class Category(models.Model):
         return self.name
 
 
-class Book(models.Model):
+class BookQueryset(QuerySet):
+    def refresh_likes_count(self):
+        '''Recount the stored likes of every book in the queryset with one UPDATE'''
+        likes = Book.likes.through.objects.filter(book=OuterRef('pk')) \
+            .values('book') \
+            .annotate(total=Count('pk')) \
+            .values('total')
+        return self.update(likes_count=Coalesce(Subquery(likes), Value(0)))
+
+    def with_viewer_likes(self, user):
+        '''Annotate is_liked_by_viewer inside the query of the books, instead of loading their likers'''
+        if not user.is_authenticated:
+            return self.annotate(is_liked_by_viewer=Value(False, output_field=BooleanField()))
+        return self.annotate(is_liked_by_viewer=Exists(user.liked_books.filter(pk=OuterRef('pk'))))
+
+    def lock(self):
+        '''Lock the books' rows until the end of the transaction, always in the same order to avoid deadlocks'''
+        return list(self.select_for_update(of=('self',)).only('owner').order_by('pk'))
+
+    def send_to(self, new_owner):
+        '''Take the books from their owners and put them on the way to new_owner, in one transaction'''
+        with transaction.atomic():
+            books = self.lock()
+            self._add_owners_to_ex_owners(books)
+            result = Book.objects.filter(pk__in=[book.pk for book in books]) \
+                .update(previous_owner=F('owner'), next_owner=new_owner, owner=None)
+            self._send_owner_changed(books, {book.owner_id for book in books} | {new_owner.pk})
+        return result
+
+    def give_away(self):
+        '''Take the books from their owners without sending them to anybody, in one transaction'''
+        with transaction.atomic():
+            books = self.lock()
+            self._add_owners_to_ex_owners(books)
+            result = Book.objects.filter(pk__in=[book.pk for book in books]).update(owner=None)
+            self._send_owner_changed(books, {book.owner_id for book in books})
+        return result
+
+    def receive(self):
+        '''Give the books on a way to the users they were sent to, in one transaction'''
+        with transaction.atomic():
+            books = list(self.filter(next_owner__isnull=False)
+                         .select_for_update(of=('self',)).only('next_owner').order_by('pk'))
+            result = Book.objects.filter(pk__in=[book.pk for book in books]) \
+                .update(owner=F('next_owner'), previous_owner=None, next_owner=None)
+            self._send_owner_changed(books, {book.next_owner_id for book in books})
+        return result
+
+    @staticmethod
+    def _send_owner_changed(books, user_pks):
+        if books:
+            books_owner_changed.send(sender=Book, book_pks=[book.pk for book in books], user_pks=user_pks - {None})
+
+    @staticmethod
+    def _add_owners_to_ex_owners(books):
+        through = Book.ex_owners.through
+        book_column = Book.ex_owners.field.m2m_column_name()
+        user_column = Book.ex_owners.field.m2m_reverse_name()
+        through.objects.bulk_create(
+            [through(**{book_column: book.pk, user_column: book.owner_id}) for book in books if book.owner_id],
+            ignore_conflicts=True,
+        )
+
+
+class Book(StoredCountersMixin, models.Model):
+    objects = BookQueryset.as_manager()
+    stored_counters = ('likes_count',)
+
     TITTLE_MAX_LENGTH = 64
     AUTHOR_MAX_LENGTH = 64
     UPLOAD_PICTURE_MAX_SIZE_IN_MB = 2
@@ -91,15 +166,24 @@ class Book(models.Model):
         default=True,
     )
 
-    @property
-    def likes_count(self):
-        return self.likes.count()
+    likes_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+    )
 
     def __str__(self):
         return f'"{self.title}" by {self.author}'
 
     class Meta:
         ordering = ['title']
+        indexes = [
+            models.Index(fields=['-likes_count', 'title'], name='library_book_likes_idx'),
+        ]
 
     def get_absolute_url(self):
         return reverse('book_details', kwargs={'pk': self.pk})
+
+    def is_liked_by(self, user):
+        if hasattr(self, 'is_liked_by_viewer'):
+            return self.is_liked_by_viewer
+        return user.is_authenticated and self.likes.filter(pk=user.pk).exists()
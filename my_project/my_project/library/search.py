@@ -0,0 +1,127 @@
+import re
+
+from django.contrib.auth import get_user_model
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector, TrigramSimilarity
+from django.db import connection
+from django.db.models import FloatField, Value
+from django.db.models.expressions import RawSQL
+
+from my_project.library.forms import SearchForm
+
+UserModel = get_user_model()
+
+TERM_PATTERN = re.compile(r'[^\W_]+')
+
+
+class BookSearch:
+    '''Substring search, used on databases without a full-text engine'''
+    OWNER = SearchForm.SearchByChoices.owner
+    FIELDS = (SearchForm.SearchByChoices.title, SearchForm.SearchByChoices.author)
+
+    def search(self, queryset, search, search_by):
+        '''Filter the books and annotate them with search_rank (bigger is better)'''
+        if search_by == self.OWNER:
+            return self.search_owner(queryset, search)
+        if search_by in self.FIELDS:
+            return self.search_field(queryset, search_by, search)
+        return queryset.none()
+
+    def search_owner(self, queryset, search):
+        owners = UserModel.objects.filter(username__icontains=search)
+        return queryset.filter(owner__in=owners).annotate(search_rank=self._no_rank())
+
+    def search_field(self, queryset, field, search):
+        return queryset.filter(**{f'{field}__icontains': search}).annotate(search_rank=self._no_rank())
+
+    def index(self, book):
+        pass
+
+    def unindex(self, book):
+        pass
+
+    @staticmethod
+    def _terms(search):
+        return TERM_PATTERN.findall(search.lower())
+
+    @staticmethod
+    def _no_rank():
+        return Value(0.0, output_field=FloatField())
+
+
+class SqliteBookSearch(BookSearch):
+    '''FTS5 table over title and author, kept in sync from Book's save and delete signals'''
+    TABLE = 'library_book_fts'
+
+    def search_field(self, queryset, field, search):
+        terms = self._terms(search)
+        if not terms:
+            return queryset.none()
+        prefixes = ' '.join(f'"{term}"*' for term in terms)
+        match = f'{field} : ({prefixes})'
+        matching_pks = RawSQL(f'SELECT rowid FROM {self.TABLE} WHERE {self.TABLE} MATCH %s', (match,))
+        rank = RawSQL(
+            f'SELECT -bm25({self.TABLE}) FROM {self.TABLE} '
+            f'WHERE {self.TABLE} MATCH %s AND rowid = {queryset.model._meta.db_table}.id',
+            (match,),
+            output_field=FloatField(),
+        )
+        return queryset.filter(pk__in=matching_pks).annotate(search_rank=rank)
+
+    def index(self, book):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.TABLE} WHERE rowid = %s', (book.pk,))
+            cursor.execute(f'INSERT INTO {self.TABLE} (rowid, title, author) VALUES (%s, %s, %s)',
+                           (book.pk, book.title, book.author))
+
+    def unindex(self, book):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.TABLE} WHERE rowid = %s', (book.pk,))
+
+
+class PostgresBookSearch(BookSearch):
+    '''
+    Full-text prefix search with a trigram fallback for typos.
+    Both are served by the expression GIN indexes from library migration 0031,
+    which PostgreSQL maintains itself on every write.
+    '''
+    CONFIG = 'simple'
+
+    def search_owner(self, queryset, search):
+        owners = self._search(UserModel.objects.all(), 'username', search)
+        return queryset.filter(owner__in=owners.values('pk')) \
+            .annotate(search_rank=TrigramSimilarity('owner__username', search))
+
+    def search_field(self, queryset, field, search):
+        query = self._query(search)
+        return self._search(queryset, field, search) \
+            .annotate(search_rank=SearchRank(self._vector(field), query) + TrigramSimilarity(field, search))
+
+    def _search(self, queryset, field, search):
+        terms = self._terms(search)
+        if not terms:
+            return queryset.none()
+        matches = queryset.annotate(search_document=self._vector(field)).filter(search_document=self._query(search))
+        if matches.exists():
+            return matches
+        return queryset.filter(**{f'{field}__trigram_similar': search})
+
+    def _vector(self, field):
+        return SearchVector(field, config=self.CONFIG)
+
+    def _query(self, search):
+        prefixes = ' & '.join(f'{term}:*' for term in self._terms(search))
+        return SearchQuery(prefixes, config=self.CONFIG, search_type='raw')
+
+
+BACKENDS = {
+    'sqlite': SqliteBookSearch,
+    'postgresql': PostgresBookSearch,
+}
+
+
+def get_book_search():
+    return BACKENDS.get(connection.vendor, BookSearch)()
+
+
+def search_books(queryset, search, search_by):
+    return get_book_search().search(queryset, search, search_by)
@@ -0,0 +1,39 @@
+from django.db.models import signals
+from django.db.models.signals import m2m_changed
+from django.dispatch import receiver
+
+from my_project.library.models import Book
+from my_project.library.search import get_book_search
+
+SEARCHABLE_FIELDS = {'title', 'author'}
+
+
+@receiver(signals.post_save, sender=Book)
+def index_book_for_search(instance, update_fields, **kwargs):
+    if update_fields and not SEARCHABLE_FIELDS.intersection(update_fields):
+        return None
+    get_book_search().index(instance)
+
+
+@receiver(signals.post_delete, sender=Book)
+def unindex_book_for_search(instance, **kwargs):
+    get_book_search().unindex(instance)
+
+
+@receiver(m2m_changed, sender=Book.likes.through)
+def update_likes_count(instance, action, reverse, pk_set, **kwargs):
+    '''Keep Book.likes_count equal to the number of rows in the likes table'''
+    if reverse and action == 'pre_clear':
+        instance._cleared_liked_books = list(instance.liked_books.values_list('pk', flat=True))
+        return None
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return None
+
+    if not reverse:
+        Book.objects.filter(pk=instance.pk).refresh_likes_count()
+        instance.likes_count = Book.objects.values_list('likes_count', flat=True).get(pk=instance.pk)
+        return None
+
+    books_pks = pk_set if action != 'post_clear' else instance.__dict__.pop('_cleared_liked_books', [])
+    if books_pks:
+        Book.objects.filter(pk__in=books_pks).refresh_likes_count()
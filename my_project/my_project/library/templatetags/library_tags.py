@@ -1,13 +1,11 @@
 from django import template
 
-from my_project.library.models import Book
-
 register = template.Library()
 
 
 @register.inclusion_tag("library/tags/one_book_details.html", takes_context=True)
-def book_details(context, pk):
-    context['book'] = Book.objects.filter(pk=pk)[0]
+def book_details(context, book):
+    context['book'] = book
     return context
 
 
@@ -18,4 +16,6 @@ def book_list(context):
 
 @register.inclusion_tag("library/tags/like_button.html", takes_context=True)
 def like_book(context):
+    book = context['book']
+    context['is_liked'] = book.is_liked_by(context['request'].user)
     return context
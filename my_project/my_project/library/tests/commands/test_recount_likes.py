@@ -0,0 +1,59 @@
+from io import StringIO
+
+from django import test as django_test
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+
+from my_project.library.models import Book
+
+UserModel = get_user_model()
+
+
+class RecountLikesCommandTest(django_test.TestCase):
+    CREDENTIALS = {
+        'username': 'user',
+        'email': 'user@email.com',
+        'password': 'testp@ss',
+    }
+    NUMBER_OF_USERS = 4
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.USER = UserModel.objects.create_user(**cls.CREDENTIALS)
+        cls.LIKERS = [UserModel.objects.create_user(username=f'user{i}', email=f'user{i}@email.com')
+                      for i in range(cls.NUMBER_OF_USERS)]
+
+    def _create_book(self):
+        return Book.objects.create(
+            title='Test title',
+            author='Test author',
+            owner=self.USER,
+        )
+
+    def test_likes_count__when_likes_added_and_removed__expect_stored_counter_follows(self):
+        book = self._create_book()
+
+        book.likes.add(*self.LIKERS)
+        book.likes.remove(self.LIKERS[0])
+
+        self.assertEqual(self.NUMBER_OF_USERS - 1, book.likes_count)
+        self.assertEqual(self.NUMBER_OF_USERS - 1, Book.objects.get(pk=book.pk).likes_count)
+
+    def test_likes_count__when_likes_cleared__expect_stored_counter_reset(self):
+        book = self._create_book()
+        book.likes.add(*self.LIKERS)
+
+        book.likes.clear()
+
+        self.assertEqual(0, book.likes_count)
+        self.assertEqual(0, Book.objects.get(pk=book.pk).likes_count)
+
+    def test_recount_likes__when_counter_drifted__expect_repaired(self):
+        book = self._create_book()
+        book.likes.add(*self.LIKERS)
+        Book.objects.filter(pk=book.pk).update(likes_count=0)
+
+        call_command('recount_likes', batch_size=1, stdout=StringIO())
+
+        self.assertEqual(self.NUMBER_OF_USERS, Book.objects.get(pk=book.pk).likes_count)
@@ -0,0 +1,55 @@
+from django import test as django_test
+from django.contrib.auth import get_user_model
+
+from my_project.library.models import Book
+from my_project.library.search import search_books
+
+UserModel = get_user_model()
+
+
+class SearchBooksTest(django_test.TestCase):
+    CREDENTIALS = {
+        'username': 'user',
+        'email': 'user@email.com',
+        'password': 'testp@ss',
+    }
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.USER = UserModel.objects.create_user(**cls.CREDENTIALS)
+
+    def _create_book(self, title='The Hobbit', author='J. R. R. Tolkien'):
+        return Book.objects.create(
+            title=title,
+            author=author,
+            owner=self.USER,
+        )
+
+    def test_search_books__when_title_prefix__expect_book_found(self):
+        book = self._create_book()
+
+        result = search_books(Book.objects.all(), 'hob', 'title')
+
+        self.assertListEqual([book], list(result))
+
+    def test_search_books__when_book_renamed__expect_found_only_by_new_title(self):
+        book = self._create_book()
+        book.title = 'The Silmarillion'
+        book.save()
+
+        self.assertFalse(search_books(Book.objects.all(), 'hobbit', 'title').exists())
+        self.assertListEqual([book], list(search_books(Book.objects.all(), 'silmarillion', 'title')))
+
+    def test_search_books__when_book_deleted__expect_not_found(self):
+        book = self._create_book()
+        book.delete()
+
+        self.assertFalse(search_books(Book.objects.all(), 'hobbit', 'title').exists())
+
+    def test_search_books__when_search_by_unknown_field__expect_no_books(self):
+        self._create_book()
+
+        result = search_books(Book.objects.all(), 'user', 'owner__password')
+
+        self.assertFalse(result.exists())
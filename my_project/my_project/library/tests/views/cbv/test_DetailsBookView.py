@@ -1,10 +1,14 @@
 from django import test as django_test
 from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth.models import Permission
 from django.urls import reverse
 
+from my_project.common.models import Notification
 from my_project.library.models import Book
 from my_project.library.views import ShowBooksDashboardView, DetailsBookView
+from my_project.offer.models import Offer
 
 UserModel = get_user_model()
 
@@ -115,6 +119,20 @@ class DetailsBookViewTest(django_test.TestCase):
         tradable_book = Book.objects.get(pk=book.pk)
         self.assertTrue(tradable_book.is_tradable)
 
+    def test_change_tradable__when_book_made_untradable__expect_active_offers_with_it_closed(self):
+        second_user = UserModel.objects.create_user(username='second_user', email='second_user@email.com')
+        book = self._create_book(owner=self.USER)
+        offer = Offer.objects.create(sender=self.USER, recipient=second_user)
+        offer.sender_books.set([book])
+        target_url = reverse('book_details',
+                             kwargs={'pk': book.pk})
+
+        self._login()
+        self.client.post(target_url)
+
+        self.assertFalse(Offer.objects.get(pk=offer.pk).is_active)
+        self.assertEqual(second_user, Notification.objects.order_by('pk').last().recipient)
+
     def test_change_tradable__when_user_and_not_his_book__expect_status_code_403(self):
         book = self._create_book(next_owner=self.USER)
         target_url = reverse('book_details',
@@ -172,3 +190,19 @@ class DetailsBookViewTest(django_test.TestCase):
         response = self.client.get(target_url)
 
         self.assertEqual(404, response.status_code)
+
+    def test_details_book__when_user_is_next_book_owner__expect_book_fetched_once(self):
+        second_user = UserModel.objects.create_user(username='second_user', email='second_user@email.com',
+                                                    password='testp@ss')
+        book = self._create_book(next_owner=self.USER, previous_owner=second_user)
+        target_url = reverse('book_details',
+                             kwargs={'pk': book.pk})
+        self._login()
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(target_url)
+
+        book_queries = [query for query in queries.captured_queries
+                        if query['sql'].startswith('SELECT') and '"library_book"."id" =' in query['sql']]
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(1, len(book_queries))
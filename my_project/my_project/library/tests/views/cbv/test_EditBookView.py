@@ -3,6 +3,7 @@ from django.contrib.auth import get_user_model
 from django.urls import reverse
 
 from my_project.library.models import Book
+from my_project.offer.models import Offer
 
 UserModel = get_user_model()
 
@@ -48,3 +49,17 @@ class EditBookViewTest(django_test.TestCase):
         self._login()
         response = self.client.get(self.TARGET_URL)
         self.assertEqual(403, response.status_code)
+
+    def test_edit_book__when_book_already_untradable__expect_active_offers_with_it_kept(self):
+        second_user = UserModel.objects.create_user(username='second_user', email='second_user@email.com')
+        book = Book.objects.create(title='Test title', author='Test author', owner=self.USER, is_tradable=False)
+        offer = Offer.objects.create(sender=second_user, recipient=self.USER)
+        offer.recipient_books.set([book])
+        self._login()
+
+        response = self.client.post(reverse('edit_book', kwargs={'pk': book.pk}),
+                                    data={'title': 'Edited title', 'author': 'Test author'})
+
+        self.assertEqual(302, response.status_code)
+        self.assertEqual('Edited title', Book.objects.get(pk=book.pk).title)
+        self.assertTrue(Offer.objects.get(pk=offer.pk).is_active)
@@ -1,9 +1,11 @@
 from django import test as django_test
 from django.contrib.auth import get_user_model
-from django.db.models import Count
+from django.db.models import Value
+from django.db.models.functions import Coalesce
 from django.urls import reverse
 
 from my_project.library.models import Book, Category
+from my_project.library.search import search_books
 from my_project.library.views import ShowBookListView
 
 UserModel = get_user_model()
@@ -54,7 +56,7 @@ class ShowBookListViewTest(django_test.TestCase):
 
     def test_show_books_list_when_no_query_params__expect_show_all_books_order_by_likes_and_ord_equal_dash_in_context(
             self):
-        expected_books = Book.objects.annotate(like_count=Count('likes')).order_by('-like_count', 'title')
+        expected_books = Book.objects.order_by('-likes_count', 'title')
 
         response = self.client.get(self.TARGET_URL)
 
@@ -67,8 +69,8 @@ class ShowBookListViewTest(django_test.TestCase):
         ord_by = 'title'
         query_data = {'ord_by': ord_by}
 
-        expected_books = Book.objects.annotate(like_count=Count('likes')).order_by('-like_count', 'title')
-        expected_books = expected_books.order_by(ord_by)
+        expected_books = Book.objects.order_by('-likes_count', 'title')
+        expected_books = expected_books.order_by(ord_by, 'pk')
 
         response = self.client.get(self.TARGET_URL,
                                    data=query_data)
@@ -81,8 +83,8 @@ class ShowBookListViewTest(django_test.TestCase):
         ord_by = 'author'
         query_data = {'ord_by': ord_by}
 
-        expected_books = Book.objects.annotate(like_count=Count('likes')).order_by('-like_count', 'title')
-        expected_books = expected_books.order_by(ord_by)
+        expected_books = Book.objects.order_by('-likes_count', 'title')
+        expected_books = expected_books.order_by(ord_by, 'pk')
 
         response = self.client.get(self.TARGET_URL,
                                    data=query_data)
@@ -94,8 +96,7 @@ class ShowBookListViewTest(django_test.TestCase):
         ord_by = 'category'
         query_data = {'ord_by': ord_by}
 
-        expected_books = Book.objects.annotate(like_count=Count('likes')).order_by('-like_count', 'title')
-        expected_books = expected_books.order_by(ord_by)
+        expected_books = Book.objects.order_by(Coalesce('category__name', Value('')), 'pk')
 
         response = self.client.get(self.TARGET_URL,
                                    data=query_data)
@@ -107,8 +108,8 @@ class ShowBookListViewTest(django_test.TestCase):
         ord_by = 'owner'
         query_data = {'ord_by': ord_by}
 
-        expected_books = Book.objects.annotate(like_count=Count('likes')).order_by('-like_count', 'title')
-        expected_books = expected_books.order_by(ord_by)
+        expected_books = Book.objects.order_by('-likes_count', 'title')
+        expected_books = expected_books.order_by(ord_by, 'pk')
 
         response = self.client.get(self.TARGET_URL,
                                    data=query_data)
@@ -116,14 +117,32 @@ class ShowBookListViewTest(django_test.TestCase):
         result_books = response.context.get(ShowBookListView.context_object_name)
         self.assertQuerysetEqual(expected_books, result_books)
 
+    def test_show_books_list_when_ord_by_old_likes_name__expect_show_all_books_order_by_likes(self):
+        expected_books = Book.objects.order_by('-likes_count', '-pk')
+
+        response = self.client.get(self.TARGET_URL, data={'ord_by': 'like_count', 'ord': '-'})
+
+        result_books = response.context.get(ShowBookListView.context_object_name)
+        self.assertListEqual(list(expected_books), list(result_books))
+        self.assertEqual('likes_count', response.context.get('ord_by'))
+
+    def test_show_books_list_when_ord_by_unknown_field__expect_default_order(self):
+        expected_books = Book.objects.order_by('-likes_count', 'title')
+
+        response = self.client.get(self.TARGET_URL, data={'ord_by': 'password'})
+
+        self.assertEqual(200, response.status_code)
+        self.assertQuerysetEqual(expected_books, response.context.get(ShowBookListView.context_object_name))
+        self.assertEqual('', response.context.get('ord_by'))
+
     def test_show_books_list_when_search_title__expect_show_all_books_contains_searched_title(self):
         search_by = 'title'
         search = '1'
         query_data = {'search_by': search_by,
                       'search': search}
 
-        expected_books = Book.objects.annotate(like_count=Count('likes')).order_by('-like_count', 'title')
-        expected_books = expected_books.filter(title__icontains=search)
+        expected_books = search_books(Book.objects.all(), search, search_by)
+        expected_books = expected_books.order_by('-search_rank', '-likes_count', 'title')
 
         response = self.client.get(self.TARGET_URL,
                                    data=query_data)
@@ -138,8 +157,8 @@ class ShowBookListViewTest(django_test.TestCase):
         query_data = {'search_by': search_by,
                       'search': search}
 
-        expected_books = Book.objects.annotate(like_count=Count('likes')).order_by('-like_count', 'title')
-        expected_books = expected_books.filter(author__icontains=search)
+        expected_books = search_books(Book.objects.all(), search, search_by)
+        expected_books = expected_books.order_by('-search_rank', '-likes_count', 'title')
 
         response = self.client.get(self.TARGET_URL,
                                    data=query_data)
@@ -154,8 +173,8 @@ class ShowBookListViewTest(django_test.TestCase):
         query_data = {'search_by': search_by,
                       'search': search}
 
-        expected_books = Book.objects.annotate(like_count=Count('likes')).order_by('-like_count', 'title')
-        expected_books = expected_books.filter(owner=self.SECOND_USER)
+        expected_books = Book.objects.filter(owner=self.SECOND_USER)
+        expected_books = expected_books.order_by('-likes_count', 'title')
 
         response = self.client.get(self.TARGET_URL,
                                    data=query_data)
@@ -175,7 +194,7 @@ class ShowBookListViewTest(django_test.TestCase):
                       'search_by': search_by,
                       'search': search}
 
-        expected_books = Book.objects.annotate(like_count=Count('likes')).order_by('-like_count', 'title')
+        expected_books = Book.objects.order_by('-likes_count', 'title')
         expected_books = expected_books.filter(author__icontains=search)
         expected_books = expected_books.order_by('-title')
 
@@ -190,3 +209,40 @@ class ShowBookListViewTest(django_test.TestCase):
         self.assertEqual(ord_by, response.context.get('ord_by'))
         self.assertEqual(search_by, response.context.get('search_by'))
         self.assertEqual(search, response.context.get('search'))
+
+    def test_show_books_list_when_ord_category_with_books_without_category__expect_same_order_by_page_and_cursor(self):
+        Book.objects.create(title='Test title', author='Test author', owner=self.USER)
+
+        for ord_ in ('', '-'):
+            query_data = {'ord_by': 'category', 'ord': ord_}
+            by_cursor = list(self.client.get(self.TARGET_URL, data=query_data)
+                             .context.get(ShowBookListView.context_object_name))
+            by_page = list(self.client.get(self.TARGET_URL, data={**query_data, 'page': 1})
+                           .context.get(ShowBookListView.context_object_name))
+
+            self.assertListEqual(by_cursor, by_page, msg=f'ord={ord_}')
+
+    def test_show_books_list_when_follow_cursors__expect_every_book_once_for_each_ord_by(self):
+        third_user = UserModel.objects.create_user(username='third_user', email='third_user@email.com')
+        self._create_books(ShowBookListView.paginate_by, third_user)
+        expected_order = {
+            'title': lambda book: book.title,
+            'author': lambda book: book.author,
+            'category': lambda book: book.category.name,
+            'owner__username': lambda book: book.owner.username,
+            'likes_count': lambda book: book.likes_count,
+        }
+
+        for ord_by, key in expected_order.items():
+            for ord_ in ('', '-'):
+                expected_books = sorted(Book.objects.all(), key=lambda book: (key(book), book.pk), reverse=bool(ord_))
+                query_data = {'ord_by': ord_by, 'ord': ord_}
+
+                response = self.client.get(self.TARGET_URL, data=query_data)
+                result_books = list(response.context.get(ShowBookListView.context_object_name))
+                while response.context.get('page_obj').has_next():
+                    query_data['cursor'] = response.context.get('page_obj').next_cursor
+                    response = self.client.get(self.TARGET_URL, data=query_data)
+                    result_books += list(response.context.get(ShowBookListView.context_object_name))
+
+                self.assertListEqual(expected_books, result_books, msg=f'ord_by={ord_by} ord={ord_}')
@@ -1,5 +1,7 @@
 from django import test as django_test
 from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from my_project.library.models import Book
@@ -80,3 +82,31 @@ class ShowBooksDashboardViewTest(django_test.TestCase):
         self.assertEqual(self.SECOND_USER, response.context.get('owner'))
         self.assertQuerysetEqual(expected_books_to_show,
                                  response.context.get(ShowBooksDashboardView.context_object_name))
+
+    def test_show_book_dashboard_when_viewer_liked_some_books__expect_liked_state_from_the_books_query(self):
+        books = list(Book.objects.filter(owner=self.SECOND_USER))
+        for book in books[:2]:
+            book.likes.add(self.USER)
+        target_url = reverse('show_books_dashboard',
+                             kwargs={'pk': self.SECOND_USER.pk})
+        self._login()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(target_url)
+
+        result = {book.pk: book.is_liked_by_viewer
+                  for book in response.context.get(ShowBooksDashboardView.context_object_name)}
+        self.assertDictEqual({book.pk: book in books[:2] for book in books}, result)
+        likes_queries = [query for query in queries.captured_queries if 'library_book_likes' in query['sql']]
+        self.assertEqual(1, len(likes_queries))
+
+    def test_show_book_dashboard_when_more_books__expect_same_number_of_queries(self):
+        target_url = reverse('show_books_dashboard',
+                             kwargs={'pk': self.SECOND_USER.pk})
+        self._login()
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(target_url)
+        self._create_books(ShowBooksDashboardView.paginate_by, self.SECOND_USER)
+        with CaptureQueriesContext(connection) as more_books_queries:
+            self.client.get(target_url)
+
+        self.assertEqual(len(queries.captured_queries), len(more_books_queries.captured_queries))
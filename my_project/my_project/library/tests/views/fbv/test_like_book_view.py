@@ -1,6 +1,9 @@
+from datetime import timedelta
+
 from django import test as django_test
 from django.contrib.auth import get_user_model
 from django.urls import reverse
+from django.utils import timezone
 
 from my_project.common.models import Notification
 from my_project.library.models import Book, Category
@@ -41,6 +44,10 @@ class LikeBookViewTest(django_test.TestCase):
                 password=self.CREDENTIALS.get('password'),
             )
 
+    @staticmethod
+    def _close_likes_window():
+        Notification.objects.update(received_date=timezone.now() - Notification.LIKES_WINDOW - timedelta(minutes=1))
+
     @staticmethod
     def _create_book(owner):
         return Book.objects.create(
@@ -71,6 +78,7 @@ class LikeBookViewTest(django_test.TestCase):
         book = self.BOOK
         book.likes.add(self.SECOND_USER)
         book.save()
+        self._close_likes_window()
         self._login(**self.SECOND_CREDENTIALS)
 
         self.client.get(self.TARGET_URL)
@@ -84,6 +92,41 @@ class LikeBookViewTest(django_test.TestCase):
         self.assertTrue(result_notf.is_answered)
         self.assertFalse(result_notf.is_read)
 
+    def test_like_book_view__when_like_and_unlike_in_window__expect_no_notf(self):
+        self._login(**self.SECOND_CREDENTIALS)
+
+        self.client.get(self.TARGET_URL)
+        self.client.get(self.TARGET_URL)
+
+        self.assertFalse(Notification.objects.filter(book=self.BOOK).exists())
+        self.assertEqual(0, UserModel.objects.get(pk=self.USER.pk).unread_notifications_count)
+
+    def test_like_book_view__when_second_liker_takes_like_back__expect_notf_not_crediting_them(self):
+        third_user = UserModel.objects.create_user(username='third_user', email='third_user@email.com',
+                                                   password='testp@ss')
+        self._login(**self.SECOND_CREDENTIALS)
+        self.client.get(self.TARGET_URL)
+        self.client.login(username=third_user.username, password='testp@ss')
+        self.client.get(self.TARGET_URL)
+        self.client.get(self.TARGET_URL)
+
+        notf = Notification.objects.get(book=self.BOOK)
+        self.assertEqual(1, notf.likes_delta)
+        self.assertEqual(f'1 person likes your book {self.BOOK}', notf.massage)
+
+    def test_like_book_view__when_many_likes_in_window__expect_one_rolling_notf(self):
+        likers = [UserModel.objects.create_user(username=f'liker{i}', email=f'liker{i}@email.com', password='testp@ss')
+                  for i in range(3)]
+        for liker in likers:
+            self.client.login(username=liker.username, password='testp@ss')
+            self.client.get(self.TARGET_URL)
+        self.client.get(self.TARGET_URL)
+
+        notf = Notification.objects.get(book=self.BOOK)
+        self.assertEqual(f'2 people like your book {self.BOOK}', notf.massage)
+        self.assertEqual(likers[-1], notf.sender)
+        self.assertEqual(1, UserModel.objects.get(pk=self.USER.pk).unread_notifications_count)
+
     def test_like_book_view__when_like_not_existing_book__expect__status_code_404(self):
         self._login(**self.SECOND_CREDENTIALS)
         target_url = reverse('like_book',
@@ -101,3 +144,15 @@ class LikeBookViewTest(django_test.TestCase):
         self._login()
         response = self.client.get(self.TARGET_URL)
         self.assertEqual(403, response.status_code)
+
+    def test_like_book_view__when_book_saved_from_instance_loaded_before_like__expect_likes_count_kept(self):
+        stale_book = Book.objects.get(pk=self.BOOK.pk)
+        self._login(**self.SECOND_CREDENTIALS)
+        self.client.get(self.TARGET_URL)
+
+        stale_book.title = 'Edited title'
+        stale_book.save()
+
+        book = Book.objects.get(pk=self.BOOK.pk)
+        self.assertEqual('Edited title', book.title)
+        self.assertEqual(1, book.likes_count)
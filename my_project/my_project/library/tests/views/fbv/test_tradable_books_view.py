@@ -0,0 +1,71 @@
+from django import test as django_test
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from my_project.library.models import Book
+from my_project.library.views.fb_views import TRADABLE_BOOKS_PAGE_SIZE
+
+UserModel = get_user_model()
+
+
+class TradableBooksViewTest(django_test.TestCase):
+    CREDENTIALS = {
+        'username': 'user',
+        'email': 'user@email.com',
+        'password': 'testp@ss',
+    }
+    SECOND_CREDENTIALS = {
+        'username': 'second_user',
+        'email': 'second_user@email.com',
+        'password': 'testp@ss',
+    }
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.USER = UserModel.objects.create_user(**cls.CREDENTIALS)
+        cls.SECOND_USER = UserModel.objects.create_user(**cls.SECOND_CREDENTIALS)
+        cls.TARGET_URL = reverse('tradable_books', kwargs={'pk': cls.SECOND_USER.pk})
+
+    def _login(self):
+        self.client.login(
+            username=self.CREDENTIALS.get('username'),
+            password=self.CREDENTIALS.get('password'),
+        )
+
+    @staticmethod
+    def _create_books(number, owner, title='title', **kwargs):
+        return [Book.objects.create(title=f'{title} {i:03}', author='author', owner=owner, **kwargs)
+                for i in range(number)]
+
+    def test_tradable_books__when_no_authenticated_user__expect_redirect_to_login_with_next(self):
+        response = self.client.get(self.TARGET_URL)
+        redirect_url_with_next = f"{reverse('login_user')}?next={self.TARGET_URL}"
+        self.assertRedirects(response, redirect_url_with_next, status_code=302, target_status_code=200)
+
+    def test_tradable_books__when_follow_pages__expect_every_tradable_book_of_the_user_once(self):
+        books = self._create_books(TRADABLE_BOOKS_PAGE_SIZE + 1, self.SECOND_USER)
+        self._create_books(1, self.SECOND_USER, is_tradable=False)
+        self._create_books(1, self.USER)
+        self._login()
+
+        first_page = self.client.get(self.TARGET_URL).json()
+        second_page = self.client.get(self.TARGET_URL, data={'page': first_page['next_page']}).json()
+
+        self.assertListEqual([book.pk for book in books],
+                             [book['id'] for book in first_page['results'] + second_page['results']])
+        self.assertIsNone(second_page['next_page'])
+
+    def test_tradable_books__when_search_and_exclude__expect_only_matching_books(self):
+        wanted_book, other_book = self._create_books(2, self.SECOND_USER, title='wanted')
+        self._create_books(2, self.SECOND_USER)
+        self._login()
+
+        response = self.client.get(self.TARGET_URL, data={'search': 'WANT', 'exclude': wanted_book.pk})
+
+        self.assertListEqual([{'id': other_book.pk, 'text': str(other_book)}], response.json()['results'])
+
+    def test_tradable_books__when_page_out_of_range__expect_404(self):
+        self._login()
+        response = self.client.get(self.TARGET_URL, data={'page': 2})
+        self.assertEqual(404, response.status_code)
@@ -2,7 +2,8 @@ from django.urls import path
 
 from my_project.library.views import ShowBooksDashboardView, CreateBookView, DetailsBookView, EditBookView, \
     DeleteBookView, accept_delete_book_view, ShowBookListView, like_book_view, ShowBooksOnAWayView, \
-    ShowBooksToSendView, reject_delete_book_view, receive_book_view
+    ShowBooksToSendView, reject_delete_book_view, receive_book_view, \
+    tradable_books_view
 
 urlpatterns = [
     path('list/', ShowBookListView.as_view(), name='book_list'),
@@ -14,6 +15,7 @@ urlpatterns = [
     path('edit/<int:pk>/', EditBookView.as_view(), name='edit_book'),
     path('delete/<int:pk>/', DeleteBookView.as_view(), name='delete_book'),
     path('like/<int:pk>/', like_book_view, name='like_book'),
+    path('tradable/<int:pk>/', tradable_books_view, name='tradable_books'),
 
     path('accept_deleted/<int:pk>/', accept_delete_book_view, name='accept_delete_book'),
     path('reject_deleted/<int:pk>/', reject_delete_book_view, name='reject_delete_book'),
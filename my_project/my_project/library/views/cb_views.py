@@ -1,16 +1,19 @@
 from django.contrib.auth import get_user_model
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.core.exceptions import PermissionDenied
-from django.db.models import Count
+from django.db.models import Value
+from django.db.models.functions import Coalesce
 from django.http import Http404
 from django.shortcuts import get_object_or_404, redirect
 from django.urls import reverse_lazy
 from django.views.generic import ListView, CreateView, DetailView, UpdateView, DeleteView
 
-from my_project.common.helpers.custom_mixins import PaginationShowMixin, AuthorizationRequiredMixin
+from my_project.common.helpers.custom_mixins import PaginationShowMixin, AuthorizationRequiredMixin, \
+    RequestObjectMixin
 from my_project.common.models import Notification
 from my_project.library.forms import SearchForm, BookForm, UsersListForm
 from my_project.library.models import Book, Category
+from my_project.library.search import search_books
 
 UserModel = get_user_model()
 
@@ -20,6 +23,18 @@ class ShowBookListView(PaginationShowMixin, ListView):
     model = Book
     context_object_name = 'books'
     paginate_by = 10
+    estimate_total = True
+    ORDER_FIELDS = {
+        'title': 'title',
+        'author': 'author',
+        'category': 'category_name',
+        'owner__username': 'owner__username',
+        'likes_count': 'likes_count',
+    }
+    ORD_BY_ALIASES = {
+        'like_count': 'likes_count',
+        'owner': 'owner__username',
+    }
 
     def get_context_data(self, *, object_list=None, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -35,19 +50,16 @@ class ShowBookListView(PaginationShowMixin, ListView):
         return context
 
     def get_queryset(self):
-        query_set = Book.objects.prefetch_related('owner', 'category', 'likes').filter(
-            owner__isnull=False, owner__is_active=True).annotate(like_count=Count('likes')).order_by(
-            '-like_count', 'title')
-        if self.search_by == SearchForm.SearchByChoices.owner:
-            owner = UserModel.objects.filter(username__icontains=self.search)
-            query_set = query_set.filter(owner__in=owner)
-        elif self.search_by:
-            query_filter = {f'{self.search_by}__icontains': self.search}
-            query_set = query_set.filter(**query_filter)
+        query_set = Book.objects.select_related('owner', 'category').filter(
+            owner__isnull=False, owner__is_active=True).order_by('-likes_count', 'title')
+        if self.search and self.search_by:
+            query_set = search_books(query_set, self.search, self.search_by) \
+                .order_by('-search_rank', '-likes_count', 'title')
+        if self.ord_by == 'category':
+            query_set = query_set.annotate(category_name=Coalesce('category__name', Value('')))
         if self.ord_by:
-            query_set = query_set.order_by(self.ord_by)
-            if self.order:
-                query_set = query_set.reverse()
+            direction = '-' if self.order else ''
+            query_set = query_set.order_by(direction + self.ORDER_FIELDS[self.ord_by], direction + 'pk')
         return query_set
 
     @property
@@ -56,7 +68,10 @@ class ShowBookListView(PaginationShowMixin, ListView):
 
     @property
     def ord_by(self):
-        return self.request.GET.get("ord_by", '')
+        '''One of ORDER_FIELDS, the names of older links are aliases and unknown ones fall back to the default'''
+        ord_by = self.request.GET.get("ord_by", '')
+        ord_by = self.ORD_BY_ALIASES.get(ord_by, ord_by)
+        return ord_by if ord_by in self.ORDER_FIELDS else ''
 
     @property
     def search(self):
@@ -72,6 +87,7 @@ class ShowBookView(PaginationShowMixin, ListView):
     context_object_name = 'books'
     model = Book
     paginate_by = 9
+    RELATED_FIELDS = ('owner', 'category', 'next_owner', 'previous_owner')
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -88,9 +104,10 @@ class ShowBookView(PaginationShowMixin, ListView):
         field = self._get_query_filter_field()
         owner = self._get_owner()
         search = self.request.GET.get("search", '')
-        query_filter = {field: owner,
-                        'title__icontains': search}
-        query_set = Book.objects.prefetch_related(field).filter(**query_filter)
+        query_set = Book.objects.select_related(*self.RELATED_FIELDS).filter(**{field: owner}) \
+            .with_viewer_likes(self.request.user)
+        if search:
+            query_set = search_books(query_set, search, SearchForm.SearchByChoices.title)
         return query_set
 
     def _get_owner(self):
@@ -162,10 +179,14 @@ class CreateBookView(LoginRequiredMixin, CreateView):
         return new_category
 
 
-class DetailsBookView(DetailView):
+class DetailsBookView(RequestObjectMixin, DetailView):
     model = Book
     context_object_name = 'book'
     template_name = 'library/book_details.html'
+    related_fields = ('owner', 'category', 'next_owner', 'previous_owner')
+
+    def get_queryset(self):
+        return super().get_queryset().with_viewer_likes(self.request.user)
 
     def dispatch(self, request, *args, **kwargs):
         book = self.get_object()
@@ -183,7 +204,7 @@ class DetailsBookView(DetailView):
         if not self.request.user == book.owner:
             raise PermissionDenied
         book.is_tradable = not book.is_tradable
-        book.save()
+        book.save(update_fields=['is_tradable'])
         return redirect(self.request.path)
 
     def get_template_names(self):
@@ -211,6 +232,7 @@ class DeleteBookView(LoginRequiredMixin, AuthorizationRequiredMixin, DeleteView)
     model = Book
     form_class = UsersListForm
     authorizing_fields = ['owner']
+    related_fields = ('owner',)
 
     def get(self, *args, **kwargs):
         choices = [(0, 'nobody')] + [(user.pk, user.username) for user in
@@ -221,9 +243,7 @@ class DeleteBookView(LoginRequiredMixin, AuthorizationRequiredMixin, DeleteView)
     def form_valid(self, form):
         user_pk = self.request.POST.get('user')
         book = self.get_object()
-        book.ex_owners.add(book.owner)
-        book.owner = None
-        book.save()
+        Book.objects.filter(pk=book.pk).give_away()
         if not user_pk == '0':
             user = UserModel.objects.get(pk=user_pk)
             Notification.create_notification_for_deleted_book(
@@ -1,8 +1,12 @@
 from django.contrib.auth.decorators import login_required
 from django.core.exceptions import PermissionDenied
-from django.http import Http404
+from django.core.paginator import InvalidPage
+from django.db import transaction
+from django.db.models import Q
+from django.http import Http404, JsonResponse
 from django.shortcuts import get_object_or_404, redirect
 
+from my_project.common.helpers.custom_paginators import ProbePaginator
 from my_project.common.helpers.custom_wrapers import access_required
 from my_project.common.models import Notification
 from my_project.library.models import Book
@@ -23,13 +27,11 @@ def like_book_view(request, pk):
     if request.user == book.owner:
         raise PermissionDenied(access_denied_massage)
 
-    if request.user in book.likes.all():
+    if book.is_liked_by(request.user):
         book.likes.remove(request.user)
     else:
         book.likes.add(request.user)
 
-    book.save()
-
     return redirect(back)
 
 
@@ -41,12 +43,11 @@ def accept_delete_book_view(request, pk, notification):
         raise Http404
 
     is_answer_already(notification)
-    notification.is_answered = True
-    notification.save()
+    notification.answer()
 
     book.next_owner = request.user
     book.previous_owner = book.ex_owners.last()
-    book.save()
+    book.save(update_fields=['next_owner', 'previous_owner'])
 
     return redirect('show_books_on_a_way')
 
@@ -59,18 +60,40 @@ def reject_delete_book_view(request, pk, notification):
         raise Http404
     is_answer_already(notification)
 
-    notification.is_answered = True
-    notification.save()
+    notification.answer()
     return redirect('show_notifications')
 
 
 @login_required()
 @access_required(Book, 'next_owner')
 def receive_book_view(request, pk, book):
-    book.owner = book.next_owner
-    book.previous_owner = None
-    book.next_owner = None
-    if request.user in book.likes.all():
-        book.likes.remove(request.user)
-    book.save()
+    with transaction.atomic():
+        Book.objects.filter(pk=book.pk).receive()
+        if book.is_liked_by(request.user):
+            book.likes.remove(request.user)
     return redirect('show_books_dashboard', pk=request.user.pk)
+
+
+TRADABLE_BOOKS_PAGE_SIZE = 20
+
+
+@login_required()
+def tradable_books_view(request, pk):
+    '''One page of the tradable books of a user as JSON, for the book pickers of the offer forms'''
+    books = Book.objects.filter(owner=pk, is_tradable=True).only('title', 'author').order_by('title', 'pk')
+    search = request.GET.get('search')
+    if search:
+        books = books.filter(Q(title__icontains=search) | Q(author__icontains=search))
+    exclude = request.GET.get('exclude')
+    if exclude and exclude.isdigit():
+        books = books.exclude(pk=exclude)
+
+    paginator = ProbePaginator(books, TRADABLE_BOOKS_PAGE_SIZE)
+    try:
+        page = paginator.page(request.GET.get('page', 1))
+    except InvalidPage:
+        raise Http404
+    return JsonResponse({
+        'results': [{'id': book.pk, 'text': str(book)} for book in page],
+        'next_page': page.next_page_number() if page.has_next() else None,
+    })
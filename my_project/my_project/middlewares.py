@@ -1,10 +1,24 @@
 import logging
 
+from asgiref.sync import sync_to_async, iscoroutinefunction, markcoroutinefunction
 from django.core.checks import Debug
 from django.shortcuts import render
+from django.utils.decorators import sync_and_async_middleware
+from whitenoise.middleware import WhiteNoiseMiddleware
 
 
+@sync_and_async_middleware
 def handle_server_internal_error(get_response):
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            result = await get_response(request)
+            if result.status_code >= 500 and not Debug:
+                logging.error(f"Error catch by middleware in {request.path}")
+                return await sync_to_async(render)(request, '500.html')
+            return result
+
+        return middleware
+
     def middleware(request):
         result = get_response(request)
         if result.status_code >= 500 and not Debug:
@@ -13,3 +27,29 @@ def handle_server_internal_error(get_response):
         return result
 
     return middleware
+
+
+class AsyncWhiteNoiseMiddleware(WhiteNoiseMiddleware):
+    '''
+    WhiteNoiseMiddleware which keeps an async request path async under ASGI:
+    only the requests of static files are served in a thread, the others are awaited
+    '''
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, *args, **kwargs):
+        super().__init__(get_response, *args, **kwargs)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        static_file = await sync_to_async(self.find_file)(request.path_info) if self.autorefresh \
+            else self.files.get(request.path_info)
+        if static_file is not None:
+            return await sync_to_async(self.serve)(static_file, request)
+        return await self.get_response(request)
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class OfferConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'my_project.offer'
+
+    def ready(self):
+        from . import signals
@@ -1,7 +1,9 @@
 from django import forms
 from django.core.exceptions import ValidationError
+from django.urls import reverse
 
 from my_project.common.helpers.custom_mixins import AddCCSMixin
+from my_project.common.helpers.custom_widgets import LazySelectMultiple
 from my_project.library.models import Book
 from my_project.offer.models import Offer
 
@@ -24,10 +26,18 @@ class CreateOfferForm(AddCCSMixin, forms.ModelForm):
         want_more_books = Book.objects.filter(owner=recipient, is_tradable=True).exclude(pk=wanted_book.pk)
         self.fields['recipient_books'].queryset = want_more_books
         self.fields['recipient_books'].required = False
+        '''The pickers load the books from the tradable books of their owner'''
+        self.fields['sender_books'].widget.attrs['data-url'] = reverse('tradable_books', kwargs={'pk': sender.pk})
+        self.fields['recipient_books'].widget.attrs['data-url'] = \
+            reverse('tradable_books', kwargs={'pk': recipient.pk}) + f'?exclude={wanted_book.pk}'
 
     class Meta:
         model = Offer
         fields = ['recipient_books', 'sender_books']
+        widgets = {
+            'recipient_books': LazySelectMultiple,
+            'sender_books': LazySelectMultiple,
+        }
 
 
 class NegotiateOfferForm(AddCCSMixin, forms.ModelForm):
@@ -45,12 +55,20 @@ class NegotiateOfferForm(AddCCSMixin, forms.ModelForm):
             'sender_books']
         self.fields['sender_books'].queryset = Book.objects.filter(owner=new_sender, is_tradable=True)
         self.fields['recipient_books'].queryset = Book.objects.filter(owner=new_recipient, is_tradable=True)
+        self.fields['sender_books'].widget.attrs['data-url'] = reverse('tradable_books', kwargs={'pk': new_sender.pk})
+        self.fields['recipient_books'].widget.attrs['data-url'] = \
+            reverse('tradable_books', kwargs={'pk': new_recipient.pk})
 
     class Meta:
         model = Offer
         fields = ['recipient_books', 'sender_books']
+        widgets = {
+            'recipient_books': LazySelectMultiple,
+            'sender_books': LazySelectMultiple,
+        }
 
     def clean(self):
-        if all(self.initial[field] == list(self.cleaned_data[field]) for field in self.initial):
+        if all({book.pk for book in self.initial[field]} == {book.pk for book in self.cleaned_data.get(field, ())}
+               for field in self.Meta.fields):
             raise ValidationError(self.NOT_CHANGE_ERROR)
         return super().clean()
@@ -0,0 +1,39 @@
+from django.core.management import BaseCommand
+
+from my_project.offer import trade_cycles
+from my_project.offer.models import CircularTradeStep
+
+
+class Command(BaseCommand):
+    help = 'Find circles of users who like each other\'s books and propose them as circular trades'
+
+    DEFAULT_MAX_TRADES_PER_USER = 3
+
+    def add_arguments(self, parser):
+        parser.add_argument('--min-length', type=int, default=trade_cycles.MIN_LENGTH)
+        parser.add_argument('--max-length', type=int, default=trade_cycles.MAX_LENGTH)
+        parser.add_argument('--workers', type=int, default=None,
+                            help='Number of processes, all cores by default')
+        parser.add_argument('--max-steps-per-user', type=int, default=trade_cycles.MAX_STEPS_PER_USER)
+        parser.add_argument('--max-cycles-per-user', type=int, default=trade_cycles.MAX_CYCLES_PER_USER)
+        parser.add_argument('--max-trades-per-user', type=int, default=self.DEFAULT_MAX_TRADES_PER_USER)
+
+    def handle(self, *args, **options):
+        graph = trade_cycles.WantsGraph.from_database()
+        self.stdout.write(f'Wants graph: {len(graph)} users, {len(graph.targets)} wants')
+
+        cycles = trade_cycles.find_cycles(
+            graph,
+            workers=options['workers'],
+            min_length=options['min_length'],
+            max_length=options['max_length'],
+            max_cycles=options['max_cycles_per_user'],
+            max_steps=options['max_steps_per_user'],
+        )
+        '''Books of the trades somebody already accepted stay reserved for them'''
+        reserved_books = CircularTradeStep.objects \
+            .filter(trade__is_active=True, trade__steps__is_accepted=True) \
+            .values_list('book', flat=True)
+        chosen = trade_cycles.choose_trades(graph, cycles, options['max_trades_per_user'], reserved_books)
+        trade_cycles.save_trades(graph, chosen)
+        self.stdout.write(self.style.SUCCESS(f'Found {len(cycles)} cycles, proposed {len(chosen)} circular trades'))
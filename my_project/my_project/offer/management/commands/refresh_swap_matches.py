@@ -0,0 +1,28 @@
+from django.contrib.auth import get_user_model
+from django.core.management import BaseCommand
+
+from my_project.offer.models import SwapMatch
+
+UserModel = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the precomputed swap matches of every user'
+
+    DEFAULT_BATCH_SIZE = 1000
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=self.DEFAULT_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        last_pk = 0
+        while True:
+            pks = list(UserModel.objects.filter(pk__gt=last_pk)
+                       .order_by('pk')
+                       .values_list('pk', flat=True)[:batch_size])
+            if not pks:
+                break
+            SwapMatch.objects.refresh_for_users(pks)
+            last_pk = pks[-1]
+        self.stdout.write(self.style.SUCCESS(f'Found {SwapMatch.objects.count()} swap matches'))
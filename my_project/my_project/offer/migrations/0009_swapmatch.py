@@ -0,0 +1,40 @@
+# Generated by Django 4.0.10 on 2026-10-18 13:09
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('library', '0031_book_search_indexes'),
+        ('offer', '0008_alter_offer_options_offer_received_date'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SwapMatch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('wanted_books_count', models.PositiveIntegerField()),
+                ('offered_books_count', models.PositiveIntegerField()),
+                ('score', models.PositiveIntegerField()),
+                ('counterpart', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='swap_matches', to=settings.AUTH_USER_MODEL)),
+                ('wanted_book', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='library.book')),
+            ],
+            options={
+                'ordering': ['-score', '-wanted_books_count', 'counterpart'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='swapmatch',
+            index=models.Index(fields=['user', '-score', '-wanted_books_count'], name='offer_swapmatch_rank_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='swapmatch',
+            constraint=models.UniqueConstraint(fields=('user', 'counterpart'), name='offer_swapmatch_unique_pair'),
+        ),
+    ]
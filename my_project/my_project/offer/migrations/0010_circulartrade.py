@@ -0,0 +1,48 @@
+# Generated by Django 4.0.10 on 2026-10-18 13:13
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library', '0031_book_search_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('offer', '0009_swapmatch'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CircularTrade',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('is_active', models.BooleanField(default=True)),
+                ('is_accept', models.BooleanField(default=False)),
+                ('created_date', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['-created_date'],
+            },
+        ),
+        migrations.CreateModel(
+            name='CircularTradeStep',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.PositiveSmallIntegerField()),
+                ('is_accepted', models.BooleanField(default=False)),
+                ('book', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='library.book')),
+                ('giver', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('receiver', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('trade', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='steps', to='offer.circulartrade')),
+            ],
+            options={
+                'ordering': ['trade', 'position'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='circulartradestep',
+            index=models.Index(fields=['giver', 'trade'], name='offer_tradestep_giver_idx'),
+        ),
+    ]
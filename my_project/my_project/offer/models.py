@@ -1,11 +1,92 @@
 from django.contrib.auth import get_user_model
-from django.db import models
+from django.core.exceptions import ObjectDoesNotExist
+from django.db import models, connections, transaction
+from django.db.models import QuerySet, Exists, OuterRef, Q, F, Count, Min
+from django.db.models.expressions import RawSQL
 
 # Create your models here.
 from my_project.library.models import Book
 
 UserModel = get_user_model()
+
+
+class OfferQueryset(QuerySet):
+    RECURSIVE_CTE_VENDORS = ('postgresql', 'sqlite')
+    THREAD_SQL = '''
+        WITH RECURSIVE earlier(id, previous_offer_id) AS (
+            SELECT id, previous_offer_id FROM {table} WHERE id = %s
+            UNION ALL
+            SELECT o.id, o.previous_offer_id FROM {table} o INNER JOIN earlier e ON o.id = e.previous_offer_id
+        ), later(id) AS (
+            SELECT id FROM {table} WHERE previous_offer_id = %s
+            UNION ALL
+            SELECT o.id FROM {table} o INNER JOIN later l ON o.previous_offer_id = l.id
+        )
+        SELECT id FROM earlier UNION SELECT id FROM later
+    '''
+
+    def latest_of_threads(self):
+        '''Only the offers without a counter offer: one for each negotiation'''
+        return self.filter(next_offer__isnull=True)
+
+    def thread(self, offer):
+        '''
+        Every offer of the negotiation offer belongs to, the first one first.
+        One recursive query where supported, elsewhere the thread is walked one offer at a time.
+        '''
+        if connections[self.db].vendor in self.RECURSIVE_CTE_VENDORS:
+            sql = self.THREAD_SQL.format(table=self.model._meta.db_table)
+            thread_pks = RawSQL(sql, (offer.pk, offer.pk))
+        else:
+            thread_pks = self._walk_thread(offer)
+        return self.filter(pk__in=thread_pks).order_by('received_date', 'pk')
+
+    @staticmethod
+    def _walk_thread(offer):
+        thread_pks = []
+        current = offer
+        while current:
+            thread_pks.append(current.pk)
+            current = current.previous_offer
+        current = offer
+        while True:
+            try:
+                current = current.next_offer
+            except ObjectDoesNotExist:
+                return thread_pks
+            thread_pks.append(current.pk)
+
+    def with_validity(self):
+        '''Annotate is_still_valid: every book of the offer still belongs to its side, checked inside the query'''
+        missing_sender_books = Book.objects.filter(offered=OuterRef('pk')).exclude(owner=OuterRef('sender'))
+        missing_recipient_books = Book.objects.filter(wanted=OuterRef('pk')).exclude(owner=OuterRef('recipient'))
+        return self.annotate(is_still_valid=~Exists(missing_sender_books) & ~Exists(missing_recipient_books))
+
+    def involving(self, book_pks):
+        '''Offers with any of the books on either side, found through the book index of both join tables'''
+        sender_books = Offer.sender_books.through.objects.filter(book__in=book_pks).values('offer')
+        recipient_books = Offer.recipient_books.through.objects.filter(book__in=book_pks).values('offer')
+        return self.filter(Q(pk__in=sender_books) | Q(pk__in=recipient_books))
+
+    def deactivate(self):
+        '''Deactivate the active offers in one update and return them, with what their notifications need'''
+        with transaction.atomic():
+            offers = list(self.filter(is_active=True)
+                          .select_for_update(of=('self',))
+                          .only('sender', 'recipient', 'previous_offer')
+                          .order_by('pk'))
+            if offers:
+                Offer.objects.filter(pk__in=[offer.pk for offer in offers]).update(is_active=False)
+        return offers
+
+    def deactivate_involving(self, book_pks):
+        '''Deactivate the active offers with any of the books in one update and return them'''
+        return self.involving(book_pks).deactivate()
+
+
 class Offer(models.Model):
+    objects = OfferQueryset.as_manager()
+
     sender = models.ForeignKey(
         UserModel,
         on_delete=models.DO_NOTHING,
@@ -50,7 +131,206 @@ class Offer(models.Model):
     class Meta:
         ordering = ['-received_date']
 
+    def get_missing_books(self):
+        '''Books which no longer belong to their side of the offer, as (sender's, recipient's), from one query'''
+        sender_books = Offer.sender_books.through.objects.filter(offer=self.pk).values('book')
+        recipient_books = Offer.recipient_books.through.objects.filter(offer=self.pk).values('book')
+        missing_books = Book.objects.filter(
+            Q(pk__in=sender_books) & ~Q(owner=self.sender_id)
+            | Q(pk__in=recipient_books) & ~Q(owner=self.recipient_id)
+        ).annotate(is_sender_book=Exists(sender_books.filter(book=OuterRef('pk'))))
+        s_missing_books, r_missing_books = [], []
+        for book in missing_books:
+            (s_missing_books if book.is_sender_book else r_missing_books).append(book)
+        return s_missing_books, r_missing_books
+
     def __str__(self):
-        if self.previous_offer:
+        if self.previous_offer_id:
             return f'Counter offer №{self.pk}'
         return f'Offer №{self.pk}'
+
+
+class SwapMatchQueryset(QuerySet):
+    def refresh_for_users(self, user_pks):
+        '''
+        Recompute every match of the given users with one aggregate query over the likes,
+        then replace their rows with one delete and one bulk insert.
+        '''
+        user_pks = set(user_pks)
+        if not user_pks:
+            return 0
+        matches = self.build_matches(Q(owner__in=user_pks) | Q(likes__in=user_pks))
+        with transaction.atomic():
+            SwapMatch.objects.filter(Q(user__in=user_pks) | Q(counterpart__in=user_pks)).delete()
+            SwapMatch.objects.bulk_create(matches)
+        return len(matches)
+
+    def refresh_pairs(self, pairs):
+        '''
+        Recompute only the matches between the users of each pair, from the likes between them.
+        A like or an unlike changes nothing but the match of the liker and the owner of the book.
+        '''
+        pairs = {tuple(sorted(pair)) for pair in pairs if None not in pair and pair[0] != pair[1]}
+        if not pairs:
+            return 0
+        likes_between = Q()
+        rows_between = Q()
+        for first_pk, second_pk in pairs:
+            likes_between |= Q(owner=first_pk, likes=second_pk) | Q(owner=second_pk, likes=first_pk)
+            rows_between |= Q(user=first_pk, counterpart=second_pk) | Q(user=second_pk, counterpart=first_pk)
+        matches = self.build_matches(likes_between)
+        with transaction.atomic():
+            SwapMatch.objects.filter(rows_between).delete()
+            SwapMatch.objects.bulk_create(matches)
+        return len(matches)
+
+    @staticmethod
+    def build_matches(likes):
+        '''The matches of the users who both like tradable books of each other, among the likes of the filter'''
+        wants = Book.objects.filter(
+            likes,
+            ~Q(owner=F('likes')),
+            is_tradable=True,
+            owner__is_active=True,
+            likes__is_active=True,
+        ) \
+            .values('likes', 'owner') \
+            .annotate(books_count=Count('pk'), wanted_book=Min('pk')) \
+            .order_by()
+        wants = {(want['likes'], want['owner']): want for want in wants}
+        return [
+            SwapMatch(
+                user_id=user_pk,
+                counterpart_id=counterpart_pk,
+                wanted_book_id=want['wanted_book'],
+                wanted_books_count=want['books_count'],
+                offered_books_count=wants[counterpart_pk, user_pk]['books_count'],
+                score=min(want['books_count'], wants[counterpart_pk, user_pk]['books_count']),
+            )
+            for (user_pk, counterpart_pk), want in wants.items()
+            if (counterpart_pk, user_pk) in wants
+        ]
+
+
+class SwapMatch(models.Model):
+    '''
+    A user and a counterpart who both like tradable books of each other.
+    Kept up to date by the offer signals, rebuilt by the refresh_swap_matches command.
+    '''
+    objects = SwapMatchQueryset.as_manager()
+
+    user = models.ForeignKey(
+        UserModel,
+        on_delete=models.CASCADE,
+        related_name='swap_matches',
+    )
+
+    counterpart = models.ForeignKey(
+        UserModel,
+        on_delete=models.CASCADE,
+        related_name='+',
+    )
+
+    wanted_book = models.ForeignKey(
+        Book,
+        on_delete=models.CASCADE,
+        related_name='+',
+    )
+
+    wanted_books_count = models.PositiveIntegerField()
+
+    offered_books_count = models.PositiveIntegerField()
+
+    score = models.PositiveIntegerField()
+
+    class Meta:
+        ordering = ['-score', '-wanted_books_count', 'counterpart']
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'counterpart'], name='offer_swapmatch_unique_pair'),
+        ]
+        indexes = [
+            models.Index(fields=['user', '-score', '-wanted_books_count'], name='offer_swapmatch_rank_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.user} and {self.counterpart}'
+
+
+class CircularTradeQueryset(QuerySet):
+    def of_user(self, user):
+        return self.filter(pk__in=CircularTradeStep.objects.filter(giver=user).values('trade'))
+
+    def unanswered(self):
+        '''Active proposals nobody has accepted yet, the trade cycle finder replaces them on each run'''
+        return self.filter(is_active=True).exclude(steps__is_accepted=True)
+
+
+class CircularTrade(models.Model):
+    '''
+    A trade between three or more users, found by the trade cycle finder:
+    each user gives a book to the previous one in the circle and gets a liked book from the next one.
+    '''
+    objects = CircularTradeQueryset.as_manager()
+
+    is_active = models.BooleanField(
+        default=True,
+    )
+
+    is_accept = models.BooleanField(
+        default=False,
+    )
+
+    created_date = models.DateTimeField(
+        auto_now_add=True,
+    )
+
+    class Meta:
+        ordering = ['-created_date']
+
+    def __str__(self):
+        return f'Circular trade №{self.pk}'
+
+    def get_missing_steps(self):
+        '''Steps whose book no longer belongs to its giver or is not tradable anymore'''
+        return self.steps.filter(~Q(book__owner=F('giver')) | Q(book__is_tradable=False))
+
+
+class CircularTradeStep(models.Model):
+    trade = models.ForeignKey(
+        CircularTrade,
+        on_delete=models.CASCADE,
+        related_name='steps',
+    )
+
+    position = models.PositiveSmallIntegerField()
+
+    giver = models.ForeignKey(
+        UserModel,
+        on_delete=models.CASCADE,
+        related_name='+',
+    )
+
+    receiver = models.ForeignKey(
+        UserModel,
+        on_delete=models.CASCADE,
+        related_name='+',
+    )
+
+    book = models.ForeignKey(
+        Book,
+        on_delete=models.CASCADE,
+        related_name='+',
+    )
+
+    is_accepted = models.BooleanField(
+        default=False,
+    )
+
+    class Meta:
+        ordering = ['trade', 'position']
+        indexes = [
+            models.Index(fields=['giver', 'trade'], name='offer_tradestep_giver_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.giver} gives {self.book} to {self.receiver}'
@@ -0,0 +1,47 @@
+from django.db.models import signals
+from django.db.models.signals import m2m_changed
+from django.dispatch import receiver
+
+from my_project.library.models import Book, books_owner_changed
+from my_project.offer.models import SwapMatch
+
+MATCHING_FIELDS = {'owner', 'is_tradable'}
+
+
+@receiver(m2m_changed, sender=Book.likes.through)
+def refresh_swap_matches_on_like(instance, action, reverse, pk_set, **kwargs):
+    if action == 'pre_clear':
+        instance._cleared_likes = list(
+            instance.liked_books.values_list('owner', flat=True) if reverse else instance.likes.values_list('pk', flat=True))
+        return None
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return None
+
+    if action == 'post_clear':
+        counterpart_pks = set(instance.__dict__.pop('_cleared_likes', []))
+    elif reverse:
+        counterpart_pks = set(Book.objects.filter(pk__in=pk_set).values_list('owner', flat=True))
+    else:
+        counterpart_pks = set(pk_set)
+    user_pk = instance.pk if reverse else instance.owner_id
+    SwapMatch.objects.refresh_pairs({(user_pk, counterpart_pk) for counterpart_pk in counterpart_pks})
+
+
+@receiver(signals.post_save, sender=Book)
+def refresh_swap_matches_on_book_change(instance, created, update_fields, **kwargs):
+    if created or update_fields and not MATCHING_FIELDS.intersection(update_fields):
+        return None
+    if not instance.owner_id:
+        return None
+    SwapMatch.objects.refresh_for_users({instance.owner_id})
+
+
+@receiver(signals.post_delete, sender=Book)
+def refresh_swap_matches_on_book_delete(instance, **kwargs):
+    if instance.owner_id:
+        SwapMatch.objects.refresh_for_users({instance.owner_id})
+
+
+@receiver(books_owner_changed)
+def refresh_swap_matches_on_owner_change(user_pks, **kwargs):
+    SwapMatch.objects.refresh_for_users(user_pks)
@@ -68,3 +68,35 @@ class CreateOfferViewTestsGet(SetupCreateOfferViewTests):
         response = self.client.get(self.TARGET_URL)
         redirect_url_with_next = f"{reverse('login_user')}?next={self.TARGET_URL}"
         self.assertRedirects(response, redirect_url_with_next, status_code=302, target_status_code=200)
+
+    def test_create_offer_get__when_from_swap_match__expect_liked_books_as_initial(self):
+        self._create_book(self.USER)
+        self._create_book(self.USER)
+        self._create_book(self.SECOND_USER)
+        user_book = Book.objects.filter(owner=self.USER).first()
+        second_user_book = Book.objects.filter(owner=self.SECOND_USER).exclude(pk=self.WANTED_BOOK.pk).get()
+        user_book.likes.add(self.SECOND_USER)
+        self.WANTED_BOOK.likes.add(self.USER)
+        second_user_book.likes.add(self.USER)
+        self._set_user_cf()
+        self._login()
+
+        response = self.client.get(self.TARGET_URL, data={'match': 1})
+
+        form = response.context.get('form')
+        self.assertQuerysetEqual([user_book], form.initial.get('sender_books'))
+        self.assertQuerysetEqual([second_user_book], form.initial.get('recipient_books'))
+
+    def test_create_offer_get__when_many_books__expect_only_selected_books_rendered_and_pickers_urls(self):
+        for _ in range(5):
+            self._create_book(self.USER)
+        self._set_user_cf()
+        self._login()
+
+        response = self.client.get(self.TARGET_URL)
+
+        form = response.context.get('form')
+        self.assertNotContains(response, '<option')
+        self.assertTrue(response.context.get('has_books'))
+        self.assertEqual(reverse('tradable_books', kwargs={'pk': self.USER.pk}),
+                         form.fields.get('sender_books').widget.attrs.get('data-url'))
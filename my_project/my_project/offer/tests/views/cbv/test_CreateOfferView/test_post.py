@@ -1,7 +1,12 @@
-from my_project.common.models import Notification
+from unittest import mock
+
+from django.test import override_settings
+
+from my_project.common.models import Notification, NotificationOutbox
 from my_project.library.models import Book
 from my_project.offer.models import Offer
 from my_project.offer.tests.views.cbv.test_CreateOfferView.setup import SetupCreateOfferViewTests
+from my_project.offer.views.cb_views import CreateOfferView
 
 
 class CreateOfferViewTestsPost(SetupCreateOfferViewTests):
@@ -34,6 +39,20 @@ class CreateOfferViewTestsPost(SetupCreateOfferViewTests):
         self.assertFalse(notification.is_answered)
 
 
+    @override_settings(NOTIFICATIONS_OUTBOX=True)
+    def test_create_offer__when_fails_after_offer_saved__expect_offer_and_outbox_entry_rolled_back(self):
+        self._create_book(self.USER)
+        sender_book_pk = Book.objects.get(owner=self.USER).pk
+        self._set_user_cf()
+        self._login()
+
+        with mock.patch.object(CreateOfferView, 'get_success_url', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                self.client.post(self.TARGET_URL, data={'sender_books': [sender_book_pk]})
+
+        self.assertFalse(Offer.objects.exists())
+        self.assertFalse(NotificationOutbox.objects.exists())
+
     def test_create_offer__when_zero_for_wanted_book_expect_not_created_offer_and_error(self):
         self._set_user_cf()
         self._login()
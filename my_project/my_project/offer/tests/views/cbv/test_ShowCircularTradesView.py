@@ -0,0 +1,118 @@
+from io import StringIO
+
+from django import test as django_test
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.urls import reverse
+
+from my_project.library.models import Book
+from my_project.offer.models import CircularTrade
+from my_project.offer.trade_cycles import WantsGraph
+from my_project.offer.views import ShowCircularTradesView
+
+UserModel = get_user_model()
+
+
+class ShowCircularTradesViewTests(django_test.TestCase):
+    PASSWORD = 'testp@ss'
+    TARGET_URL = reverse('show_circular_trades')
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.USERS = [UserModel.objects.create_user(username=f'user_{i}', email=f'user_{i}@email.com',
+                                                   password=cls.PASSWORD) for i in range(4)]
+
+    def _login(self, user):
+        self.client.login(username=user.username, password=self.PASSWORD)
+
+    @staticmethod
+    def _create_book(owner):
+        return Book.objects.create(title='Test title', author='Test author', owner=owner)
+
+    def _create_cycle(self, users):
+        '''Every user likes a book of the next one'''
+        books = [self._create_book(user) for user in users]
+        for i, user in enumerate(users):
+            books[(i + 1) % len(users)].likes.add(user)
+        return books
+
+    def _find_trades(self, **options):
+        out = StringIO()
+        call_command('find_trade_cycles', workers=1, stdout=out, **options)
+        return out.getvalue()
+
+    def test_cycles_from__with_cycles_of_three_and_four__expect_every_cycle_once(self):
+        edges = [(1, 2, 10), (2, 3, 20), (3, 1, 30), (3, 4, 31), (4, 1, 40), (1, 3, 11)]
+        graph = WantsGraph.from_edges(sorted(edges))
+
+        def find_books(**options):
+            cycles = [cycle for start in range(len(graph)) for cycle in graph.cycles_from(start, **options)]
+            return sorted(tuple(sorted(graph.books[edge] for edge in cycle)) for cycle in cycles)
+
+        self.assertListEqual([(10, 20, 30), (10, 20, 31, 40), (11, 31, 40)], find_books())
+        self.assertListEqual([(10, 20, 30), (11, 31, 40)], find_books(max_length=3))
+
+    def test_find_trades__with_cycle_of_three__expect_trade_where_everyone_gets_the_liked_book(self):
+        books = self._create_cycle(self.USERS[:3])
+        self._create_cycle(self.USERS[:2])
+
+        out = self._find_trades()
+
+        self.assertIn('proposed 1 circular trades', out)
+        trade = CircularTrade.objects.get()
+        self.assertSetEqual(
+            {(book.owner, self.USERS[(i - 1) % 3], book) for i, book in enumerate(books)},
+            {(step.giver, step.receiver, step.book) for step in trade.steps.all()},
+        )
+
+    def test_show_trades__expect_only_trades_of_the_user(self):
+        self._create_cycle(self.USERS[:3])
+        self._find_trades()
+
+        self._login(self.USERS[0])
+        response = self.client.get(self.TARGET_URL)
+        self.assertEqual(1, len(response.context.get(ShowCircularTradesView.context_object_name)))
+
+        self._login(self.USERS[3])
+        response = self.client.get(self.TARGET_URL)
+        self.assertEqual(0, len(response.context.get(ShowCircularTradesView.context_object_name)))
+
+    def test_accept_trade__when_everyone_accepts__expect_books_sent_to_receivers(self):
+        books = self._create_cycle(self.USERS[:3])
+        self._find_trades()
+        trade = CircularTrade.objects.get()
+
+        for user in self.USERS[:3]:
+            self._login(user)
+            self.client.get(reverse('accept_circular_trade', kwargs={'pk': trade.pk}))
+
+        trade.refresh_from_db()
+        self.assertTrue(trade.is_accept)
+        self.assertFalse(trade.is_active)
+        for i, book in enumerate(books):
+            book.refresh_from_db()
+            self.assertEqual(self.USERS[(i - 1) % 3], book.next_owner)
+
+    def test_accept_trade__when_book_no_longer_tradable__expect_trade_deactivated(self):
+        books = self._create_cycle(self.USERS[:3])
+        self._find_trades()
+        trade = CircularTrade.objects.get()
+        books[1].is_tradable = False
+        books[1].save()
+
+        self._login(self.USERS[0])
+        self.client.get(reverse('accept_circular_trade', kwargs={'pk': trade.pk}))
+
+        trade.refresh_from_db()
+        self.assertFalse(trade.is_active)
+        self.assertFalse(trade.steps.filter(is_accepted=True).exists())
+
+    def test_accept_trade__when_user_not_in_trade__expect_403(self):
+        self._create_cycle(self.USERS[:3])
+        self._find_trades()
+        trade = CircularTrade.objects.get()
+
+        self._login(self.USERS[3])
+        response = self.client.get(reverse('accept_circular_trade', kwargs={'pk': trade.pk}))
+        self.assertEqual(403, response.status_code)
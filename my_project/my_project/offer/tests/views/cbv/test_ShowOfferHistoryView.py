@@ -0,0 +1,109 @@
+from django import test as django_test
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from my_project.offer.models import Offer, OfferQueryset
+from my_project.offer.views import ShowOffersView
+
+UserModel = get_user_model()
+
+
+class ShowOfferHistoryViewTests(django_test.TestCase):
+    CREDENTIALS = {
+        'username': 'User',
+        'email': 'user@email.com',
+        'password': 'testp@ss',
+    }
+
+    SECOND_CREDENTIALS = {
+        'username': 'Second_User',
+        'email': 'Second_user@email.com',
+        'password': 'testp@ss',
+    }
+
+    EXTRA_CREDENTIALS = {
+        'username': 'Extra_User',
+        'email': 'extra_user@email.com',
+        'password': 'testp@ss',
+    }
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        user = UserModel.objects.create_user(**cls.CREDENTIALS)
+        second_user = UserModel.objects.create_user(**cls.SECOND_CREDENTIALS)
+        UserModel.objects.create_user(**cls.EXTRA_CREDENTIALS)
+        cls.USER = user
+        cls.SECOND_USER = second_user
+        cls.THREAD = cls._create_thread(4, user, second_user)
+        cls.OTHER_THREAD = cls._create_thread(2, user, second_user)
+
+    def _login(self, **kwarg):
+        if kwarg:
+            self.client.login(**kwarg)
+        else:
+            self.client.login(
+                username=self.CREDENTIALS.get('username'),
+                password=self.CREDENTIALS.get('password'),
+            )
+
+    @staticmethod
+    def _create_thread(number, sender, recipient):
+        thread = []
+        previous_offer = None
+        for _ in range(number):
+            previous_offer = Offer.objects.create(
+                sender=sender,
+                recipient=recipient,
+                previous_offer=previous_offer,
+                is_active=False,
+            )
+            sender, recipient = recipient, sender
+            thread.append(previous_offer)
+        return thread
+
+    def test_show_history__when_no_authenticated_user__expect_redirect_to_login_with_next(self):
+        target_url = reverse('show_offer_history', kwargs={'pk': self.THREAD[0].pk})
+        response = self.client.get(target_url)
+        redirect_url_with_next = f"{reverse('login_user')}?next={target_url}"
+        self.assertRedirects(response, redirect_url_with_next, status_code=302, target_status_code=200)
+
+    def test_show_history__when_user_is_not_sender_nor_recipient__expect_status_code_403(self):
+        self._login(**self.EXTRA_CREDENTIALS)
+        response = self.client.get(reverse('show_offer_history', kwargs={'pk': self.THREAD[0].pk}))
+        self.assertEqual(403, response.status_code)
+
+    def test_show_history__when_any_offer_of_the_thread__expect_whole_thread_in_order_from_one_query(self):
+        self._login()
+        for offer in self.THREAD:
+            response = self.client.get(reverse('show_offer_history', kwargs={'pk': offer.pk}))
+            self.assertListEqual(self.THREAD, list(response.context.get('thread')))
+            with self.assertNumQueries(1):
+                self.assertListEqual(self.THREAD, list(Offer.objects.thread(offer)))
+
+    def test_show_history__when_longer_thread__expect_same_number_of_queries(self):
+        self._login()
+
+        def count_queries(offer):
+            with CaptureQueriesContext(connection) as queries:
+                self.client.get(reverse('show_offer_history', kwargs={'pk': offer.pk}))
+            return len(queries.captured_queries)
+
+        self.assertEqual(count_queries(self.OTHER_THREAD[-1]), count_queries(self.THREAD[-1]))
+
+    def test_thread__when_database_without_recursive_queries__expect_same_thread(self):
+        vendors = OfferQueryset.RECURSIVE_CTE_VENDORS
+        OfferQueryset.RECURSIVE_CTE_VENDORS = ()
+        try:
+            result = list(Offer.objects.thread(self.THREAD[1]))
+        finally:
+            OfferQueryset.RECURSIVE_CTE_VENDORS = vendors
+        self.assertListEqual(self.THREAD, result)
+
+    def test_show_offers_list__when_negotiations__expect_only_the_latest_offer_of_each(self):
+        self._login()
+        response = self.client.get(reverse('show_offer_list'))
+        offers = response.context.get(ShowOffersView.context_object_name)
+        self.assertSetEqual({self.THREAD[-1], self.OTHER_THREAD[-1]}, set(offers))
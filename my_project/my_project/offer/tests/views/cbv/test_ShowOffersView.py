@@ -2,6 +2,7 @@ from django import test as django_test
 from django.contrib.auth import get_user_model
 from django.urls import reverse
 
+from my_project.library.models import Book
 from my_project.offer.models import Offer
 from my_project.offer.views import ShowOffersView
 
@@ -76,3 +77,26 @@ class ShowOfferDetailsViewTests(django_test.TestCase):
 
         self.assertEqual(20, offers.count())
         self.assertTrue(offer.sender == self.USER or offer.recipient == self.USER for offer in offers)
+
+    def test_show_offers_list_validity__when_some_books_changed_owner__expect_only_those_offers_invalid(self):
+        sender_book = Book.objects.create(title='Test title', author='Test author', owner=self.USER)
+        recipient_book = Book.objects.create(title='Test title', author='Test author', owner=self.SECOND_USER)
+        self._create_offers(3, self.USER, self.SECOND_USER)
+        valid_offer, invalid_sender_offer, invalid_recipient_offer = Offer.objects.order_by('pk')
+        for offer in (valid_offer, invalid_sender_offer, invalid_recipient_offer):
+            offer.sender_books.add(sender_book)
+            offer.recipient_books.add(recipient_book)
+        moved_sender_book = Book.objects.create(title='Test title', author='Test author', owner=self.EXTRA_USER)
+        invalid_sender_offer.sender_books.add(moved_sender_book)
+        moved_recipient_book = Book.objects.create(title='Test title', author='Test author', owner=None)
+        invalid_recipient_offer.recipient_books.add(moved_recipient_book)
+
+        self._login(**self.CREDENTIALS)
+        response = self.client.get(self.TARGET_URL)
+        offers = response.context.get(ShowOffersView.context_object_name)
+
+        self.assertDictEqual({valid_offer.pk: True, invalid_sender_offer.pk: False, invalid_recipient_offer.pk: False},
+                             {offer.pk: offer.is_still_valid for offer in offers})
+        self.assertEqual(([moved_sender_book], []), invalid_sender_offer.get_missing_books())
+        self.assertEqual(([], [moved_recipient_book]), invalid_recipient_offer.get_missing_books())
+        self.assertEqual(([], []), valid_offer.get_missing_books())
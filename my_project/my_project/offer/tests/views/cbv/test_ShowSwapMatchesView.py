@@ -0,0 +1,132 @@
+from io import StringIO
+
+from django import test as django_test
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.urls import reverse
+
+from my_project.library.models import Book
+from my_project.offer.models import SwapMatch
+from my_project.offer.views import ShowSwapMatchesView
+
+UserModel = get_user_model()
+
+
+class ShowSwapMatchesViewTests(django_test.TestCase):
+    CREDENTIALS = {
+        'username': 'User',
+        'email': 'user@email.com',
+        'password': 'testp@ss',
+    }
+
+    SECOND_CREDENTIALS = {
+        'username': 'Second_User',
+        'email': 'Second_user@email.com',
+        'password': 'testp@ss',
+    }
+
+    EXTRA_CREDENTIALS = {
+        'username': 'Extra_User',
+        'email': 'extra_user@email.com',
+        'password': 'testp@ss',
+    }
+
+    TARGET_URL = reverse('show_swap_matches')
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.USER = UserModel.objects.create_user(**cls.CREDENTIALS)
+        cls.SECOND_USER = UserModel.objects.create_user(**cls.SECOND_CREDENTIALS)
+        cls.EXTRA_USER = UserModel.objects.create_user(**cls.EXTRA_CREDENTIALS)
+
+    def _login(self):
+        self.client.login(
+            username=self.CREDENTIALS.get('username'),
+            password=self.CREDENTIALS.get('password'),
+        )
+
+    @staticmethod
+    def _create_books(number, owner):
+        return [Book.objects.create(title='Test title', author='Test author', owner=owner) for _ in range(number)]
+
+    def _get_matches(self):
+        self._login()
+        response = self.client.get(self.TARGET_URL)
+        return [(match.counterpart, match.wanted_books_count, match.offered_books_count)
+                for match in response.context.get(ShowSwapMatchesView.context_object_name)]
+
+    def test_show_matches__when_no_authenticated_user__expect_redirect_to_login_with_next(self):
+        response = self.client.get(self.TARGET_URL)
+        redirect_url_with_next = f"{reverse('login_user')}?next={self.TARGET_URL}"
+        self.assertRedirects(response, redirect_url_with_next, status_code=302, target_status_code=200)
+
+    def test_show_matches__when_mutual_likes__expect_ranked_matches_of_both_users(self):
+        user_books = self._create_books(2, self.USER)
+        second_user_books = self._create_books(2, self.SECOND_USER)
+        extra_user_books = self._create_books(1, self.EXTRA_USER)
+        for book in second_user_books + extra_user_books:
+            book.likes.add(self.USER)
+        for book in user_books:
+            book.likes.add(self.SECOND_USER)
+        user_books[0].likes.add(self.EXTRA_USER)
+
+        self.assertListEqual([(self.SECOND_USER, 2, 2), (self.EXTRA_USER, 1, 1)], self._get_matches())
+        self.assertEqual(1, SwapMatch.objects.filter(user=self.SECOND_USER, counterpart=self.USER).count())
+
+    def test_show_matches__when_like_removed_or_book_not_tradable__expect_match_gone(self):
+        user_book = self._create_books(1, self.USER)[0]
+        second_user_book, extra_user_book = self._create_books(1, self.SECOND_USER) + self._create_books(1, self.EXTRA_USER)
+        second_user_book.likes.add(self.USER)
+        extra_user_book.likes.add(self.USER)
+        user_book.likes.add(self.SECOND_USER, self.EXTRA_USER)
+
+        user_book.likes.remove(self.SECOND_USER)
+        extra_user_book.is_tradable = False
+        extra_user_book.save()
+
+        self.assertListEqual([], self._get_matches())
+
+    def test_show_matches__when_like_toggled__expect_only_match_of_liker_and_owner_rebuilt(self):
+        user_book = self._create_books(1, self.USER)[0]
+        second_user_book, extra_user_book = self._create_books(1, self.SECOND_USER) + self._create_books(1, self.EXTRA_USER)
+        second_user_book.likes.add(self.USER)
+        user_book.likes.add(self.SECOND_USER)
+        other_pair_pks = set(SwapMatch.objects.values_list('pk', flat=True))
+
+        extra_user_book.likes.add(self.USER)
+        user_book.likes.add(self.EXTRA_USER)
+
+        self.assertListEqual([(self.SECOND_USER, 1, 1), (self.EXTRA_USER, 1, 1)], self._get_matches())
+        self.assertSetEqual(other_pair_pks, set(SwapMatch.objects.filter(counterpart__in=[self.USER, self.SECOND_USER])
+                                                .exclude(user=self.EXTRA_USER).values_list('pk', flat=True)))
+
+        user_book.likes.remove(self.EXTRA_USER)
+        self.assertListEqual([(self.SECOND_USER, 1, 1)], self._get_matches())
+
+    def test_show_matches__when_book_sent_to_other_user__expect_matches_follow_the_owner(self):
+        user_book = self._create_books(1, self.USER)[0]
+        second_user_book = self._create_books(1, self.SECOND_USER)[0]
+        second_user_book.likes.add(self.USER)
+        user_book.likes.add(self.SECOND_USER)
+
+        Book.objects.filter(pk=second_user_book.pk).send_to(self.EXTRA_USER)
+        self.assertListEqual([], self._get_matches())
+
+        Book.objects.filter(pk=second_user_book.pk).receive()
+        self.assertListEqual([], self._get_matches())
+        user_book.likes.add(self.EXTRA_USER)
+        self.assertListEqual([(self.EXTRA_USER, 1, 1)], self._get_matches())
+
+    def test_refresh_command__when_matches_lost__expect_matches_rebuilt(self):
+        user_book = self._create_books(1, self.USER)[0]
+        second_user_book = self._create_books(1, self.SECOND_USER)[0]
+        second_user_book.likes.add(self.USER)
+        user_book.likes.add(self.SECOND_USER)
+        SwapMatch.objects.all().delete()
+
+        out = StringIO()
+        call_command('refresh_swap_matches', batch_size=1, stdout=out)
+
+        self.assertListEqual([(self.SECOND_USER, 1, 1)], self._get_matches())
+        self.assertIn('Found 2 swap matches', out.getvalue())
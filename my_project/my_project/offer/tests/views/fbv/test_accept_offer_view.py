@@ -1,5 +1,7 @@
 from django import test as django_test
 from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from my_project.common.models import Notification
@@ -95,8 +97,8 @@ class AcceptOfferViewTests(django_test.TestCase):
         self.assertFalse(result_offer.is_active)
         self.assertTrue(result_offer.is_accept)
 
-        self.assertQuerysetEqual(sender_books_in_offer, result_sender_books)
-        self.assertQuerysetEqual(recipient_books_in_offer, result_recipient_books)
+        self.assertQuerysetEqual(sender_books_in_offer, result_sender_books, ordered=False)
+        self.assertQuerysetEqual(recipient_books_in_offer, result_recipient_books, ordered=False)
         self.assertFalse(any(b.owner for b in result_sender_books))
         self.assertFalse(any(b.owner for b in result_recipient_books))
         self.assertTrue(all(b.next_owner == self.SECOND_USER for b in result_sender_books))
@@ -146,4 +148,54 @@ class AcceptOfferViewTests(django_test.TestCase):
         self.assertEqual(0, sum(b.ex_owners.count() for b in result_sender_books))
         self.assertEqual(0, sum(b.ex_owners.count() for b in result_recipient_books))
 
-        self.assertTemplateUsed(response, 'offer/inactive_offer.html')
\ No newline at end of file
+        self.assertTemplateUsed(response, 'offer/inactive_offer.html')
+
+    def test_accept_offer__when_more_books_in_offer__expect_same_number_of_queries(self):
+        self._create_books(10, self.USER)
+        self._create_books(10, self.SECOND_USER)
+        small_offer = Offer.objects.create(sender=self.USER, recipient=self.SECOND_USER)
+        small_offer.sender_books.set(Book.objects.filter(owner=self.USER)[:1])
+        small_offer.recipient_books.set(Book.objects.filter(owner=self.SECOND_USER)[:1])
+        big_offer = Offer.objects.create(sender=self.USER, recipient=self.SECOND_USER)
+        big_offer.sender_books.set(Book.objects.filter(owner=self.USER)[1:])
+        big_offer.recipient_books.set(Book.objects.filter(owner=self.SECOND_USER)[1:])
+
+        self._login(**self.SECOND_CREDENTIALS)
+        with CaptureQueriesContext(connection) as small_offer_queries:
+            self.client.get(reverse('accept_offer', kwargs={'pk': small_offer.pk}))
+        with CaptureQueriesContext(connection) as big_offer_queries:
+            self.client.get(reverse('accept_offer', kwargs={'pk': big_offer.pk}))
+
+        self.assertEqual(len(small_offer_queries.captured_queries), len(big_offer_queries.captured_queries))
+        self.assertFalse(Book.objects.filter(owner__isnull=False).exists())
+        self.assertEqual(20, Book.ex_owners.through.objects.count())
+
+    def test_accept_offer__when_other_offers_with_same_books__expect_them_closed_with_one_notf_per_user(self):
+        extra_user = UserModel.objects.create_user(username='Extra_User', email='extra_user@email.com',
+                                                   password='testp@ss')
+        self._create_books(2, self.USER)
+        self._create_books(2, self.SECOND_USER)
+        self._create_books(1, extra_user)
+        user_books = Book.objects.filter(owner=self.USER)
+        second_user_book = Book.objects.filter(owner=self.SECOND_USER).first()
+        extra_user_book = Book.objects.get(owner=extra_user)
+        self.OFFER.sender_books.set(user_books)
+        self.OFFER.recipient_books.set([second_user_book])
+        other_offers = [Offer.objects.create(sender=extra_user, recipient=self.USER) for _ in range(2)]
+        for offer in other_offers:
+            offer.sender_books.set([extra_user_book])
+            offer.recipient_books.set([user_books[0]])
+        untouched_offer = Offer.objects.create(sender=extra_user, recipient=self.SECOND_USER)
+        untouched_offer.recipient_books.set(Book.objects.filter(owner=self.SECOND_USER)[1:])
+        notf_before = Notification.objects.count()
+
+        self._login(**self.SECOND_CREDENTIALS)
+        self.client.get(self.TARGET_URL)
+
+        self.assertFalse(Offer.objects.filter(pk__in=[offer.pk for offer in other_offers], is_active=True).exists())
+        self.assertTrue(Offer.objects.get(pk=untouched_offer.pk).is_active)
+        self.assertTrue(Offer.objects.get(pk=self.OFFER.pk).is_accept)
+        closed_notf = Notification.objects.order_by('pk')[notf_before + 1:]
+        self.assertSetEqual({self.USER, extra_user}, {notf.recipient for notf in closed_notf})
+        self.assertEqual(2, len(closed_notf))
+        self.assertFalse(Notification.objects.filter(offer__in=other_offers, is_answered=False).exists())
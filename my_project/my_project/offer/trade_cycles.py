@@ -0,0 +1,202 @@
+'''
+Multi-party trades. User A wants user B when A liked a tradable book of B,
+and a circle of wants (A wants B, B wants C, C wants A) is a trade everybody in it gains from.
+
+The wants graph is kept in compressed sparse rows of array.array, a few bytes per edge
+instead of a Python object, so a hundred thousand users with millions of likes fit in memory
+and are copied to the worker processes only once.
+'''
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+from django.db import transaction
+from django.db.models import F, Min, Q
+
+from my_project.library.models import Book
+from my_project.offer.models import CircularTrade, CircularTradeStep
+
+MIN_LENGTH = 3
+MAX_LENGTH = 5
+MAX_CYCLES_PER_USER = 20
+MAX_STEPS_PER_USER = 20000
+CHUNK_SIZE = 256
+
+
+class WantsGraph:
+    def __init__(self, user_pks, offsets, targets, books):
+        self.user_pks = user_pks
+        self.offsets = offsets
+        self.targets = targets
+        self.books = books
+        self.reverse_offsets, self.reverse_sources = self._reverse()
+
+    @classmethod
+    def from_database(cls):
+        '''One edge per (user, owner) pair, with the first book the user liked from the owner'''
+        wants = Book.objects.filter(
+            ~Q(owner=F('likes')),
+            is_tradable=True,
+            owner__is_active=True,
+            likes__is_active=True,
+        ) \
+            .values('likes', 'owner') \
+            .annotate(book=Min('pk')) \
+            .order_by('likes', 'owner') \
+            .values_list('likes', 'owner', 'book')
+        return cls.from_edges(wants.iterator(chunk_size=10000))
+
+    @classmethod
+    def from_edges(cls, edges):
+        '''edges are (user_pk, owner_pk, book_pk), sorted by user_pk'''
+        sources, targets, books = array('q'), array('q'), array('q')
+        for source, target, book in edges:
+            sources.append(source)
+            targets.append(target)
+            books.append(book)
+
+        user_pks = array('q', sorted(set(sources) | set(targets)))
+        index = {pk: i for i, pk in enumerate(user_pks)}
+        offsets = array('l', [0] * (len(user_pks) + 1))
+        for source in sources:
+            offsets[index[source] + 1] += 1
+        for i in range(len(user_pks)):
+            offsets[i + 1] += offsets[i]
+        targets = array('l', (index[target] for target in targets))
+        return cls(user_pks, offsets, targets, books)
+
+    def __len__(self):
+        return len(self.user_pks)
+
+    def edges_of(self, node):
+        return range(self.offsets[node], self.offsets[node + 1])
+
+    def _reverse(self):
+        reverse_offsets = array('l', [0] * len(self.offsets))
+        for target in self.targets:
+            reverse_offsets[target + 1] += 1
+        for i in range(len(self.user_pks)):
+            reverse_offsets[i + 1] += reverse_offsets[i]
+        reverse_sources = array('l', [0] * len(self.targets))
+        next_position = array('l', reverse_offsets[:-1])
+        for source in range(len(self.user_pks)):
+            for edge in self.edges_of(source):
+                target = self.targets[edge]
+                reverse_sources[next_position[target]] = source
+                next_position[target] += 1
+        return reverse_offsets, reverse_sources
+
+    def distances_to(self, start, max_distance):
+        '''Steps from each node with a bigger index than start back to start, up to max_distance'''
+        distances = {start: 0}
+        frontier = [start]
+        for distance in range(1, max_distance + 1):
+            next_frontier = []
+            for node in frontier:
+                for i in range(self.reverse_offsets[node], self.reverse_offsets[node + 1]):
+                    source = self.reverse_sources[i]
+                    if source > start and source not in distances:
+                        distances[source] = distance
+                        next_frontier.append(source)
+            frontier = next_frontier
+        return distances
+
+    def cycles_from(self, start, min_length=MIN_LENGTH, max_length=MAX_LENGTH,
+                    max_cycles=MAX_CYCLES_PER_USER, max_steps=MAX_STEPS_PER_USER):
+        '''
+        Cycles whose smallest node is start, as tuples of edges, so every cycle is found exactly once.
+        The search only enters nodes that can still get back to start in time,
+        and gives up on start after max_steps edges or max_cycles cycles.
+        '''
+        distances = self.distances_to(start, max_length - 1)
+        cycles = []
+        path_nodes = [start]
+        path_edges = []
+        steps = 0
+
+        def search(node):
+            nonlocal steps
+            for edge in self.edges_of(node):
+                steps += 1
+                if steps > max_steps or len(cycles) >= max_cycles:
+                    return
+                target = self.targets[edge]
+                length = len(path_edges) + 1
+                if target == start:
+                    if length >= min_length:
+                        cycles.append(tuple(path_edges) + (edge,))
+                    continue
+                if target not in distances or length + distances[target] > max_length or target in path_nodes:
+                    continue
+                path_nodes.append(target)
+                path_edges.append(edge)
+                search(target)
+                path_nodes.pop()
+                path_edges.pop()
+
+        if len(distances) >= min_length:
+            search(start)
+        return cycles
+
+
+_graph = None
+
+
+def _set_graph(graph):
+    global _graph
+    _graph = graph
+
+
+def _cycles_of_chunk(args):
+    starts, options = args
+    return [cycle for start in starts for cycle in _graph.cycles_from(start, **options)]
+
+
+def find_cycles(graph, workers=None, **options):
+    '''Search every user as the start of cycles, chunks of users in parallel on all cores'''
+    chunks = [(range(i, min(i + CHUNK_SIZE, len(graph))), options) for i in range(0, len(graph), CHUNK_SIZE)]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(chunks) <= 1:
+        _set_graph(graph)
+        return [cycle for chunk in chunks for cycle in _cycles_of_chunk(chunk)]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_set_graph, initargs=(graph,)) as executor:
+        return [cycle for cycles in executor.map(_cycles_of_chunk, chunks) for cycle in cycles]
+
+
+def choose_trades(graph, cycles, max_trades_per_user, used_books=()):
+    '''Shortest cycles first, every book in one trade at most and every user in max_trades_per_user at most'''
+    used_books = set(used_books)
+    trades_per_user = {}
+    chosen = []
+    for cycle in sorted(cycles, key=len):
+        books = {graph.books[edge] for edge in cycle}
+        users = [graph.targets[edge] for edge in cycle]
+        if used_books & books or any(trades_per_user.get(user, 0) >= max_trades_per_user for user in users):
+            continue
+        used_books |= books
+        for user in users:
+            trades_per_user[user] = trades_per_user.get(user, 0) + 1
+        chosen.append(cycle)
+    return chosen
+
+
+def save_trades(graph, cycles):
+    '''Replace the unanswered proposals with the new ones, with two bulk inserts'''
+    with transaction.atomic():
+        CircularTrade.objects.unanswered().delete()
+        trades = CircularTrade.objects.bulk_create(CircularTrade() for _ in cycles)
+        steps = []
+        for trade, cycle in zip(trades, cycles):
+            '''An edge's target gives its book to the edge's source, which is the previous edge's target'''
+            for position, edge in enumerate(cycle):
+                receiver_node = graph.targets[cycle[position - 1]]
+                giver_node = graph.targets[edge]
+                steps.append(CircularTradeStep(
+                    trade=trade,
+                    position=position,
+                    giver_id=graph.user_pks[giver_node],
+                    receiver_id=graph.user_pks[receiver_node],
+                    book_id=graph.books[edge],
+                ))
+        CircularTradeStep.objects.bulk_create(steps)
+    return trades
@@ -1,12 +1,18 @@
 from django.urls import path
 
 from my_project.offer.views import CreateOfferView, ShowOfferDetailsView, accept_offer_view, decline_offer_view, \
-    NegotiateOfferView, ShowOffersView
+    NegotiateOfferView, ShowOffersView, ShowOfferHistoryView, ShowSwapMatchesView, ShowCircularTradesView, \
+    accept_circular_trade_view, decline_circular_trade_view
 
 urlpatterns = [
     path('create/<int:pk>/', CreateOfferView.as_view(), name='create_offer'),
     path('details/<int:pk>/', ShowOfferDetailsView.as_view(), name='show_offer_details'),
     path('dashboard/', ShowOffersView.as_view(), name='show_offer_list'),
+    path('history/<int:pk>/', ShowOfferHistoryView.as_view(), name='show_offer_history'),
+    path('matches/', ShowSwapMatchesView.as_view(), name='show_swap_matches'),
+    path('circular/', ShowCircularTradesView.as_view(), name='show_circular_trades'),
+    path('circular/accept/<int:pk>/', accept_circular_trade_view, name='accept_circular_trade'),
+    path('circular/decline/<int:pk>/', decline_circular_trade_view, name='decline_circular_trade'),
 
     path('accept/<int:pk>/', accept_offer_view, name='accept_offer'),
     path('decline/<int:pk>/', decline_offer_view, name='decline_offer'),
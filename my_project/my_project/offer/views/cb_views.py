@@ -1,6 +1,7 @@
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.core.exceptions import PermissionDenied
-from django.db.models import Q
+from django.db import transaction
+from django.db.models import Q, Prefetch
 from django.shortcuts import redirect
 from django.urls import reverse_lazy
 from django.views.generic import CreateView, UpdateView, DetailView, ListView
@@ -8,7 +9,7 @@ from django.views.generic import CreateView, UpdateView, DetailView, ListView
 from my_project.common.helpers.custom_mixins import PaginationShowMixin, AuthorizationRequiredMixin
 from my_project.library.models import Book
 from my_project.offer.forms import CreateOfferForm, NegotiateOfferForm
-from my_project.offer.models import Offer
+from my_project.offer.models import Offer, SwapMatch, CircularTrade, CircularTradeStep
 
 
 class CreateOfferView(LoginRequiredMixin, CreateView):
@@ -29,23 +30,32 @@ class CreateOfferView(LoginRequiredMixin, CreateView):
         wanted_book = self._get_wanted_book()
         sender = self.request.user
         recipient = wanted_book.owner
-        return {
+        initial = {
             'wanted_book': wanted_book,
             'sender': sender,
             'recipient': recipient,
         }
+        if self.request.GET.get('match'):
+            '''Prefill the books of a swap match: the ones each side liked from the other'''
+            initial['sender_books'] = Book.objects.filter(owner=sender, is_tradable=True, likes=recipient)
+            initial['recipient_books'] = Book.objects.filter(owner=recipient, is_tradable=True, likes=sender) \
+                .exclude(pk=wanted_book.pk)
+        return initial
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['book'] = self._get_wanted_book()
+        context['has_books'] = Book.objects.filter(owner=self.request.user, is_tradable=True).exists()
         return context
 
     def form_valid(self, form):
+        '''The offer and its outbox entry are committed together'''
         form = self._create_valid_form(form)
-        result = super().form_valid(form)
-        offer = self.object
-        offer.recipient_books.add(self._get_wanted_book())
-        offer.save()
+        with transaction.atomic():
+            result = super().form_valid(form)
+            offer = self.object
+            offer.recipient_books.add(self._get_wanted_book())
+            offer.save()
         return result
 
     def _get_wanted_book(self):
@@ -65,18 +75,20 @@ class NegotiateOfferView(LoginRequiredMixin, AuthorizationRequiredMixin, UpdateV
     context_object_name = 'offer'
     success_url = reverse_lazy('show_offer_list')
     authorizing_fields = ['recipient']
+    related_fields = ('sender', 'recipient')
 
     def form_valid(self, form):
-        """Deactivate old offer"""
-        obj = form.save(commit=False)
-        obj.is_active = False
-        obj.save()
-        """Create new offer"""
-        obj.is_active = True
-        obj.previous_offer = self.get_old_offer()
-        obj.sender, obj.recipient = obj.recipient, obj.sender
-        obj.pk = None
-        return super().form_valid(form)
+        with transaction.atomic():
+            """Deactivate old offer"""
+            obj = form.save(commit=False)
+            obj.is_active = False
+            obj.save()
+            """Create new offer"""
+            obj.is_active = True
+            obj.previous_offer = self.get_old_offer()
+            obj.sender, obj.recipient = obj.recipient, obj.sender
+            obj.pk = None
+            return super().form_valid(form)
 
     def get_old_offer(self):
         return Offer.objects.filter(pk=self.kwargs.get('pk')).first()
@@ -87,14 +99,20 @@ class ShowOfferDetailsView(LoginRequiredMixin, AuthorizationRequiredMixin, Detai
     context_object_name = 'offer'
     template_name = 'offer/show_offer_details.html'
     authorizing_fields = ['sender', 'recipient']
+    related_fields = ('sender', 'recipient', 'previous_offer', 'next_offer')
+
+    def get_queryset(self):
+        return super().get_queryset().with_validity()
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        offer = self.get_object()
+        offer = self.object
         is_my_offer = self.request.user == offer.sender
         context['is_my_offer'] = is_my_offer
-        context['my_books'] = offer.sender_books.all() if is_my_offer else offer.recipient_books.all()
-        context['others_books'] = offer.sender_books.all() if not is_my_offer else offer.recipient_books.all()
+        sender_books = offer.sender_books.select_related('owner', 'category')
+        recipient_books = offer.recipient_books.select_related('owner', 'category')
+        context['my_books'] = sender_books if is_my_offer else recipient_books
+        context['others_books'] = sender_books if not is_my_offer else recipient_books
         return context
 
 
@@ -106,4 +124,41 @@ class ShowOffersView(LoginRequiredMixin, PaginationShowMixin, ListView):
 
     def get_queryset(self):
         return Offer.objects.prefetch_related('recipient', 'sender').filter(
-            Q(recipient=self.request.user) | Q(sender=self.request.user))
+            Q(recipient=self.request.user) | Q(sender=self.request.user)).latest_of_threads().with_validity()
+
+
+class ShowOfferHistoryView(LoginRequiredMixin, AuthorizationRequiredMixin, DetailView):
+    model = Offer
+    context_object_name = 'offer'
+    template_name = 'offer/show_offer_history.html'
+    authorizing_fields = ['sender', 'recipient']
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['thread'] = Offer.objects.thread(self.object).select_related('sender', 'recipient')
+        return context
+
+
+class ShowSwapMatchesView(LoginRequiredMixin, PaginationShowMixin, ListView):
+    template_name = 'offer/show_swap_matches.html'
+    context_object_name = 'matches'
+    model = SwapMatch
+    paginate_by = 20
+
+    def get_queryset(self):
+        return SwapMatch.objects.filter(user=self.request.user) \
+            .select_related('counterpart', 'wanted_book') \
+            .order_by('-score', '-wanted_books_count', 'pk')
+
+
+class ShowCircularTradesView(LoginRequiredMixin, PaginationShowMixin, ListView):
+    template_name = 'offer/show_circular_trades.html'
+    context_object_name = 'trades'
+    model = CircularTrade
+    paginate_by = 10
+
+    def get_queryset(self):
+        steps = CircularTradeStep.objects.select_related('giver', 'receiver', 'book')
+        return CircularTrade.objects.of_user(self.request.user) \
+            .filter(is_active=True) \
+            .prefetch_related(Prefetch('steps', queryset=steps))
@@ -1,8 +1,11 @@
 from django.contrib.auth.decorators import login_required
 from django.core.exceptions import PermissionDenied
-from django.shortcuts import render, redirect
+from django.db import transaction
+from django.db.models import Q
+from django.shortcuts import render, redirect, get_object_or_404
 
-from my_project.offer.models import Offer
+from my_project.library.models import Book
+from my_project.offer.models import Offer, CircularTrade
 
 
 def get_offer(request, pk):
@@ -15,8 +18,7 @@ def get_offer(request, pk):
 
 def check_offer(request, offer):
     '''Check if all books still belong to offer's sender and recipient'''
-    s_missing_books = [book for book in offer.sender_books.all() if not book.owner == offer.sender]
-    r_missing_books = [book for book in offer.recipient_books.all() if not book.owner == offer.recipient]
+    s_missing_books, r_missing_books = offer.get_missing_books()
     context = {'offer': offer}
 
     if s_missing_books or r_missing_books:
@@ -27,34 +29,77 @@ def check_offer(request, offer):
         return render(request, 'offer/inactive_offer.html', context)
 
 
+def lock_offer_books(offer):
+    Book.objects.filter(Q(pk__in=offer.sender_books.values('pk')) | Q(pk__in=offer.recipient_books.values('pk'))) \
+        .lock()
+
+
 def change_books_owner(books, new_owner):
-    for book in books:
-        book.ex_owners.add(book.owner)
-        book.previous_owner = book.owner
-        book.next_owner = new_owner
-        book.owner = None
-        book.save()
-    return books
+    return books.send_to(new_owner)
 
 
 @login_required
 def accept_offer_view(request, pk):
     offer = get_offer(request, pk)
 
-    redirect_to_inactive = check_offer(request, offer)
-    if redirect_to_inactive:
-        return redirect_to_inactive
+    with transaction.atomic():
+        lock_offer_books(offer)
+        redirect_to_inactive = check_offer(request, offer)
+        if redirect_to_inactive:
+            return redirect_to_inactive
 
-    change_books_owner(offer.sender_books.all(), offer.recipient)
-    change_books_owner(offer.recipient_books.all(), offer.sender)
-    offer.is_accept = True
-    offer.save()
+        '''Close the offer first, the owner change closes only the other offers with its books'''
+        offer.is_accept = True
+        offer.save()
+        change_books_owner(offer.sender_books.all(), offer.recipient)
+        change_books_owner(offer.recipient_books.all(), offer.sender)
 
     return redirect('show_offer_details', pk=pk)
 
 
 @login_required
 def decline_offer_view(request, pk):
-    offer = get_offer(request, pk)
-    offer.save()
+    with transaction.atomic():
+        offer = get_offer(request, pk)
+        offer.save()
     return redirect('show_offer_details', pk=pk)
+
+
+def get_circular_trade(request, pk):
+    trade = get_object_or_404(CircularTrade.objects.select_for_update(), pk=pk, is_active=True)
+    step = trade.steps.filter(giver=request.user).first()
+    if not step:
+        raise PermissionDenied
+    return trade, step
+
+
+@login_required
+def accept_circular_trade_view(request, pk):
+    with transaction.atomic():
+        trade, step = get_circular_trade(request, pk)
+        steps = list(trade.steps.select_related('receiver'))
+        Book.objects.filter(pk__in=[trade_step.book_id for trade_step in steps]).lock()
+        if trade.get_missing_steps().exists():
+            trade.is_active = False
+            trade.save()
+            return redirect('show_circular_trades')
+
+        step.is_accepted = True
+        step.save(update_fields=['is_accepted'])
+        if all(trade_step.is_accepted or trade_step.pk == step.pk for trade_step in steps):
+            for trade_step in steps:
+                Book.objects.filter(pk=trade_step.book_id).send_to(trade_step.receiver)
+            trade.is_accept = True
+            trade.is_active = False
+            trade.save()
+
+    return redirect('show_circular_trades')
+
+
+@login_required
+def decline_circular_trade_view(request, pk):
+    with transaction.atomic():
+        trade, step = get_circular_trade(request, pk)
+        trade.is_active = False
+        trade.save()
+    return redirect('show_circular_trades')
@@ -0,0 +1,56 @@
+/* Load the options of select[data-url] page by page, with a search box and a "More" button */
+document.addEventListener('DOMContentLoaded', function () {
+    document.querySelectorAll('select[data-url]').forEach(function (select) {
+        const search = document.createElement('input');
+        search.type = 'search';
+        search.placeholder = 'Search by title or author';
+        search.className = select.className;
+        select.before(search);
+
+        const more = document.createElement('button');
+        more.type = 'button';
+        more.textContent = 'More books';
+        more.hidden = true;
+        select.after(more);
+
+        let nextPage = 1;
+        let timer = null;
+
+        function load(page) {
+            const url = new URL(select.dataset.url, window.location.origin);
+            url.searchParams.set('page', page);
+            if (search.value) {
+                url.searchParams.set('search', search.value);
+            }
+            fetch(url, {credentials: 'same-origin'})
+                .then(function (response) {
+                    return response.json();
+                })
+                .then(function (data) {
+                    data.results.forEach(function (book) {
+                        if (!select.querySelector('option[value="' + book.id + '"]')) {
+                            select.add(new Option(book.text, book.id));
+                        }
+                    });
+                    nextPage = data.next_page;
+                    more.hidden = !nextPage;
+                });
+        }
+
+        search.addEventListener('input', function () {
+            clearTimeout(timer);
+            timer = setTimeout(function () {
+                Array.from(select.options).forEach(function (option) {
+                    if (!option.selected) {
+                        option.remove();
+                    }
+                });
+                load(1);
+            }, 300);
+        });
+        more.addEventListener('click', function () {
+            load(nextPage);
+        });
+        load(nextPage);
+    });
+});
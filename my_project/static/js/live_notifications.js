@@ -0,0 +1,43 @@
+/* Keep the notifications link of the header up to date with server-sent events, or long polling without them */
+(function () {
+    const script = document.currentScript;
+    const link = document.getElementById('notifications-link');
+
+    function show(state) {
+        link.textContent = state.unread_count
+            ? 'You have ' + state.unread_count + ' new notifications!'
+            : 'Notifications';
+    }
+
+    if (window.EventSource) {
+        const events = new EventSource(script.dataset.eventsUrl);
+        events.addEventListener('notifications', function (event) {
+            show(JSON.parse(event.data));
+        });
+        return;
+    }
+
+    let since = 0;
+    let count = '';
+
+    function poll() {
+        fetch(script.dataset.pollUrl + '?since=' + since + '&count=' + count, {credentials: 'same-origin'})
+            .then(function (response) {
+                if (response.status === 200) {
+                    return response.json().then(function (state) {
+                        since = state.last_id;
+                        count = state.unread_count;
+                        show(state);
+                    });
+                }
+                if (response.status !== 204) {
+                    throw new Error(response.statusText);
+                }
+            })
+            .then(poll, function () {
+                setTimeout(poll, 5000);
+            });
+    }
+
+    poll();
+})();